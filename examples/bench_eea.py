@@ -0,0 +1,48 @@
+"""
+Extended Euclidean algorithm benchmark
+
+Compare plain Euclid, Lehmer's method and the built-in `pow(x, -1, n)`
+on random operands of 256 to 4096 bits, and 8192 bits to show
+where Lehmer overtakes the built-in
+
+    python bench_eea.py [num_pairs]
+"""
+
+import sys
+from time import perf_counter
+from secrets import randbits
+from extended_euclidean_algorithm import euclid, lehmer, eea, inverse
+
+def bench(f, pairs: list[tuple[int, int]]) -> float:
+    """
+    Microseconds per call of `f` on all `pairs`
+    """
+    start = perf_counter()
+    for x, y in pairs:
+        f(x, y)
+    return 1e6 * (perf_counter() - start) / len(pairs)
+
+def main(num: int = 200):
+    methods = {
+        'euclid': euclid,
+        'lehmer': lehmer,
+        'pow(y, -1, x)': lambda x, y: pow(y, -1, x),
+        'eea': eea,
+        'inverse': lambda x, y: inverse(y, x),
+    }
+    print(f'{num} coprime pairs per size, microseconds per call')
+    print('+-------+' + '----------------+' * len(methods))
+    print('| bits  |' + ''.join(f' {name:<14} |' for name in methods))
+    print('+-------+' + '----------------+' * len(methods))
+    for bits in [256, 512, 1024, 2048, 4096, 8192]:
+        pairs = []
+        while len(pairs) < num:
+            x, y = randbits(bits) | 1 << (bits - 1) | 1, randbits(bits - 1) | 1
+            if eea(x, y)[0] == 1: pairs.append((x, y))
+        for x, y in pairs:
+            assert (inverse(y, x) * y - 1) % x == 0
+        print(f'| {bits:<5} |' + ''.join(f' {bench(f, pairs):14.1f} |' for f in methods.values()))
+    print('+-------+' + '----------------+' * len(methods))
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
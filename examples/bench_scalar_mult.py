@@ -0,0 +1,55 @@
+"""
+Scalar multiplication benchmark
+
+Compare the scalar multiplication strategies on random 256-bit scalars
+over secp256k1: `y^2 = x^3 + 7 (mod 2^256 - 2^32 - 977)`
+
+    python bench_scalar_mult.py [num_scalars]
+"""
+
+import sys
+from time import perf_counter
+from secrets import randbits
+from elliptic_curve import Weierstrass, Point
+from scalar_mult import scalar_mult, strategies
+
+# secp256k1 field modulus and base point
+p = 2 ** 256 - 2 ** 32 - 977
+base = Point(
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+
+def bench(strategy: str, w: int, scalars: list[int], affine: bool = False) -> tuple[float, list[Point]]:
+    """
+    Time `strategy` with window width `w` on all `scalars`
+
+    Jacobian coordinates unless `affine`
+    """
+    curve = Weierstrass(0, 7, p, strategy, w)
+    start = perf_counter()
+    if affine:
+        res = [scalar_mult(curve, k, base, strategy, w) for k in scalars]
+    else:
+        res = [curve.scalar_mult(k, base) for k in scalars]
+    return perf_counter() - start, res
+
+def main(num: int = 20):
+    scalars = [randbits(256) | 1 << 255 for _ in range(num)]
+    expected = None
+    print(f'{num} scalar multiplications with 256-bit scalars')
+    print('+----------------+---+----------+-------------+')
+    print('| strategy       | w | coords   | ms / mult   |')
+    print('+----------------+---+----------+-------------+')
+    for affine in [True, False]:
+        for strategy in strategies:
+            for w in ([1] if strategy == 'double-and-add' else [3, 4, 5]):
+                elapsed, res = bench(strategy, w, scalars, affine)
+                coords = [(q.x, q.y) for q in res]
+                if expected is None: expected = coords
+                assert coords == expected, f'{strategy} disagrees with double-and-add'
+                name = 'affine' if affine else 'jacobian'
+                print(f'| {strategy:<14} | {w} | {name:<8} | {1000 * elapsed / num:11.3f} |')
+    print('+----------------+---+----------+-------------+')
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -2,11 +2,11 @@
 Digital signatures
 """
 
-from utils import *
-from modular import Mod
-from hashlib import sha256
-from elliptic_curve import Weierstrass, Montgomery, Point
-from secrets import SystemRandom, token_hex
+from modular import mod_context
+from hashlib import sha256, sha512
+from elliptic_curve import Weierstrass, Montgomery, TwistedEdwards, Point, INFINITY
+from scalar_mult import FixedBase
+from secrets import SystemRandom, token_bytes, token_hex
 from typing import Annotated, Union
 
 # TODO
@@ -25,19 +25,32 @@ class BasedEC:
 
     - `curve`
     - `base`
+    - `w`: window width of the fixed-base table, `(bits / w) * (2^w - 1)` points
+    - `order`: order of `base` if known, e.g. a standardized curve, computed otherwise
     """
 
     # TODO
     # - Weierstrass
     #   - check discriminant
-    def __init__(self, curve: Union[Montgomery, Weierstrass], base: Point):
-        self.base = Point(-1, -1)
+    def __init__(self, curve: Union[Montgomery, Weierstrass, TwistedEdwards], base: Point, w: int = 4, order: int = 0):
+        _, _, n = curve.form
+        self.base = INFINITY
+        self.w = w
+        self._table = None
+        self._iso = None
+        self._order = order
         if type(curve) == Weierstrass:
             if curve.check(base):
                 self.base = base
             else:
                 self.base = curve.points_n(1)[1]
             self.curve = curve
+        if type(curve) == TwistedEdwards:
+            if curve.check(base):
+                self.base = base
+            else:
+                self.base = curve.points_n(1, 1)[0]
+            self.curve = curve
         if type(curve) == Montgomery:
             if curve.check(base):
                 self.base = base
@@ -49,9 +62,48 @@ class BasedEC:
                     self.base = curve.points_n(1, x)[1]
                     checked.append(x)
                     x = (x + 1) % n
-                if self.base == Point(-1, -1):
+                if self.base.is_infinity():
                     raise ValueError(f'Only point at infinity... something is wrong with {curve, type(curve)}')
 
+    def order(self) -> int:
+        """
+        Order of the subgroup generated by `base`, memoized
+        """
+        if not self._order:
+            self._order = self.curve.point_order(self.base)
+        return self._order
+
+    def table(self) -> Union[FixedBase, None]:
+        """
+        Fixed-base table for `base`, built on first use
+
+        Projective coordinates for the table entries, Jacobian or extended.
+        Montgomery curves have no projective addition, their table lives on
+        the isomorphic Weierstrass curve, see `Montgomery.to_weierstrass`
+        """
+        if self._table is None:
+            curve, base = self.curve, self.base
+            if type(curve) == Montgomery:
+                try:
+                    self._iso = curve.to_weierstrass()
+                except ValueError:
+                    return None
+                curve, base = self._iso.target, self._iso.map(base)
+            _, _, n = curve.form
+            group = curve.extended() if type(curve) == TwistedEdwards else curve.jacobian()
+            self._table = FixedBase(group, base, n.bit_length(), self.w, group.normalize)
+        return self._table
+
+    def mult(self, k: int) -> Point:
+        """
+        Fixed-base scalar multiplication `k * base`
+        """
+        table = self.table()
+        if table is None or k < 0 or k.bit_length() > table.bits:
+            return self.curve.scalar_mult(k, self.base)
+        q = table.group.to_affine(table.mult(k))
+        return self._iso.unmap(q) if self._iso else q
+
 class Key:
     """
     Elliptic curve key pair generation
@@ -62,11 +114,8 @@ class Key:
         Generate a key pair for the curve
         """
         gen = SystemRandom()
-        a, b, n = bc.curve.form
-        base = bc.base
-        curve = Weierstrass(a, b, n)
-        sk = gen.randint(2, n - 1)
-        return sk, curve.scalar_mult(sk, base)
+        sk = gen.randint(1, bc.order() - 1)
+        return sk, bc.mult(sk)
 
     def __init__(self, bc: BasedEC):
         sk, pk = Key.gen(self, bc)
@@ -81,12 +130,13 @@ class ECDSA:
     def __init__(self, curve: BasedEC, key: Key, hash = sha256()):
         self.key = key
         self.hash = hash
+        self.bc = curve
         self.base = curve.base
         self.curve = curve.curve
 
     class Signature:
         """
-        ECDSA signature
+        ECDSA signature, `x` is the x-coordinate of `k * base` modulo the order of `base`
         """
         def __init__(self, x: int, s: int):
             self.x = x
@@ -94,18 +144,18 @@ class ECDSA:
 
     # sign
     def sign(self, msg: str) -> Signature:
-        a, b, n = self.curve.form
-        if type(self.curve) == Weierstrass:
-            curve = Weierstrass(a, b, n)
-        else:
-            curve = Montgomery(a, b, n)
-        m = self.hash
+        q = self.bc.order()
+        mod = mod_context(q)
+        m = self.hash.copy()
         m.update(msg.encode('utf-8'))
-        h = int(m.hexdigest(), 16) % n
-        k = int(token_hex(32), 16) % n
-        x = curve.scalar_mult(k, self.base).x
-        s = (Mod(n).inverse(k) * (h + x * self.key.sk)) % n
-        return ECDSA.Signature(x, s)
+        h = int(m.hexdigest(), 16) % q
+        while True:
+            k = int(token_hex(32), 16) % q
+            kinv = mod.inverse(k) if k else 0
+            if not kinv: continue
+            x = self.bc.mult(k).x % q
+            s = (kinv * (h + x * self.key.sk)) % q
+            if x and mod.inverse(s): return ECDSA.Signature(x, s)
 
     def sign_msg(self, msg: str) -> tuple[str, Signature]:
         return msg, ECDSA.sign(self, msg)
@@ -114,30 +164,128 @@ class ECDSA:
     def verify(self, msg: str, sig: Signature) -> bool:
         x, s = sig.x, sig.s
         curve = self.curve
-        a, b, n = curve.form
+        q = self.bc.order()
+        if not (0 < x < q and 0 < s < q): return False
         base = self.base
-        m = self.hash
+        m = self.hash.copy()
         m.update(msg.encode('utf-8'))
-        h = int(m.hexdigest(), 16) % n
-        c = Mod(n).inverse(s)
-        add, smult = curve.add, curve.scalar_mult
-        rx = add(smult((h * c) % n, base), smult((x * c) % n, self.key.pk)).x
-        return x == rx
+        h = int(m.hexdigest(), 16) % q
+        c = mod_context(q).inverse(s)
+        r = curve.multi_scalar_mult([(h * c) % q, (x * c) % q], [base, self.key.pk])
+        return not r.is_infinity() and x == r.x % q
 
 # EdDSA (Ed25519)
-# Edward's twisted curve
-# - Curve25519
+# twisted Edwards curve edwards25519, birationally equivalent to Curve25519
+# -x^2 + y^2 = 1 + d*x^2*y^2 (mod 2^255 - 19), d = -121665/121666
 # - SHA-512
-# - a = 0, b = 0
-# - p = 2**255 - 19
-# - base = (9, ...)
-# - base generates a cyclic subgroup of prime order 2**252 + 27742317777372353535851937790883648493
+# - base = (..., 4/5)
+# - base generates a cyclic subgroup of prime order 2^252 + 27742317777372353535851937790883648493
+# see `key_exchange` for X25519 key agreement on Curve25519
 
-# Curve25519 is given in Montgomery form
-# y**2 = x**3 + 4866612*x**2 + x (mod 2**255 - 19)
-curve25519 = (0, 0, 0, 0)
+p25519 = 2 ** 255 - 19
+edwards25519 = TwistedEdwards(-1 % p25519, -121665 * pow(121666, -1, p25519) % p25519, p25519)
+ed25519 = BasedEC(
+    edwards25519,
+    Point(15112221349535400772501151409588531511454012693041857206046113283949847762202, 4 * pow(5, -1, p25519) % p25519),
+    order=2 ** 252 + 27742317777372353535851937790883648493)
 
-# TODO
+class Ed25519:
+    """Ed25519 signatures (RFC 8032)
+
+    - private key: 32 random bytes
+    - public key: 32 bytes, encoded point `s * base`
+    - signature: 64 bytes, `R || S` with deterministic nonce `r`
+
+    Signing runs on the fixed-base table of `ed25519`, verification is
+    one double-scalar multiplication `S*B - k*A` in extended coordinates
+    """
+
+    def gen(self) -> bytes:
+        """
+        Generate a private key
+        """
+        return token_bytes(32)
+
+    def encode_point(self, p: Point) -> bytes:
+        """
+        32 bytes: little-endian y-coordinate, top bit is the sign of x
+        """
+        return (p.y | (p.x & 1) << 255).to_bytes(32, 'little')
+
+    def decode_point(self, b: bytes) -> Union[Point, None]:
+        """
+        Inverse of `encode_point`, `None` if `b` encodes no curve point
+        """
+        if len(b) != 32: return None
+        y = int.from_bytes(b, 'little')
+        sign, y = y >> 255, y & ((1 << 255) - 1)
+        if y >= p25519: return None
+        _, d, _ = edwards25519.form
+        mod = mod_context(p25519)
+        xs = mod.sqrt_prime((y * y - 1) * mod.inverse((d * y * y + 1) % p25519))
+        if not xs or (xs[0] == 0 and sign): return None
+        x = xs[0] if xs[0] & 1 == sign else xs[-1]
+        return Point(x, y)
+
+    def expand(self, sk: bytes) -> tuple[int, bytes]:
+        """
+        Clamped secret scalar and nonce prefix from the hashed private key
+        """
+        if len(sk) != 32: raise ValueError(f'Expect 32-byte private key, got {len(sk)} bytes')
+        h = sha512(sk).digest()
+        s = bytearray(h[:32])
+        s[0] &= 248
+        s[31] &= 127
+        s[31] |= 64
+        return int.from_bytes(s, 'little'), h[32:]
+
+    def challenge(self, r: bytes, pk: bytes, msg: bytes) -> int:
+        """
+        `SHA-512(R || A || msg)` modulo the base point order
+        """
+        return int.from_bytes(sha512(r + pk + msg).digest(), 'little') % ed25519.order()
+
+    def public_key(self) -> bytes:
+        """
+        Public key `s * base`
+        """
+        s, _ = self.expand(self.sk)
+        return self.encode_point(ed25519.mult(s))
+
+    def sign(self, msg: Union[str, bytes]) -> bytes:
+        """
+        64-byte signature `R || S` of `msg`
+        """
+        if isinstance(msg, str): msg = msg.encode('utf-8')
+        q = ed25519.order()
+        s, prefix = self.expand(self.sk)
+        r = int.from_bytes(sha512(prefix + msg).digest(), 'little') % q
+        R = self.encode_point(ed25519.mult(r))
+        S = (r + self.challenge(R, self.pk, msg) * s) % q
+        return R + S.to_bytes(32, 'little')
+
+    def verify(self, msg: Union[str, bytes], sig: bytes, pk: bytes = b'') -> bool:
+        """
+        Check `sig` on `msg` against `pk`, by default the own public key
+
+        Accept iff `S*B - k*A` encodes to `R`
+        """
+        if isinstance(msg, str): msg = msg.encode('utf-8')
+        pk = pk or self.pk
+        q = ed25519.order()
+        if len(sig) != 64: return False
+        R, S = sig[:32], int.from_bytes(sig[32:], 'little')
+        A = self.decode_point(pk)
+        if A is None or S >= q: return False
+        k = self.challenge(R, pk, msg)
+        r = edwards25519.multi_scalar_mult([S, k], [ed25519.base, edwards25519.neg(A)])
+        return self.encode_point(r) == R
+
+    def __init__(self, sk: bytes = b''):
+        if not sk:
+            sk = self.gen()
+        self.sk = sk
+        self.pk = self.public_key()
 
 # Schnorr
 
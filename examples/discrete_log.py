@@ -0,0 +1,135 @@
+"""
+Discrete logarithms
+
+Solve `k*g = h` for `k` in the cyclic group generated by `g`, given its order
+
+- baby-step giant-step: `O(sqrt(q))` group operations and memory,
+  the table is capped at `max_table` entries
+- Pollard rho: `O(sqrt(q))` group operations, `O(1)` memory, for prime `q`
+- Pohlig-Hellman: one small log per prime factor of the order, combined by the CRT
+
+Each algorithm only relies on the group interface of `scalar_mult` and on
+hashable elements, so it works for `Z/nZ` units and curve points alike
+"""
+
+from math import isqrt, prod
+from modular import factor
+from scalar_mult import scalar_mult
+from secrets import randbelow
+from typing import Any, Callable, Union
+
+# default cap on the entries of a baby-step table
+MAX_TABLE = 1 << 20
+
+# number of multipliers in the r-adding walk of Pollard rho
+WALK_SIZE = 20
+
+def mult(group: Any, k: int, p: Any) -> Any:
+    """
+    `k*p` for any integer `k`
+    """
+    if k < 0: return group.neg(scalar_mult(group, -k, p))
+    return scalar_mult(group, k, p)
+
+def crt(residues: list[int], moduli: list[int]) -> int:
+    """
+    Smallest `x >= 0` with `x = r (mod m)` for pairwise coprime moduli
+    """
+    n = prod(moduli)
+    return sum(r * (n // m) * pow(n // m, -1, m) for r, m in zip(residues, moduli)) % n
+
+def bsgs(group: Any, g: Any, h: Any, order: int, max_table: int = MAX_TABLE) -> Union[int, None]:
+    """
+    Baby-step giant-step: smallest `0 <= k < order` with `k*g = h`
+
+    Baby steps `j*g` for `j < m` go into a table, giant steps `h - i*m*g`
+    are looked up in it, `m = min(ceil(sqrt(order)), max_table)`. A capped
+    table only costs more giant steps
+
+    Return None if `h` is not a multiple of `g`
+    """
+    m = min(isqrt(order - 1) + 1, max_table)
+    table = {}
+    p = group.identity()
+    for j in range(m):
+        table.setdefault(p, j)
+        p = group.add(p, g)
+    giant = group.neg(p)
+    for i in range(-(-order // m)):
+        if h in table: return i * m + table[h]
+        h = group.add(h, giant)
+    return None
+
+def rho(group: Any, g: Any, h: Any, order: int, retries: int = 8) -> Union[int, None]:
+    """
+    Pollard rho for a prime `order`: `k` with `k*g = h`
+
+    Teske's r-adding walk `x -> x + M[hash(x) % r]` with random
+    `M[i] = a[i]*g + b[i]*h`, so each step is one addition and keeps
+    `x = a*g + b*h`. Brent's cycle detection compares with a saved point,
+    renewed at powers of 2. A collision `a*g + b*h = a'*g + b'*h` gives
+    `k = (a - a') / (b' - b) (mod order)`
+
+    Return None if no walk finds the log within `retries` attempts
+    """
+    if h == group.identity(): return 0
+    for _ in range(retries):
+        coeffs = [(randbelow(order), randbelow(order)) for _ in range(WALK_SIZE)]
+        steps = [group.add(mult(group, a, g), mult(group, b, h)) for a, b in coeffs]
+        a, b = randbelow(order), randbelow(order)
+        x = group.add(mult(group, a, g), mult(group, b, h))
+        saved, sa, sb = x, a, b
+        power, length = 1, 0
+        while True:
+            i = hash(x) % WALK_SIZE
+            x = group.add(x, steps[i])
+            a, b = (a + coeffs[i][0]) % order, (b + coeffs[i][1]) % order
+            length += 1
+            if x == saved: break
+            if length == power:
+                saved, sa, sb = x, a, b
+                power, length = 2 * power, 0
+        if (sb - b) % order:
+            k = (a - sa) * pow(sb - b, -1, order) % order
+            if mult(group, k, g) == h: return k
+    return None
+
+def prime_log(group: Any, g: Any, h: Any, q: int, max_table: int = MAX_TABLE) -> Union[int, None]:
+    """
+    `k` with `k*g = h` for `g` of prime order `q`
+
+    Baby-step giant-step while its table fits in `max_table`, Pollard rho beyond
+    """
+    if isqrt(q) < max_table:
+        return bsgs(group, g, h, q, max_table)
+    return rho(group, g, h, q)
+
+def pohlig_hellman(group: Any, g: Any, h: Any, order: int, factors: Union[dict[int, int], None] = None, max_table: int = MAX_TABLE, solver: Union[Callable, None] = None) -> Union[int, None]:
+    """
+    Smallest `0 <= k < order` with `k*g = h`, `order` the order of `g`
+
+    For each prime power `q^e` of the order, the log modulo `q^e` is found
+    digit by digit in the subgroup of order `q`, so the cost is dominated by
+    `sqrt` of the largest prime factor. `factors` is `{q: e}`, by default `factor(order)`.
+    `solver(group, g, h, q)` replaces `prime_log` for the subgroups of prime order
+
+    Return None if `h` is not a multiple of `g`
+    """
+    if factors is None: factors = factor(order)
+    residues, moduli = [], []
+    for q, e in factors.items():
+        qe = q ** e
+        gq, hq = mult(group, order // qe, g), mult(group, order // qe, h)
+        gamma = mult(group, qe // q, gq)
+        k = 0
+        for i in range(e):
+            # strip the known digits, then project onto the subgroup of order q
+            hi = mult(group, q ** (e - 1 - i), group.add(hq, mult(group, -k, gq)))
+            if solver: d = solver(group, gamma, hi, q)
+            else: d = prime_log(group, gamma, hi, q, max_table)
+            if d is None: return None
+            k += d * q ** i
+        residues.append(k)
+        moduli.append(qe)
+    k = crt(residues, moduli)
+    return k if mult(group, k, g) == h else None
@@ -3,18 +3,144 @@ Elliptic curves
 
 - Weierstrass form
 - Montgomery form
+- twisted Edwards form, with birational maps between the three forms
+
+Scalar multiplication runs in projective coordinates
+
+- Jacobian `(X, Y, Z)` for Weierstrass curves
+- `(X : Z)` for Montgomery curves
+- extended `(X, Y, Z, T)` for twisted Edwards curves
+
+so a whole scalar multiplication needs a single field inversion
 """
 
-from modular import Mod
-from typing import Annotated, Union
+from modular import mod_context, is_prime, factor
+from abc import ABC, abstractmethod
+from array import array
+from itertools import islice
+from math import isqrt, lcm
+from schoof import schoof, roots_poly
+from scalar_mult import scalar_mult, multi_scalar_mult, strategies
+from secrets import SystemRandom
+from typing import Annotated, Iterable, Iterator, Union
+
+# projective coordinates
+jacobian = Annotated[tuple[int, int, int], 'Jacobian coordinates (X, Y, Z)']
+xz = Annotated[tuple[int, int], 'Montgomery coordinates (X : Z)']
+extended = Annotated[tuple[int, int, int, int], 'Extended twisted Edwards coordinates (X, Y, Z, T)']
 
 class Point:
     """
     Point on an elliptic curve
+
+    Immutable, compared and hashed by value. The point at infinity,
+    represented by (-1, -1), is the singleton `INFINITY`
     """
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
+
+    __slots__ = ('x', 'y')
+    _infinity = None
+
+    def __new__(cls, x: int, y: int):
+        if x == -1 and y == -1 and cls._infinity is not None:
+            return cls._infinity
+        p = object.__new__(cls)
+        object.__setattr__(p, 'x', x)
+        object.__setattr__(p, 'y', y)
+        return p
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Point is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Point is immutable')
+
+    def __reduce__(self):
+        return Point, (self.x, self.y)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Point): return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
+    def __iter__(self) -> Iterator[int]:
+        yield self.x
+        yield self.y
+
+    def __repr__(self) -> str:
+        return f'Point({self.x}, {self.y})'
+
+    def is_infinity(self) -> bool:
+        """
+        Check if this is the point at infinity, represented by (-1, -1)
+        """
+        return self is INFINITY
+
+# the point at infinity
+INFINITY = Point._infinity = Point(-1, -1)
+
+class PointBatch:
+    """
+    Batch of points stored as two contiguous coordinate arrays `xs` and `ys`
+
+    Coordinates live in `array('q')` while they fit in a signed 64-bit int,
+    otherwise in lists of ints. Indexing builds `Point`s on demand
+    """
+
+    def __init__(self, points: Iterable[Point] = ()):
+        self.xs = array('q')
+        self.ys = array('q')
+        self.extend(points)
+
+    @classmethod
+    def from_coords(cls, xs: Iterable[int], ys: Iterable[int]) -> 'PointBatch':
+        """
+        Batch from separate x and y coordinates
+        """
+        batch = cls()
+        for x, y in zip(xs, ys):
+            batch.append(Point(x, y))
+        return batch
+
+    def append(self, p: Point):
+        """
+        Add a point at the end
+        """
+        try:
+            self.xs.append(p.x)
+            self.ys.append(p.y)
+        except OverflowError:
+            # big coordinates, fall back to lists
+            if len(self.ys) < len(self.xs): self.xs.pop()
+            self.xs, self.ys = list(self.xs), list(self.ys)
+            self.xs.append(p.x)
+            self.ys.append(p.y)
+
+    def extend(self, points: Iterable[Point]):
+        """
+        Add points at the end
+        """
+        for p in points:
+            self.append(p)
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Point, 'PointBatch']:
+        if isinstance(i, slice):
+            return PointBatch.from_coords(self.xs[i], self.ys[i])
+        return Point(self.xs[i], self.ys[i])
+
+    def __iter__(self) -> Iterator[Point]:
+        return map(Point, self.xs, self.ys)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PointBatch): return NotImplemented
+        return list(self.xs) == list(other.xs) and list(self.ys) == list(other.ys)
+
+    def __repr__(self) -> str:
+        return f'PointBatch({list(self)})'
 
 class Weierstrass:
     """
@@ -36,11 +162,21 @@ class Weierstrass:
     # --- methods ---
     # ---------------
 
-    def __init__(self, a: a_coeff, b: b_coeff, n: modulus):
+    def __init__(self, a: a_coeff, b: b_coeff, n: modulus, strategy: str = 'wnaf', w: int = 4):
         """
         Initialize a Weierstrass curve
+
+        `strategy` and `w` select the scalar multiplication method, see `scalar_mult`
         """
+        if strategy not in strategies:
+            raise ValueError(f'Unknown scalar multiplication strategy: {strategy}')
         self.form = a, b, n
+        self.strategy = strategy
+        self.w = w
+        self._jacobian = None
+        self._prime = None
+        self._order = None
+        self._conversions = {}
 
     def f(self, x: int):
         """
@@ -56,6 +192,32 @@ class Weierstrass:
         _, _, n = self.form
         return p.y ** 2 % n == self.f(p.x)
 
+    def roots(self, x: int) -> list[int]:
+        """
+        Sorted y-coordinates of the points with x-coordinate `x`
+
+        Legendre test and Tonelli-Shanks when `n` is an odd prime
+        """
+        _, _, n = self.form
+        mod = mod_context(n)
+        if self._prime is None:
+            self._prime = n > 2 and is_prime(n)
+        if self._prime:
+            return mod.sqrt_prime(self.f(x))
+        return mod.sqrt(self.f(x))
+
+    def iter_points(self, lower: int = 0, *upper) -> Iterator[Point]:
+        """
+        Stream the affine points with `lower <= x < upper`, ordered by `(x, y)`
+
+        One evaluation of `f` and one square root per x
+        """
+        _, _, n = self.form
+        upper = upper[0] if upper else n
+        for x in range(lower, upper):
+            for y in self.roots(x):
+                yield Point(x, y)
+
     def points(self, *debug) -> list[Point]:
         """
         Return the list of all points on the elliptic
@@ -65,15 +227,11 @@ class Weierstrass:
 
         Includes the point at infinity, represented by (-1, -1)
 
-        Inefficient implementation: use only on small fields
+        `O(n log n)` for prime `n`, use `iter_points` to stop early
         """
         a, b, n = self.form
-        pts = [Point(-1, -1)]
-        for x in range(0, n):
-            for y in range(0, n):
-                p = Point(x, y)
-                if self.check(p):
-                    pts.append(p)
+        pts = [INFINITY]
+        pts.extend(self.iter_points())
         if debug:
             print('+--------------------------------------------')
             print(f'+ Points of y^2 = x^3 + {a}x + {b} (mod {n})')
@@ -84,43 +242,55 @@ class Weierstrass:
     def points_n(self, k: int, lower: int = 0, *upper) -> list[Point]:
         """
         Find k points on the curve given `lower` and/or `upper` bound(s)
+        on their x-coordinates
 
         Includes the point at infinity, represented by (-1, -1)
         """
-        _, _, n = self.form
-        pts = [Point(-1, -1)]
-        upper = upper[0] if upper else n
-        lower = lower
-        count = 0
-        while count < k and lower < upper:
-            for y in range(lower, upper):
-                p = Point(lower, y)
-                if self.check(p):
-                    count += 1
-                    pts.append(p)
-            lower += 1
+        pts = [INFINITY]
+        pts.extend(islice(self.iter_points(lower, *upper), k))
         return pts
 
+    def identity(self) -> Point:
+        """
+        Point at infinity, the identity of the group law
+        """
+        return INFINITY
+
+    def neg(self, p: Point) -> Point:
+        """
+        Additive inverse of `p`
+        """
+        if p.is_infinity(): return p
+        _, _, n = self.form
+        return Point(p.x, -p.y % n)
+
     def add(self, p: Point, q: Point) -> Point:
         """
         Elliptic curve point addition (Weierstrass form)
         """
         a, _, n = self.form
+        # identity rules
+        if p.is_infinity(): return q
+        if q.is_infinity(): return p
         # coordinates
         x1, y1 = p.x, p.y
         x2, y2 = q.x, q.y
-        # identity and inverse rules
-        if x1 == x2 and y1 == -y2: return Point(-1, -1)
-        if p == Point(-1, -1): return q
-        if q == Point(-1, -1): return p
+        # inverse rule
+        if (x1 - x2) % n == 0 and (y1 + y2) % n == 0: return INFINITY
         # otherwise
-        mod = Mod(n)
-        lam = ((3 * x1 ** 2 + a) * mod.inverse(2 * y1)
-            if p == q else (y2 - y1) * mod.inverse(x2 - x1))
+        mod = mod_context(n)
+        lam = ((3 * x1 ** 2 + a) * mod.inverse(2 * y1 % n)
+            if (x1 - x2) % n == 0 else (y2 - y1) * mod.inverse((x2 - x1) % n))
         x3 = (lam ** 2 - x1 - x2) % n
         y3 = (lam * (x1 - x3) - y1) % n
         return Point(x3, y3)
 
+    def double(self, p: Point) -> Point:
+        """
+        Elliptic curve point doubling (Weierstrass form)
+        """
+        return self.add(p, p)
+
     def safe_add(self, p: Point, q: Point) -> Union[Point, None]:
         """
         Check that the points are on the curve before adding
@@ -128,16 +298,337 @@ class Weierstrass:
         if self.check(p) and self.check(q):
             return self.add(p, q)
 
+    def batch_add(self, ps: Iterable[Point], qs: Iterable[Point]) -> list[Point]:
+        """
+        Pairwise sums `p_i + q_i`, one inversion shared by the whole batch
+        """
+        a, _, n = self.form
+        pairs = list(zip(ps, qs))
+        res = [INFINITY] * len(pairs)
+        idx, nums, dens = [], [], []
+        for i, (p, q) in enumerate(pairs):
+            if p.is_infinity(): res[i] = q
+            elif q.is_infinity(): res[i] = p
+            elif (p.x - q.x) % n:
+                idx.append(i)
+                nums.append(q.y - p.y)
+                dens.append(q.x - p.x)
+            elif (p.y + q.y) % n:
+                idx.append(i)
+                nums.append(3 * p.x * p.x + a)
+                dens.append(2 * p.y)
+        for i, num, inv in zip(idx, nums, mod_context(n).batch_inverse(dens)):
+            (x1, y1), (x2, _) = pairs[i]
+            lam = num * inv % n
+            x3 = (lam * lam - x1 - x2) % n
+            res[i] = Point(x3, (lam * (x1 - x3) - y1) % n)
+        return res
+
+    def batch_normalize(self, ps: Iterable[Union[jacobian, Point]]) -> list[Point]:
+        """
+        Jacobian to affine coordinates for a batch of points, one inversion
+        """
+        return self.jacobian().normalize(ps)
+
+    def order(self) -> int:
+        """
+        Number of points on the curve, including the point at infinity
+
+        Memoized. For prime `n`
+
+        - `n < 2^16` or singular curves: sum of Legendre symbols
+        - `n < 2^64`: Mestre's baby-step giant-step
+        - otherwise: Schoof's algorithm
+
+        Other moduli count `points()`
+        """
+        if self._order is None:
+            a, b, n = self.form
+            if n <= 3 or not is_prime(n):
+                self._order = len(self.points())
+            elif n < 2 ** 16 or (4 * a ** 3 + 27 * b ** 2) % n == 0:
+                mod = mod_context(n)
+                self._order = n + 1 + sum(mod.legendre(self.f(x)) for x in range(n))
+            elif n < 2 ** 64:
+                self._order = self.mestre()
+            else:
+                self._order = schoof(a, b, n)
+        return self._order
+
+    def random_point(self) -> Point:
+        """
+        Uniformly random x-coordinate with a point on the curve
+        """
+        _, _, n = self.form
+        while True:
+            x = SystemRandom().randint(0, n - 1)
+            ys = self.roots(x)
+            if ys: return Point(x, SystemRandom().choice(ys))
+
+    def bsgs_multiple(self, p: Point) -> int:
+        """
+        A positive multiple `m` of the order of `p` with `m*p = O`, in
+        or near the Hasse interval `n + 1 +/- 2*sqrt(n)`, by baby-step giant-step
+
+        `O(n^(1/4))` group operations and memory
+        """
+        _, _, n = self.form
+        lo = n + 1 - isqrt(4 * n)
+        m = isqrt(2 * isqrt(4 * n)) + 1
+        # baby steps: x(jP) -> (j, y(jP))
+        baby = {}
+        r = self.identity()
+        for j in range(1, m + 1):
+            r = self.add(r, p)
+            if r.is_infinity(): return j
+            baby.setdefault(r.x, (j, r.y))
+        # giant steps: (lo + i*m)P = -jP or jP
+        q = self.scalar_mult(lo, p)
+        for i in range(m + 1):
+            if q.is_infinity(): return lo + i * m
+            if q.x in baby:
+                j, y = baby[q.x]
+                return lo + i * m + (j if y != q.y else -j)
+            q = self.add(q, r)
+        raise ArithmeticError(f'No multiple of the order of ({p.x}, {p.y}) in the Hasse interval')
+
+    def point_order(self, p: Point, multiple: int = 0) -> int:
+        """
+        Order of `p`, stripping prime factors from a known `multiple`
+        of it, by default the group order
+        """
+        o = multiple or self.order()
+        for q, e in factor(o).items():
+            for _ in range(e):
+                if not self.scalar_mult(o // q, p).is_infinity(): break
+                o //= q
+        return o
+
+    def mestre(self) -> int:
+        """
+        Group order by Mestre's method, `n > 229` prime
+
+        Orders of random points on the curve and on its quadratic twist
+        `y^2 = x^3 + a*g^2*x + b*g^3` narrow the Hasse interval down to a
+        single candidate, using `#E + #E' = 2n + 2`
+        """
+        a, b, n = self.form
+        mod = mod_context(n)
+        g = 2
+        while mod.legendre(g) != -1:
+            g += 1
+        twist = Weierstrass(a * g * g, b * g ** 3, n)
+        lo, hi = n + 1 - isqrt(4 * n), n + 1 + isqrt(4 * n)
+        l, lt = 1, 1
+        while True:
+            p = self.random_point()
+            l = lcm(l, self.point_order(p, self.bsgs_multiple(p)))
+            p = twist.random_point()
+            lt = lcm(lt, twist.point_order(p, twist.bsgs_multiple(p)))
+            step = max(l, lt)
+            if (hi - lo) // step > 10 ** 5: continue
+            if l >= lt:
+                cands = [N for N in range(-(-lo // l) * l, hi + 1, l) if (2 * n + 2 - N) % lt == 0]
+            else:
+                cands = [2 * n + 2 - N for N in range(-(-lo // lt) * lt, hi + 1, lt) if (2 * n + 2 - N) % l == 0]
+            if len(cands) == 1: return cands[0]
+
+    def to_montgomery(self) -> 'Isomorphism':
+        """
+        Birational map to Montgomery form, see `WeierstrassToMontgomery`
+
+        Memoized, raise `ValueError` if the curve has no Montgomery form
+        """
+        if 'montgomery' not in self._conversions:
+            self._conversions['montgomery'] = WeierstrassToMontgomery(self)
+        return self._conversions['montgomery']
+
+    def to_edwards(self, a: int = 0) -> 'Isomorphism':
+        """
+        Birational map to twisted Edwards form through Montgomery form,
+        see `Montgomery.to_edwards`
+
+        Memoized, raise `ValueError` if the curve has no such form
+        """
+        key = 'edwards', a
+        if key not in self._conversions:
+            to_mont = self.to_montgomery()
+            self._conversions[key] = Composite(to_mont, to_mont.target.to_edwards(a))
+        return self._conversions[key]
+
+    def jacobian(self) -> 'Jacobian':
+        """
+        Jacobian coordinate arithmetic on this curve
+        """
+        if self._jacobian is None:
+            self._jacobian = Jacobian(self)
+        return self._jacobian
+
     def scalar_mult(self, k: int, p: Point) -> Point:
         """
-        Scalar multiplication
+        Scalar multiplication using the curve's strategy
+
+        Runs in Jacobian coordinates, one inversion for the affine result
         """
-        if k == 0: return Point(-1, -1)
-        if k == 1: return p
-        if k > 1:
-            return self.add(p, self.scalar_mult(k - 1, p))
-        else:
+        if k < 0:
             raise ValueError(f'Expect element of Z/nZ, got: {k}')
+        jac = self.jacobian()
+        return jac.to_affine(scalar_mult(jac, k, p, self.strategy, self.w))
+
+    def multi_scalar_mult(self, scalars: list[int], points: list[Point]) -> Point:
+        """
+        Linear combination `k1*P1 + ... + km*Pm`, see `scalar_mult.multi_scalar_mult`
+
+        Runs in Jacobian coordinates, one inversion for the affine result
+        """
+        jac = self.jacobian()
+        return jac.to_affine(multi_scalar_mult(jac, scalars, points, strategy=self.strategy, w=self.w))
+
+class Jacobian:
+    """
+    Jacobian coordinates for a Weierstrass curve
+
+    `(X, Y, Z)` represents the affine point `(X/Z^2, Y/Z^3)`, the
+    point at infinity has `Z = 0`. Affine `Point`s are accepted
+    wherever a Jacobian point is expected, the second argument of `add`
+    uses mixed addition.
+
+    Formulas: https://hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html
+    """
+
+    def __init__(self, curve: Weierstrass):
+        self.curve = curve
+        a, _, n = curve.form
+        self.a = a % n
+        self.n = n
+
+    def identity(self) -> jacobian:
+        """
+        Point at infinity
+        """
+        return 1, 1, 0
+
+    def from_affine(self, p: Point) -> jacobian:
+        """
+        Affine to Jacobian coordinates
+        """
+        if p.is_infinity(): return self.identity()
+        return p.x, p.y, 1
+
+    def to_affine(self, p: Union[jacobian, Point]) -> Point:
+        """
+        Jacobian to affine coordinates, one inversion
+        """
+        if isinstance(p, Point): return p
+        n = self.n
+        x, y, z = p
+        if z % n == 0: return INFINITY
+        zinv = mod_context(n).inverse(z)
+        zinv2 = zinv * zinv % n
+        return Point(x * zinv2 % n, y * zinv2 * zinv % n)
+
+    def normalize(self, ps: Iterable[Union[jacobian, Point]]) -> list[Point]:
+        """
+        Jacobian to affine coordinates for a batch of points, one inversion
+        """
+        n = self.n
+        ps = list(ps)
+        zs = [p[2] for p in ps if not isinstance(p, Point) and p[2] % n]
+        invs = iter(mod_context(n).batch_inverse(zs))
+        res = []
+        for p in ps:
+            if isinstance(p, Point):
+                res.append(p)
+            elif p[2] % n == 0:
+                res.append(INFINITY)
+            else:
+                zinv = next(invs)
+                zinv2 = zinv * zinv % n
+                res.append(Point(p[0] * zinv2 % n, p[1] * zinv2 * zinv % n))
+        return res
+
+    def neg(self, p: Union[jacobian, Point]) -> Union[jacobian, Point]:
+        """
+        Additive inverse
+        """
+        if isinstance(p, Point): return self.curve.neg(p)
+        x, y, z = p
+        return x, -y % self.n, z
+
+    def double(self, p: Union[jacobian, Point]) -> jacobian:
+        """
+        Point doubling, dbl-2007-bl
+        """
+        if isinstance(p, Point): p = self.from_affine(p)
+        n = self.n
+        x1, y1, z1 = p
+        if z1 == 0: return p
+        xx = x1 * x1 % n
+        yy = y1 * y1 % n
+        yyyy = yy * yy % n
+        zz = z1 * z1 % n
+        s = 2 * ((x1 + yy) ** 2 - xx - yyyy) % n
+        m = (3 * xx + self.a * zz * zz) % n
+        x3 = (m * m - 2 * s) % n
+        y3 = (m * (s - x3) - 8 * yyyy) % n
+        z3 = ((y1 + z1) ** 2 - yy - zz) % n
+        return x3, y3, z3
+
+    def add(self, p: Union[jacobian, Point], q: Union[jacobian, Point]) -> jacobian:
+        """
+        Point addition, add-2007-bl
+
+        Mixed addition, madd-2007-bl, when `q` is an affine `Point`
+        """
+        if isinstance(p, Point): p = self.from_affine(p)
+        if isinstance(q, Point): return self.add_mixed(p, q)
+        n = self.n
+        x1, y1, z1 = p
+        x2, y2, z2 = q
+        if z1 == 0: return q
+        if z2 == 0: return p
+        z1z1 = z1 * z1 % n
+        z2z2 = z2 * z2 % n
+        u1 = x1 * z2z2 % n
+        u2 = x2 * z1z1 % n
+        s1 = y1 * z2 * z2z2 % n
+        s2 = y2 * z1 * z1z1 % n
+        h = (u2 - u1) % n
+        if h == 0:
+            return self.double(p) if s1 == s2 else self.identity()
+        i = 4 * h * h % n
+        j = h * i % n
+        r = 2 * (s2 - s1) % n
+        v = u1 * i % n
+        x3 = (r * r - j - 2 * v) % n
+        y3 = (r * (v - x3) - 2 * s1 * j) % n
+        z3 = ((z1 + z2) ** 2 - z1z1 - z2z2) * h % n
+        return x3, y3, z3
+
+    def add_mixed(self, p: jacobian, q: Point) -> jacobian:
+        """
+        Mixed addition of a Jacobian and an affine point, madd-2007-bl
+        """
+        if q.is_infinity(): return p
+        n = self.n
+        x1, y1, z1 = p
+        if z1 == 0: return self.from_affine(q)
+        x2, y2 = q.x, q.y
+        z1z1 = z1 * z1 % n
+        u2 = x2 * z1z1 % n
+        s2 = y2 * z1 * z1z1 % n
+        h = (u2 - x1) % n
+        if h == 0:
+            return self.double(p) if (s2 - y1) % n == 0 else self.identity()
+        hh = h * h % n
+        i = 4 * hh % n
+        j = h * i % n
+        r = 2 * (s2 - y1) % n
+        v = x1 * i % n
+        x3 = (r * r - j - 2 * v) % n
+        y3 = (r * (v - x3) - 2 * y1 * j) % n
+        z3 = ((z1 + h) ** 2 - z1z1 - hh) % n
+        return x3, y3, z3
 
 class Montgomery:
     """
@@ -159,11 +650,23 @@ class Montgomery:
     # --- methods ---
     # ---------------
 
-    def __init__(self, a: a_coeff, b: b_coeff, n: modulus):
+    def __init__(self, a: a_coeff, b: b_coeff, n: modulus, strategy: str = 'ladder', w: int = 4):
         """
         Initialize a new Montgomery
+
+        `strategy` and `w` select the scalar multiplication method, either
+        the `(X : Z)` Montgomery `'ladder'` or one of the affine `scalar_mult`
+        strategies
         """
+        if strategy != 'ladder' and strategy not in strategies:
+            raise ValueError(f'Unknown scalar multiplication strategy: {strategy}')
         self.form = a, b, n
+        self.strategy = strategy
+        self.w = w
+        self._xz = None
+        self._prime = None
+        self._order = None
+        self._conversions = {}
 
     def f(self, x: int) -> int:
         """
@@ -179,6 +682,35 @@ class Montgomery:
         _, b, n = self.form
         return b * p.y ** 2 % n == self.f(p.x)
 
+    def roots(self, x: int) -> list[int]:
+        """
+        Sorted y-coordinates of the points with x-coordinate `x`
+
+        Legendre test and Tonelli-Shanks when `n` is an odd prime
+        """
+        _, b, n = self.form
+        mod = mod_context(n)
+        binv = mod.inverse(b % n) if b % n else 0
+        if not binv:
+            return [y for y in range(n) if self.check(Point(x, y))]
+        if self._prime is None:
+            self._prime = n > 2 and is_prime(n)
+        if self._prime:
+            return mod.sqrt_prime(self.f(x) * binv)
+        return mod.sqrt(self.f(x) * binv)
+
+    def iter_points(self, lower: int = 0, *upper) -> Iterator[Point]:
+        """
+        Stream the affine points with `lower <= x < upper`, ordered by `(x, y)`
+
+        One evaluation of `f` and one square root per x
+        """
+        _, _, n = self.form
+        upper = upper[0] if upper else n
+        for x in range(lower, upper):
+            for y in self.roots(x):
+                yield Point(x, y)
+
     def points(self, *debug) -> list[Point]:
         """
         Return the list of all points on the elliptic
@@ -188,15 +720,11 @@ class Montgomery:
 
         Includes the point at infinity, represented by (-1, -1)
 
-        Inefficient implementation: use only on small fields
+        `O(n log n)` for prime `n`, use `iter_points` to stop early
         """
         a, b, n = self.form
-        pts = [Point(-1, -1)]
-        for x in range(0, n):
-            for y in range(0, n):
-                p = Point(x, y)
-                if self.check(p):
-                    pts.append(p)
+        pts = [INFINITY]
+        pts.extend(self.iter_points())
         if debug:
             print('+-----------------------------------------------')
             print(f'+ Points of {b}y^2 = x^3 + {a}x^2 + x (mod {n})')
@@ -207,47 +735,59 @@ class Montgomery:
     def points_n(self, k: int, lower: int = 0, *upper) -> list[Point]:
         """
         Find k points on the curve given `lower` and/or `upper` bound(s)
+        on their x-coordinates
 
         Includes the point at infinity, represented by (-1, -1)
         """
-        _, _, n = self.form
-        pts = [Point(-1, -1)]
-        upper = upper[0] if upper else n
-        lower = lower
-        count = 0
-        while count < k and lower < upper:
-            for y in range(lower, upper):
-                p = Point(lower, y)
-                if self.check(p):
-                    count += 1
-                    pts.append(p)
-            lower += 1
+        pts = [INFINITY]
+        pts.extend(islice(self.iter_points(lower, *upper), k))
         return pts
 
+    def identity(self) -> Point:
+        """
+        Point at infinity, the identity of the group law
+        """
+        return INFINITY
+
+    def neg(self, p: Point) -> Point:
+        """
+        Additive inverse of `p`
+        """
+        if p.is_infinity(): return p
+        _, _, n = self.form
+        return Point(p.x, -p.y % n)
+
     def add(self, p: Point, q: Point) -> Point:
         """
         Elliptic curve point addition (Montgomery form)
         """
         a, b, n = self.form
+        # identity rules
+        if p.is_infinity(): return q
+        if q.is_infinity(): return p
         # coordinates
         x1, y1 = p.x, p.y
         x2, y2 = q.x, q.y
-        # identity and inverse rules
-        if x1 == x2 and y1 == -y2: return Point(-1, -1)
-        if p == Point(-1, -1): return q
-        if q == Point(-1, -1): return p
+        # inverse rule
+        if (x1 - x2) % n == 0 and (y1 + y2) % n == 0: return INFINITY
         # otherwise
-        mod = Mod(n)
-        m = (y2 - y1) * mod.inverse(x2 - x1) % n
-        if p != q:
+        mod = mod_context(n)
+        if (x1 - x2) % n:
+            m = (y2 - y1) * mod.inverse((x2 - x1) % n) % n
             x3 = (b * m ** 2 - a - x1 - x2) % n
             y3 = (m * (2 * x1 + x2 + a) - b * m ** 3 - y1) % n
         else:
-            l = (3 * x1 ** 2 + 2 * a * x1 + 1) * mod.inverse(2 * b * y1) % n
+            l = (3 * x1 ** 2 + 2 * a * x1 + 1) * mod.inverse(2 * b * y1 % n) % n
             x3 = (b * l ** 2 - a - 2 * x1) % n
             y3 = ((3 * x1 + a) * l - b * l ** 3 - y1) % n
         return Point(x3, y3)
 
+    def double(self, p: Point) -> Point:
+        """
+        Elliptic curve point doubling (Montgomery form)
+        """
+        return self.add(p, p)
+
     def safe_add(self, p: Point, q: Point) -> Union[Point, None]:
         """
         Check that the points are on the curve before adding
@@ -255,15 +795,845 @@ class Montgomery:
         if self.check(p) and self.check(q):
             return self.add(p, q)
 
+    def batch_add(self, ps: Iterable[Point], qs: Iterable[Point]) -> list[Point]:
+        """
+        Pairwise sums `p_i + q_i`, one inversion shared by the whole batch
+        """
+        a, b, n = self.form
+        pairs = list(zip(ps, qs))
+        res = [INFINITY] * len(pairs)
+        idx, nums, dens = [], [], []
+        for i, (p, q) in enumerate(pairs):
+            if p.is_infinity(): res[i] = q
+            elif q.is_infinity(): res[i] = p
+            elif (p.x - q.x) % n:
+                idx.append(i)
+                nums.append(q.y - p.y)
+                dens.append(q.x - p.x)
+            elif (p.y + q.y) % n:
+                idx.append(i)
+                nums.append(3 * p.x * p.x + 2 * a * p.x + 1)
+                dens.append(2 * b * p.y)
+        for i, num, inv in zip(idx, nums, mod_context(n).batch_inverse(dens)):
+            (x1, y1), (x2, _) = pairs[i]
+            m = num * inv % n
+            x3 = (b * m * m - a - x1 - x2) % n
+            res[i] = Point(x3, (m * (2 * x1 + x2 + a) - b * m ** 3 - y1) % n)
+        return res
+
+    def batch_normalize(self, ps: Iterable[xz]) -> list[int]:
+        """
+        `(X : Z)` to affine x-coordinates for a batch of points, one inversion
+
+        `0` for the point at infinity
+        """
+        return self.xz().normalize(ps)
+
+    def order(self) -> int:
+        """
+        Number of points on the curve, including the point at infinity
+
+        Memoized. For prime `n > 3` the order of the isomorphic short
+        Weierstrass curve, see `to_weierstrass` and `Weierstrass.order`.
+        Other moduli count `points()`
+        """
+        if self._order is None:
+            _, b, n = self.form
+            if n <= 3 or not is_prime(n) or b % n == 0:
+                self._order = len(self.points())
+            else:
+                self._order = self.to_weierstrass().target.order()
+        return self._order
+
+    def point_order(self, p: Point, multiple: int = 0) -> int:
+        """
+        Order of `p`, stripping prime factors from a known `multiple`
+        of it, by default the group order
+        """
+        o = multiple or self.order()
+        for q, e in factor(o).items():
+            for _ in range(e):
+                if not self.scalar_mult(o // q, p).is_infinity(): break
+                o //= q
+        return o
+
+    def to_weierstrass(self) -> 'Isomorphism':
+        """
+        Birational map to short Weierstrass form, see `MontgomeryToWeierstrass`
+
+        Memoized
+        """
+        if 'weierstrass' not in self._conversions:
+            self._conversions['weierstrass'] = MontgomeryToWeierstrass(self)
+        return self._conversions['weierstrass']
+
+    def to_edwards(self, a: int = 0) -> 'Isomorphism':
+        """
+        Birational map to the twisted Edwards curve with coefficient `a`,
+        by default `(A + 2)/B`, see `MontgomeryToEdwards`
+
+        Memoized, raise `ValueError` unless `(A + 2)/(a*B)` is a square
+        """
+        key = 'edwards', a
+        if key not in self._conversions:
+            A, B, n = self.form
+            mod = mod_context(n)
+            ib = mod.inverse(B % n) if B % n else 0
+            ea = (A + 2) * ib % n
+            a = a % n or ea
+            iea = mod.inverse(ea) if ea and a else 0
+            if not iea:
+                raise ValueError(f'No twisted Edwards form with a = {a} for A = {A}, B = {B} over Z/{n}Z')
+            d = (A - 2) * ib * a * iea % n
+            self._conversions[key] = MontgomeryToEdwards(self, TwistedEdwards(a, d, n))
+        return self._conversions[key]
+
+    def xz(self) -> 'XZ':
+        """
+        `(X : Z)` coordinate arithmetic on this curve
+        """
+        if self._xz is None:
+            self._xz = XZ(self)
+        return self._xz
+
+    def x_mult(self, k: int, x: int) -> int:
+        """
+        x-only scalar multiplication by the Montgomery ladder
+
+        Return the x-coordinate of `k*P` given the x-coordinate of `P`,
+        `0` for the point at infinity
+        """
+        if k < 0:
+            raise ValueError(f'Expect element of Z/nZ, got: {k}')
+        return self.xz().x_mult(k, x)
+
     def scalar_mult(self, k: int, p: Point) -> Point:
         """
-        Scalar multiplication
+        Scalar multiplication using the curve's strategy
+
+        The `'ladder'` strategy runs in `(X : Z)` coordinates and recovers
+        `y` at the end, one inversion for the affine result
         """
-        if k == 0: return Point(-1, -1)
-        if k == 1: return p
-        if k > 1:
-            return self.add(p, self.scalar_mult(k - 1, p))
-        else:
+        if k < 0:
             raise ValueError(f'Expect element of Z/nZ, got: {k}')
+        if self.strategy == 'ladder':
+            return self.xz().scalar_mult(k, p)
+        return scalar_mult(self, k, p, self.strategy, self.w)
+
+    def multi_scalar_mult(self, scalars: list[int], points: list[Point]) -> Point:
+        """
+        Linear combination `k1*P1 + ... + km*Pm`, see `scalar_mult.multi_scalar_mult`
+
+        A single term is a `scalar_mult` with the curve's strategy. `(X : Z)`
+        has no general addition, so longer sums run in Jacobian coordinates
+        on the isomorphic Weierstrass curve, or in affine coordinates when
+        there is none
+        """
+        terms = [(k, p) for k, p in zip(scalars, points) if k]
+        if len(scalars) == len(points) and len(terms) == 1: return self.scalar_mult(*terms[0])
+        try:
+            iso = self.to_weierstrass()
+        except ValueError:
+            return multi_scalar_mult(self, scalars, points)
+        return iso.unmap(iso.target.multi_scalar_mult(scalars, iso.map_all(points)))
+
+class XZ:
+    """
+    `(X : Z)` coordinates for a Montgomery curve
+
+    `(X : Z)` represents the affine x-coordinate `X/Z`, the point at
+    infinity is `(1 : 0)`. Only differential addition is available:
+    `P + Q` can be computed from `P`, `Q` and `P - Q`.
+
+    Formulas: https://hyperelliptic.org/EFD/g1p/auto-montgom-xz.html
+    """
+
+    def __init__(self, curve: Montgomery):
+        self.curve = curve
+        a, _, n = curve.form
+        self.n = n
+        # (a + 2) / 4
+        self.a24 = (a + 2) * mod_context(n).inverse(4) % n
+
+    def double(self, p: xz) -> xz:
+        """
+        x-only doubling, dbl-1987-m-3
+        """
+        n = self.n
+        x1, z1 = p
+        t1 = (x1 + z1) ** 2 % n
+        t2 = (x1 - z1) ** 2 % n
+        t3 = t1 - t2
+        return t1 * t2 % n, t3 * (t2 + self.a24 * t3) % n
+
+    def diff_add(self, p: xz, q: xz, x: int) -> xz:
+        """
+        x-only differential addition with affine difference `P - Q = (x : 1)`,
+        mladd-1987-m
+        """
+        n = self.n
+        x2, z2 = p
+        x3, z3 = q
+        u = (x2 - z2) * (x3 + z3) % n
+        v = (x2 + z2) * (x3 - z3) % n
+        return (u + v) ** 2 % n, x * (u - v) ** 2 % n
+
+    def ladder(self, k: int, x: int) -> tuple[xz, xz]:
+        """
+        Montgomery ladder on the affine x-coordinate `x`
+
+        Return `(k*P, (k+1)*P)` in `(X : Z)` coordinates
+
+        `double` and `diff_add` are inlined, this is the hot loop of X25519
+        """
+        n, a24 = self.n, self.a24
+        x = x % n
+        x0, z0, x1, z1 = 1, 0, x, 1
+        for bit in bin(k)[2:]:
+            if bit == '1':
+                x0, z0, x1, z1 = x1, z1, x0, z0
+            s, d = x0 + z0, x0 - z0
+            # R1 <- R0 + R1
+            u = d * (x1 + z1) % n
+            v = s * (x1 - z1) % n
+            x1 = (u + v) * (u + v) % n
+            z1 = x * ((u - v) * (u - v) % n) % n
+            # R0 <- 2 * R0
+            t1 = s * s % n
+            t2 = d * d % n
+            t3 = t1 - t2
+            x0 = t1 * t2 % n
+            z0 = t3 * (t2 + a24 * t3 % n) % n
+            if bit == '1':
+                x0, z0, x1, z1 = x1, z1, x0, z0
+        return (x0, z0), (x1, z1)
+
+    def x_mult(self, k: int, x: int) -> int:
+        """
+        x-coordinate of `k*P` from the x-coordinate of `P`
+
+        No y-recovery, one inversion at the end. Return `0` for the point at infinity
+        """
+        (x0, z0), _ = self.ladder(k, x)
+        n = self.n
+        if z0 % n == 0: return 0
+        return x0 * mod_context(n).inverse(z0) % n
+
+    def normalize(self, ps: Iterable[xz]) -> list[int]:
+        """
+        `(X : Z)` to affine x-coordinates for a batch of points, one inversion
+
+        `0` for the point at infinity
+        """
+        n = self.n
+        ps = list(ps)
+        invs = iter(mod_context(n).batch_inverse([z for _, z in ps if z % n]))
+        return [x * next(invs) % n if z % n else 0 for x, z in ps]
+
+    def recover_y(self, p: Point, q: xz, r: xz) -> Point:
+        """
+        Okeya-Sakurai y-coordinate recovery of `Q` from the affine point `P`,
+        `Q` and `R = Q + P` in `(X : Z)` coordinates
+        """
+        a, b, n = self.curve.form
+        xq, zq = q
+        xr, zr = r
+        if zq % n == 0: return INFINITY
+        if zr % n == 0: return self.curve.neg(p)
+        v1 = p.x * zq % n
+        v3 = (xq - v1) ** 2 * xr % n
+        v2 = xq + v1 + 2 * a * zq
+        v2 = (v2 * (p.x * xq + zq) - 2 * a * zq * zq) * zr % n
+        y = (v2 - v3) % n
+        v1 = 2 * b * p.y * zq * zr % n
+        zinv = mod_context(n).inverse(v1 * zq % n)
+        return Point(v1 * xq * zinv % n, y * zinv % n)
+
+    def scalar_mult(self, k: int, p: Point) -> Point:
+        """
+        Scalar multiplication by the Montgomery ladder with y-recovery
+        """
+        _, _, n = self.curve.form
+        if k == 0 or p.is_infinity(): return INFINITY
+        # 2-torsion point (x, 0)
+        if p.y % n == 0: return p if k % 2 else INFINITY
+        q, r = self.ladder(k, p.x)
+        return self.recover_y(p, q, r)
+
+class TwistedEdwards:
+    """
+    Twisted Edwards form of an elliptic curve
+    """
+
+    # --------------------
+    # --- type aliases ---
+    # --------------------
+
+    # modulus of the underlying field Z/nZ
+    modulus = Annotated[int, 'Modulus of Z/nZ']
+
+    # coefficients of the twisted Edwards form of the curve
+    a_coeff = Annotated[int, 'a coefficient of twisted Edwards form']
+    d_coeff = Annotated[int, 'd coefficient of twisted Edwards form']
+
+    # ---------------
+    # --- methods ---
+    # ---------------
+
+    def __init__(self, a: a_coeff, d: d_coeff, n: modulus, strategy: str = 'wnaf', w: int = 4):
+        """
+        Initialize a twisted Edwards curve
+
+        `strategy` and `w` select the scalar multiplication method, see `scalar_mult`
+        """
+        if strategy not in strategies:
+            raise ValueError(f'Unknown scalar multiplication strategy: {strategy}')
+        self.form = a, d, n
+        self.strategy = strategy
+        self.w = w
+        self._extended = None
+        self._prime = None
+        self._order = None
+        self._conversions = {}
+
+    def check(self, p: Point) -> bool:
+        """
+        Check that `p` is a point on the curve
+        """
+        a, d, n = self.form
+        x2, y2 = p.x * p.x, p.y * p.y
+        return (a * x2 + y2 - 1 - d * x2 * y2) % n == 0
+
+    def roots(self, x: int) -> list[int]:
+        """
+        Sorted y-coordinates of the points with x-coordinate `x`,
+        `y^2 = (1 - a*x^2) / (1 - d*x^2)`
+
+        Legendre test and Tonelli-Shanks when `n` is an odd prime
+        """
+        a, d, n = self.form
+        mod = mod_context(n)
+        den = (1 - d * x * x) % n
+        inv = mod.inverse(den) if den else 0
+        if not inv:
+            return [y for y in range(n) if self.check(Point(x, y))]
+        if self._prime is None:
+            self._prime = n > 2 and is_prime(n)
+        r = (1 - a * x * x) * inv % n
+        return mod.sqrt_prime(r) if self._prime else mod.sqrt(r)
+
+    def iter_points(self, lower: int = 0, *upper) -> Iterator[Point]:
+        """
+        Stream the affine points with `lower <= x < upper`, ordered by `(x, y)`
+
+        One square root per x
+        """
+        _, _, n = self.form
+        upper = upper[0] if upper else n
+        for x in range(lower, upper):
+            for y in self.roots(x):
+                yield Point(x, y)
+
+    def points(self, *debug) -> list[Point]:
+        """
+        Return the list of all points on the elliptic
+        curve over Z/nZ with twisted Edwards form:
+
+            `a*x^2 + y^2 = 1 + d*x^2*y^2`
+
+        The identity `(0, 1)` is an affine point, there is no point at infinity
+
+        `O(n log n)` for prime `n`, use `iter_points` to stop early
+        """
+        a, d, n = self.form
+        pts = list(self.iter_points())
+        if debug:
+            print('+-------------------------------------------------')
+            print(f'+ Points of {a}x^2 + y^2 = 1 + {d}x^2y^2 (mod {n})')
+            print('+-------------------------------------------------')
+            print(f'+ {pts.__len__()} points over Z/{n}Z')
+        return pts
+
+    def points_n(self, k: int, lower: int = 0, *upper) -> list[Point]:
+        """
+        Find k points on the curve given `lower` and/or `upper` bound(s)
+        on their x-coordinates
+        """
+        return list(islice(self.iter_points(lower, *upper), k))
+
+    def identity(self) -> Point:
+        """
+        The point `(0, 1)`, the identity of the group law
+        """
+        return Point(0, 1)
+
+    def neg(self, p: Point) -> Point:
+        """
+        Additive inverse of `p`
+        """
+        _, _, n = self.form
+        return Point(-p.x % n, p.y)
+
+    def add(self, p: Point, q: Point) -> Point:
+        """
+        Elliptic curve point addition (twisted Edwards form)
+
+        The same unified formula adds and doubles. It is complete when `a`
+        is a square and `d` is not, otherwise raise `ValueError` on the
+        exceptional pairs
+        """
+        a, d, n = self.form
+        x1, y1 = p.x, p.y
+        x2, y2 = q.x, q.y
+        t = d * x1 * x2 * y1 * y2 % n
+        mod = mod_context(n)
+        i1 = mod.inverse((1 + t) % n) if (1 + t) % n else 0
+        i2 = mod.inverse((1 - t) % n) if (1 - t) % n else 0
+        if not (i1 and i2):
+            raise ValueError(f'Exceptional points for the Edwards addition law: {p}, {q}')
+        x3 = (x1 * y2 + y1 * x2) * i1 % n
+        y3 = (y1 * y2 - a * x1 * x2) * i2 % n
+        return Point(x3, y3)
+
+    def double(self, p: Point) -> Point:
+        """
+        Elliptic curve point doubling (twisted Edwards form)
+        """
+        return self.add(p, p)
+
+    def safe_add(self, p: Point, q: Point) -> Union[Point, None]:
+        """
+        Check that the points are on the curve before adding
+        """
+        if self.check(p) and self.check(q):
+            return self.add(p, q)
+
+    def order(self) -> int:
+        """
+        Number of points on the curve
+
+        Memoized. For prime `n > 3` and `a != d`, the order of the
+        birationally equivalent Montgomery curve, see `to_montgomery`.
+        Other moduli count `points()`
+        """
+        if self._order is None:
+            try:
+                self._order = self.to_montgomery().target.order()
+            except ValueError:
+                self._order = len(self.points())
+        return self._order
+
+    def point_order(self, p: Point, multiple: int = 0) -> int:
+        """
+        Order of `p`, stripping prime factors from a known `multiple`
+        of it, by default the group order
+        """
+        o = multiple or self.order()
+        for q, e in factor(o).items():
+            for _ in range(e):
+                if self.scalar_mult(o // q, p) != self.identity(): break
+                o //= q
+        return o
+
+    def to_montgomery(self) -> 'Isomorphism':
+        """
+        Birational map to the Montgomery curve
+        `B*v^2 = u^3 + A*u^2 + u`, `A = 2(a + d)/(a - d)`, `B = 4/(a - d)`
+
+        Memoized
+        """
+        if 'montgomery' not in self._conversions:
+            a, d, n = self.form
+            mod = mod_context(n)
+            i = mod.inverse((a - d) % n) if (a - d) % n else 0
+            if not i or n % 2 == 0:
+                raise ValueError(f'No Montgomery form for a = {a}, d = {d} over Z/{n}Z')
+            mont = Montgomery(2 * (a + d) * i % n, 4 * i % n, n)
+            self._conversions['montgomery'] = Inverse(MontgomeryToEdwards(mont, self))
+        return self._conversions['montgomery']
+
+    def to_weierstrass(self) -> 'Isomorphism':
+        """
+        Birational map to short Weierstrass form through Montgomery form
+
+        Memoized
+        """
+        if 'weierstrass' not in self._conversions:
+            to_mont = self.to_montgomery()
+            self._conversions['weierstrass'] = Composite(to_mont, to_mont.target.to_weierstrass())
+        return self._conversions['weierstrass']
+
+    def extended(self) -> 'Extended':
+        """
+        Extended coordinate arithmetic on this curve
+        """
+        if self._extended is None:
+            self._extended = Extended(self)
+        return self._extended
+
+    def scalar_mult(self, k: int, p: Point) -> Point:
+        """
+        Scalar multiplication using the curve's strategy
+
+        Runs in extended coordinates, one inversion for the affine result
+        """
+        if k < 0:
+            raise ValueError(f'Expect element of Z/nZ, got: {k}')
+        ext = self.extended()
+        return ext.to_affine(scalar_mult(ext, k, p, self.strategy, self.w))
+
+    def multi_scalar_mult(self, scalars: list[int], points: list[Point]) -> Point:
+        """
+        Linear combination `k1*P1 + ... + km*Pm`, see `scalar_mult.multi_scalar_mult`
+
+        Runs in extended coordinates, one inversion for the affine result
+        """
+        ext = self.extended()
+        return ext.to_affine(multi_scalar_mult(ext, scalars, points, strategy=self.strategy, w=self.w))
+
+class Extended:
+    """
+    Extended coordinates for a twisted Edwards curve
+
+    `(X, Y, Z, T)` represents the affine point `(X/Z, Y/Z)` with
+    `T = X*Y/Z`. Affine `Point`s are accepted wherever an extended point
+    is expected, the second argument of `add` uses mixed addition.
+
+    The unified formulas are complete when `a` is a square and `d` is not,
+    e.g. edwards25519. Exceptional inputs lead to `Z = 0` and `to_affine`
+    raises `ValueError`.
+
+    Formulas: https://hyperelliptic.org/EFD/g1p/auto-twisted-extended.html
+    """
+
+    def __init__(self, curve: TwistedEdwards):
+        self.curve = curve
+        a, d, n = curve.form
+        self.a = a % n
+        self.d = d % n
+        self.n = n
+
+    def identity(self) -> extended:
+        """
+        The point `(0, 1)`
+        """
+        return 0, 1, 1, 0
+
+    def from_affine(self, p: Point) -> extended:
+        """
+        Affine to extended coordinates
+        """
+        return p.x, p.y, 1, p.x * p.y % self.n
+
+    def to_affine(self, p: Union[extended, Point]) -> Point:
+        """
+        Extended to affine coordinates, one inversion
+        """
+        if isinstance(p, Point): return p
+        n = self.n
+        x, y, z, _ = p
+        if z % n == 0:
+            raise ValueError('Exceptional points for the Edwards addition law')
+        zinv = mod_context(n).inverse(z % n)
+        return Point(x * zinv % n, y * zinv % n)
+
+    def normalize(self, ps: Iterable[Union[extended, Point]]) -> list[Point]:
+        """
+        Extended to affine coordinates for a batch of points, one inversion
+        """
+        n = self.n
+        ps = list(ps)
+        zs = [p[2] for p in ps if not isinstance(p, Point)]
+        if any(z % n == 0 for z in zs):
+            raise ValueError('Exceptional points for the Edwards addition law')
+        invs = iter(mod_context(n).batch_inverse(zs))
+        res = []
+        for p in ps:
+            if isinstance(p, Point):
+                res.append(p)
+            else:
+                zinv = next(invs)
+                res.append(Point(p[0] * zinv % n, p[1] * zinv % n))
+        return res
+
+    def neg(self, p: Union[extended, Point]) -> Union[extended, Point]:
+        """
+        Additive inverse of `p`
+        """
+        n = self.n
+        if isinstance(p, Point): return Point(-p.x % n, p.y)
+        x, y, z, t = p
+        return -x % n, y, z, -t % n
+
+    def double(self, p: Union[extended, Point]) -> extended:
+        """
+        Point doubling, dbl-2008-hwcd
+        """
+        if isinstance(p, Point): p = self.from_affine(p)
+        n = self.n
+        x1, y1, z1, _ = p
+        a = x1 * x1 % n
+        b = y1 * y1 % n
+        c = 2 * z1 * z1 % n
+        d = self.a * a % n
+        e = ((x1 + y1) ** 2 - a - b) % n
+        g = (d + b) % n
+        f = (g - c) % n
+        h = (d - b) % n
+        return e * f % n, g * h % n, f * g % n, e * h % n
+
+    def add(self, p: Union[extended, Point], q: Union[extended, Point]) -> extended:
+        """
+        Point addition, add-2008-hwcd, or madd-2008-hwcd when `q` is affine
+        """
+        if isinstance(p, Point): p = self.from_affine(p)
+        n = self.n
+        x1, y1, z1, t1 = p
+        if isinstance(q, Point):
+            x2, y2 = q.x, q.y
+            d = z1
+            c = self.d * t1 % n * x2 * y2 % n
+        else:
+            x2, y2, z2, t2 = q
+            d = z1 * z2 % n
+            c = self.d * t1 % n * t2 % n
+        a = x1 * x2 % n
+        b = y1 * y2 % n
+        e = ((x1 + y1) * (x2 + y2) - a - b) % n
+        f = (d - c) % n
+        g = (d + c) % n
+        h = (b - self.a * a) % n
+        return e * f % n, g * h % n, f * g % n, e * h % n
+
+# -------------------------------------
+# --- conversion between curve forms ---
+# -------------------------------------
+
+class Isomorphism(ABC):
+    """
+    Birational map `source -> target` between two forms of an elliptic
+    curve, a group isomorphism on the points
+
+    Subclasses compute their constants once, in `__init__`, and implement
+    `map` and its inverse `unmap`. The bulk versions `map_all` and
+    `unmap_all` share one inversion across the batch where the map needs
+    inversions at all
+    """
+
+    source = None
+    target = None
+
+    @abstractmethod
+    def map(self, p: Point) -> Point:
+        """
+        Image of a point of `source` on `target`
+        """
+
+    @abstractmethod
+    def unmap(self, q: Point) -> Point:
+        """
+        Preimage of a point of `target` on `source`
+        """
+
+    def map_all(self, ps: Iterable[Point]) -> list[Point]:
+        """
+        Images of a batch of points
+        """
+        return [self.map(p) for p in ps]
+
+    def unmap_all(self, qs: Iterable[Point]) -> list[Point]:
+        """
+        Preimages of a batch of points
+        """
+        return [self.unmap(q) for q in qs]
+
+    def inverse(self) -> 'Isomorphism':
+        """
+        The map `target -> source`
+        """
+        return Inverse(self)
+
+class Inverse(Isomorphism):
+    """
+    Inverse of an isomorphism
+    """
+
+    def __init__(self, iso: Isomorphism):
+        self.iso = iso
+        self.source, self.target = iso.target, iso.source
+
+    def map(self, p: Point) -> Point:
+        return self.iso.unmap(p)
+
+    def unmap(self, q: Point) -> Point:
+        return self.iso.map(q)
+
+    def map_all(self, ps: Iterable[Point]) -> list[Point]:
+        return self.iso.unmap_all(ps)
+
+    def unmap_all(self, qs: Iterable[Point]) -> list[Point]:
+        return self.iso.map_all(qs)
+
+    def inverse(self) -> Isomorphism:
+        return self.iso
+
+class Composite(Isomorphism):
+    """
+    Composition `second . first` of two isomorphisms
+    """
+
+    def __init__(self, first: Isomorphism, second: Isomorphism):
+        if first.target is not second.source:
+            raise ValueError('Expect the target of the first map to be the source of the second')
+        self.first, self.second = first, second
+        self.source, self.target = first.source, second.target
+
+    def map(self, p: Point) -> Point:
+        return self.second.map(self.first.map(p))
+
+    def unmap(self, q: Point) -> Point:
+        return self.first.unmap(self.second.unmap(q))
+
+    def map_all(self, ps: Iterable[Point]) -> list[Point]:
+        return self.second.map_all(self.first.map_all(ps))
+
+    def unmap_all(self, qs: Iterable[Point]) -> list[Point]:
+        return self.first.unmap_all(self.second.unmap_all(qs))
+
+class MontgomeryToWeierstrass(Isomorphism):
+    """
+    `B*y^2 = x^3 + A*x^2 + x  ->  v^2 = u^3 + a*u + b`
+
+        a = (3 - A^2) / (3B^2),  b = (2A^3 - 9A) / (27B^3)
+        (x, y) -> ((x + A/3) / B, y / B)
+
+    Needs `3` and `B` to be units, no inversion per point
+    """
+
+    def __init__(self, curve: Montgomery):
+        A, B, n = curve.form
+        mod = mod_context(n)
+        i3 = mod.inverse(3 % n) if n % 3 else 0
+        ib = mod.inverse(B % n) if B % n else 0
+        if not (i3 and ib):
+            raise ValueError(f'No Weierstrass form for A = {A}, B = {B} over Z/{n}Z')
+        self.a3, self.b, self.ib, self.n = A * i3 % n, B % n, ib, n
+        wa = (3 - A * A) * i3 * ib * ib % n
+        wb = (2 * A ** 3 - 9 * A) * i3 ** 3 * ib ** 3 % n
+        self.source, self.target = curve, Weierstrass(wa, wb, n)
+
+    def map(self, p: Point) -> Point:
+        if p.is_infinity(): return p
+        n = self.n
+        return Point((p.x + self.a3) * self.ib % n, p.y * self.ib % n)
+
+    def unmap(self, q: Point) -> Point:
+        if q.is_infinity(): return q
+        n = self.n
+        return Point((q.x * self.b - self.a3) % n, q.y * self.b % n)
+
+class WeierstrassToMontgomery(Isomorphism):
+    """
+    `y^2 = x^3 + a*x + b  ->  B*v^2 = u^3 + A*u^2 + u`
+
+        A = 3*alpha*s,  B = s,  s = 1/sqrt(3*alpha^2 + a)
+        (x, y) -> (s*(x - alpha), s*y)
+
+    for a root `alpha` of `x^3 + a*x + b` with `3*alpha^2 + a` a square,
+    `n > 3` prime. Such a root exists iff the curve has a Montgomery form.
+    No inversion per point
+    """
+
+    def __init__(self, curve: Weierstrass):
+        a, b, n = curve.form
+        if n <= 3 or not is_prime(n):
+            raise ValueError(f'Expect prime modulus greater than 3, got: {n}')
+        mod = mod_context(n)
+        for alpha in roots_poly([b, a, 0, 1], n):
+            r = mod.sqrt_prime(3 * alpha * alpha + a)
+            if r and r[0]:
+                s = mod.inverse(r[0])
+                break
+        else:
+            raise ValueError(f'No Montgomery form for a = {a}, b = {b} over Z/{n}Z')
+        self.alpha, self.s, self.si, self.n = alpha, s, r[0], n
+        self.source, self.target = curve, Montgomery(3 * alpha * s % n, s, n)
+
+    def map(self, p: Point) -> Point:
+        if p.is_infinity(): return p
+        n = self.n
+        return Point(self.s * (p.x - self.alpha) % n, self.s * p.y % n)
+
+    def unmap(self, q: Point) -> Point:
+        if q.is_infinity(): return q
+        n = self.n
+        return Point((q.x * self.si + self.alpha) % n, q.y * self.si % n)
+
+class MontgomeryToEdwards(Isomorphism):
+    """
+    `B*v^2 = u^3 + A*u^2 + u  ->  a*x^2 + y^2 = 1 + d*x^2*y^2`
+
+        (u, v) -> (s*u/v, (u - 1)/(u + 1))
+        (x, y) -> ((1 + y)/(1 - y), s*u/x)
+
+    where `(A + 2)/B = a*s^2` and `(A - 2)/B = d*s^2`. The point at infinity
+    and `(0, 0)` map to `(0, 1)` and `(0, -1)`. The points with `v = 0` or
+    `u = -1` have no affine image, they only exist when `d/a` is a square
+    """
+
+    def __init__(self, curve: Montgomery, target: 'TwistedEdwards'):
+        A, B, n = curve.form
+        a, d, _ = target.form
+        mod = mod_context(n)
+        ib = mod.inverse(B % n) if B % n else 0
+        ia = mod.inverse(a % n) if a % n else 0
+        if not (ib and ia) or n % 2 == 0:
+            raise ValueError(f'No twisted Edwards form for A = {A}, B = {B} over Z/{n}Z')
+        s2 = (A + 2) * ib * ia % n
+        if (A - 2) * ib % n != d * s2 % n:
+            raise ValueError(f'Expect d = {(A - 2) * ib * mod.inverse(s2) % n}, got: {d}')
+        s = mod.sqrt_prime(s2) if is_prime(n) else mod.sqrt(s2)
+        if not s:
+            raise ValueError(f'No twisted Edwards form with a = {a} for A = {A}, B = {B} over Z/{n}Z')
+        # the larger root, matches RFC 7748 for Curve25519 and edwards25519
+        self.s, self.n = s[-1], n
+        self.source, self.target = curve, target
+
+    def map(self, p: Point) -> Point:
+        return self.map_all([p])[0]
+
+    def unmap(self, q: Point) -> Point:
+        return self.unmap_all([q])[0]
+
+    def map_all(self, ps: Iterable[Point]) -> list[Point]:
+        n = self.n
+        ps = list(ps)
+        dens = []
+        for p in ps:
+            if p.is_infinity() or (p.x % n == 0 and p.y % n == 0): continue
+            if p.y % n == 0 or (p.x + 1) % n == 0:
+                raise ValueError(f'Point with no affine twisted Edwards image: {p}')
+            dens += [p.y, p.x + 1]
+        invs = iter(mod_context(n).batch_inverse(dens))
+        res = []
+        for p in ps:
+            if p.is_infinity(): res.append(Point(0, 1))
+            elif p.x % n == 0 and p.y % n == 0: res.append(Point(0, n - 1))
+            else:
+                iv, iu = next(invs), next(invs)
+                res.append(Point(self.s * p.x * iv % n, (p.x - 1) * iu % n))
+        return res
 
-# TODO conversion between forms
+    def unmap_all(self, qs: Iterable[Point]) -> list[Point]:
+        n = self.n
+        qs = list(qs)
+        invs = iter(mod_context(n).batch_inverse([v for q in qs if q.x % n for v in (1 - q.y, q.x)]))
+        res = []
+        for q in qs:
+            if q.x % n == 0:
+                res.append(INFINITY if q.y % n == 1 else Point(0, 0))
+            else:
+                iy, ix = next(invs), next(invs)
+                u = (1 + q.y) * iy % n
+                res.append(Point(u, self.s * u * ix % n))
+        return res
@@ -1,51 +1,103 @@
+from math import gcd
+from discrete_log import pohlig_hellman
+from modular import mod_context, factor, Units
 from secrets import SystemRandom
 
+# φ(n) and its distinct prime factors, None if 𝐙/n𝐙 has no generator
+# the unit group is cyclic iff the Carmichael function λ(n) equals φ(n)
+# and then both share a factorization, which `Mod` memoizes
+def phi_factors(n):
+    if n < 2: raise ValueError(f'Expect modulus of at least 2, got: {n}')
+    mod = mod_context(n)
+    phi = mod.phi()
+    if mod.carmichael() != phi: return None
+    return phi, list(mod.carmichael_factors())
+
 # check if g is a generator of 𝐙/n𝐙
-def is_generator(g, n):
-    pows = []
-    finish = False
+# g is a unit and g^(φ(n)/q) != 1 for every prime q dividing φ(n)
+# factors = phi_factors(n), computed if not given
+def is_generator(g, n, factors=None):
+    if factors is None: factors = phi_factors(n)
+    if factors is None: return False
+    phi, qs = factors
     g = g % n
-    for p in range(0, n - 1):
-        pows.append(g ** p % n)
-    for m in range(1, n):
-        if not pows.__contains__(m):
-            finish = True
-            break
-    return not finish
+    return gcd(g, n) == 1 and all(pow(g, phi // q, n) != 1 for q in qs)
+
+# return the smallest generator of 𝐙/n𝐙, if any exist
+# otherwise, return None
+def primitive_root(n, factors=None):
+    if factors is None: factors = phi_factors(n)
+    if factors is None: return None
+    for g in range(1, n):
+        if is_generator(g, n, factors):
+            return g
 
-# return list of generators of 𝐙/n𝐙
-def generators(n):
-    gens = []
-    for g in range(2, n):
-        if is_generator(g, n):
-            gens.append(g)
-    return gens
+# lazily yield the generators of 𝐙/n𝐙
+# from one generator g, they are exactly g^k for k coprime to φ(n)
+def iter_generators(n, factors=None):
+    if factors is None: factors = phi_factors(n)
+    g = primitive_root(n, factors)
+    if g is None: return
+    phi, _ = factors
+    x = g
+    for k in range(1, phi + 1):
+        if gcd(k, phi) == 1:
+            yield x
+        x = x * g % n
+
+# return sorted list of generators of 𝐙/n𝐙
+def generators(n, factors=None):
+    return sorted(iter_generators(n, factors))
 
 # return a randomly selected generator of 𝐙/n𝐙, if any exist
-# otherwise, raise a ValueError
-def random_gen(n):
-    gens = generators(n)
-    if not gens: return None
-    else:
-      i = SystemRandom().randint(0, len(gens) - 1)
-      return gens[i]
+# otherwise, return None
+def random_gen(n, factors=None):
+    if factors is None: factors = phi_factors(n)
+    g = primitive_root(n, factors)
+    if g is None: return None
+    phi, _ = factors
+    while True:
+        k = SystemRandom().randint(1, phi)
+        if gcd(k, phi) == 1:
+            return pow(g, k, n)
 
-# compute the discrete log, if it exists
+# compute the smallest discrete log, if it exists
 # otherwise, return None
 # x = base
 # y = target
 # n = modulus
+# units: Pohlig-Hellman in the subgroup generated by x, see `discrete_log.py`
+# non-units: x^k is periodic after at most log2(n) steps, once it vanishes
+# modulo the primes shared with x, so only the coprime part needs a log
 def discrete_log(x, y, n):
-    finish = False # early exit
-    res = None
-    x = x % n
-    y = y % n
-    for p in range(0, n - 2):
-        if finish: break
-        elif (x ** p) % n == y:
-            finish = True
-            res = p
-    return res
+    if n == 1: return 0
+    x, y = x % n, y % n
+    mod = mod_context(n)
+    if mod.is_unit(x):
+        if not mod.is_unit(y): return None
+        o = mod.order(x)
+        factors = {}
+        for q in mod.carmichael_factors():
+            while o // q ** factors.get(q, 0) % q == 0:
+                factors[q] = factors.get(q, 0) + 1
+        return pohlig_hellman(Units(n), x, y, o, factors)
+    # split n = n1 * n2, n1 made of the prime powers p^e with p dividing x
+    n1, t = 1, 0
+    for p, e in factor(n).items():
+        if x % p == 0:
+            n1, t = n1 * p ** e, max(t, e)
+    z = 1
+    for k in range(t):
+        if z == y: return k
+        z = z * x % n
+    # x^k = 0 (mod n1) for k >= t
+    n2 = n // n1
+    if y % n1: return None
+    if n2 == 1: return t
+    k = discrete_log(x, y, n2)
+    if k is None: return None
+    o = mod_context(n2).order(x % n2)
+    return k + -(-(t - k) // o) * o if k < t else k
 
 # check discrete logarithm
 # x = base
@@ -53,13 +105,15 @@ def discrete_log(x, y, n):
 # y = target
 # n = modulus
 def check_discrete_log(p, x, y, n):
-    return (x ** p) % n == y
+    return pow(x, p, n) == y % n
 
 # make functions for specific value of n
+# the factorization of φ(n) is computed once and shared by the closures
 def make(n):
-    is_gen = lambda g: is_generator(g, n)
-    gens = lambda: generators(n)
-    rand_gen = lambda: random_gen(n)
+    factors = phi_factors(n)
+    is_gen = lambda g: is_generator(g, n, factors)
+    gens = lambda: generators(n, factors)
+    rand_gen = lambda: random_gen(n, factors)
     dlog = lambda x, y: discrete_log(x, y, n)
     check_dlog = lambda p, x, y: check_discrete_log(p, x, y, n)
     return is_gen, gens, rand_gen, dlog, check_dlog
@@ -0,0 +1,83 @@
+"""
+Key exchange
+
+- X25519 Diffie-Hellman over Curve25519 (RFC 7748)
+"""
+
+from elliptic_curve import Montgomery, Point
+from secrets import token_bytes
+
+# Curve25519 in Montgomery form
+# y^2 = x^3 + 486662*x^2 + x (mod 2^255 - 19)
+curve25519 = Montgomery(486662, 1, 2 ** 255 - 19)
+
+# base point, generates a cyclic subgroup of prime order
+# 2^252 + 27742317777372353535851937790883648493
+base25519 = Point(9, 14781619447589544791020593568409986887264606134616475288964881837755586237401)
+
+class X25519:
+    """X25519 Diffie-Hellman key agreement
+
+    - private key: 32 random bytes
+    - public key: 32 bytes, little-endian x-coordinate
+    - x-only Montgomery ladder, no y-recovery
+    """
+
+    def gen(self) -> bytes:
+        """
+        Generate a private key
+        """
+        return token_bytes(32)
+
+    def decode_scalar(self, k: bytes) -> int:
+        """
+        Clamp a 32-byte private key: clear the cofactor bits, set bit 254
+        """
+        if len(k) != 32: raise ValueError(f'Expect 32-byte scalar, got {len(k)} bytes')
+        k = bytearray(k)
+        k[0] &= 248
+        k[31] &= 127
+        k[31] |= 64
+        return int.from_bytes(k, 'little')
+
+    def decode_x(self, x: bytes) -> int:
+        """
+        Decode a 32-byte x-coordinate, the top bit is ignored
+        """
+        if len(x) != 32: raise ValueError(f'Expect 32-byte x-coordinate, got {len(x)} bytes')
+        return int.from_bytes(x, 'little') & ((1 << 255) - 1)
+
+    def encode_x(self, x: int) -> bytes:
+        """
+        Encode an x-coordinate as 32 little-endian bytes
+        """
+        return x.to_bytes(32, 'little')
+
+    def x25519(self, k: bytes, x: bytes) -> bytes:
+        """
+        The X25519 function: x-coordinate of `k*P` from the x-coordinate of `P`
+        """
+        return self.encode_x(curve25519.x_mult(self.decode_scalar(k), self.decode_x(x)))
+
+    def public_key(self) -> bytes:
+        """
+        Public key `sk * base`
+        """
+        return self.x25519(self.sk, self.encode_x(base25519.x))
+
+    def shared_secret(self, pk: bytes) -> bytes:
+        """
+        Shared secret `sk * pk`
+
+        Raise `ValueError` for low order public keys
+        """
+        secret = self.x25519(self.sk, pk)
+        if not any(secret):
+            raise ValueError('Shared secret is zero, public key has low order')
+        return secret
+
+    def __init__(self, sk: bytes = b''):
+        if not sk:
+            sk = self.gen()
+        self.sk = sk
+        self.pk = self.public_key()
@@ -3,6 +3,164 @@ Modular arithmetic
 """
 
 from extended_euclidean_algorithm import *
+from functools import lru_cache
+from itertools import compress, product
+from math import gcd, prod
+from scalar_mult import FixedBase
+from secrets import SystemRandom
+from typing import Iterable, Iterator, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def is_prime(n: int) -> bool:
+    """
+    Miller-Rabin primality test with the first 13 primes as bases
+
+    Deterministic for `n < 3.3 * 10^24`, the smallest strong pseudoprime
+    to all 13 bases (the first 12 only reach `3.2 * 10^23`)
+    """
+    bases = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+    if n < 2: return False
+    for p in bases:
+        if n % p == 0: return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1: continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1: break
+        else:
+            return False
+    return True
+
+def pollard_rho(n: int) -> int:
+    """
+    Nontrivial factor of the odd composite `n`, Pollard rho with Brent's cycle detection
+    """
+    while True:
+        y, c, m = SystemRandom().randint(1, n - 1), SystemRandom().randint(1, n - 1), 128
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+        if g != n:
+            return g
+
+def factor(n: int) -> dict[int, int]:
+    """
+    Prime factorization `{p: e}` of `n > 0`
+
+    Trial division by small primes, then Pollard rho
+    """
+    res = {}
+    for p in [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]:
+        while n % p == 0:
+            res[p] = res.get(p, 0) + 1
+            n //= p
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            res[m] = res.get(m, 0) + 1
+        else:
+            d = pollard_rho(m)
+            stack.extend([d, m // d])
+    return dict(sorted(res.items()))
+
+def _sqrt_prime_power(r: int, p: int, e: int) -> list[int]:
+    """
+    All square roots of `r` modulo `p^e`, unordered
+
+    Writes `r = p^k * u` with `u` a unit, `k` must be even. The roots of `u`
+    modulo `p^(e-k)` come from Tonelli-Shanks or Cipolla modulo `p` and
+    Newton's iteration `x -> x - (x^2 - u) / 2x`, which doubles the `p`-adic
+    precision per step. Odd `p` gives two unit roots, `p = 2` up to four,
+    lifted bit by bit. Each one yields `p^(k/2)` roots modulo `p^e`
+    """
+    q = p ** e
+    r %= q
+    if r == 0:
+        return list(range(0, q, p ** -(-e // 2)))
+    k = 0
+    while r % p == 0:
+        r //= p
+        k += 1
+    if k % 2: return []
+    j = e - k
+    if p == 2:
+        # units mod 8 have either no root or four roots
+        if j == 1: units = [1]
+        elif j == 2: units = [1, 3] if r % 4 == 1 else []
+        elif r % 8 != 1: units = []
+        else:
+            x = 1
+            for i in range(3, j):
+                if (x * x - r) >> i & 1:
+                    x += 1 << (i - 1)
+            m = 1 << j
+            units = sorted({x % m, -x % m, (x + m // 2) % m, (-x + m // 2) % m})
+    else:
+        units = Mod(p).sqrt_prime(r)
+        if not units: return []
+        x, prec = units[0], 1
+        while prec < j:
+            prec = min(2 * prec, j)
+            m = p ** prec
+            x = (x - (x * x - r) * inverse(2 * x, m)) % m
+        m = p ** j
+        units = [x, m - x]
+    h, m = p ** (k // 2), p ** j
+    return [h * (y + m * t) % q for y in units for t in range(h)]
+
+@lru_cache(maxsize=256)
+def _factorization(n: int) -> tuple[tuple[int, int], ...]:
+    """
+    `factor(n)` as an immutable tuple, cached per modulus
+    """
+    return tuple(factor(n).items())
+
+class Units:
+    """
+    Multiplicative monoid of Z/nZ in the group interface of `scalar_mult`,
+    so `k*x` is `x^k mod n`
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def identity(self) -> int:
+        return 1
+
+    def add(self, x: int, y: int) -> int:
+        return x * y % self.n
+
+    def double(self, x: int) -> int:
+        return x * x % self.n
+
+    def neg(self, x: int) -> int:
+        return inverse(x, self.n)
 
 class Mod:
     """
@@ -14,76 +172,321 @@ class Mod:
         Initialize the object
         """
         self.n = n
+        self._lambda_factors = None
 
     def is_unit(self, x:int) -> bool:
         """
         Check if x is a unit in Z/nZ
         """
-        gcd, _, _ = eea(x, self.n)
-        return gcd == 1
+        return gcd(x, self.n) == 1
 
-    def all_units(self) -> list[int]:
+    def all_units(self, use_numpy: Union[bool, None] = None) -> list[int]:
         """
         List of all units of Z/nZ
+
+        Sieves out the multiples of the prime factors of `n`. With NumPy, by
+        default for `n >= 2^16` when it is installed, the sieve is a boolean
+        mask, otherwise see `iter_units`
+        """
+        n = self.n
+        if use_numpy is None:
+            use_numpy = np is not None and n >= 1 << 16
+        if not use_numpy:
+            return list(self.iter_units())
+        if np is None:
+            raise ValueError('NumPy backend requested but numpy is not installed')
+        mask = np.ones(n, dtype=bool)
+        for p, _ in _factorization(n):
+            mask[::p] = False
+        mask[0] = False
+        return np.flatnonzero(mask).tolist()
+
+    def iter_units(self, block: int = 1 << 16) -> Iterator[int]:
+        """
+        Stream the units of Z/nZ in increasing order
+
+        Segmented sieve, one `bytearray` of `block` entries at a time
         """
         n = self.n
-        return list(filter(lambda x: self.is_unit(x), range(1, n)))
+        primes = [p for p, _ in _factorization(n)] if n > 1 else []
+        for lo in range(1, n, block):
+            hi = min(lo + block, n)
+            mask = bytearray(b'\x01') * (hi - lo)
+            for p in primes:
+                start = -lo % p
+                mask[start::p] = bytes(len(range(start, hi - lo, p)))
+            yield from compress(range(lo, hi), mask)
+
+    def phi(self) -> int:
+        """
+        Euler's totient, the number of units of Z/nZ
+
+        `phi(n) = prod p^(e-1) * (p - 1)` over the prime powers of `n`
+        """
+        return prod(p ** (e - 1) * (p - 1) for p, e in _factorization(self.n))
+
+    def carmichael(self) -> int:
+        """
+        Carmichael function `lambda(n)`, the exponent of the unit group
+        """
+        return prod(q ** k for q, k in self.carmichael_factors().items())
 
     def inverse(self, x:int) -> int:
         """
-        Inverse of x modulo n using Extended Euclidean algorithm
+        Inverse of x modulo n, see `extended_euclidean_algorithm.inverse`
 
         Return `0` if and only if `gcd != 1`
         """
+        return inverse(x, self.n)
+
+    def batch_inverse(self, values: Iterable[int]) -> list[int]:
+        """
+        Inverses of all `values` with a single inversion, Montgomery's trick
+
+        `3(m - 1)` multiplications for `m` values. Return `0` for non-units
+        like `inverse`. When the product of all values is not a unit, a
+        product tree of the values locates the non-units with `O(k log m)`
+        gcds for `k` non-units
+        """
         n = self.n
-        gcd, a, _ = eea(x, n)
-        if gcd != 1:
-            return 0
-        else:
-            return a % n
+        values = [v % n for v in values]
+        # every value is a unit modulo 1, yet `inverse` returns 0
+        if n == 1: return [0] * len(values)
+        if not values: return []
+        prefix, acc = [], 1
+        for v in values:
+            acc = acc * v % n
+            prefix.append(acc)
+        inv = self.inverse(acc)
+        if not inv:
+            units = self._unit_mask(values)
+            invs = iter(self.batch_inverse([v for v, u in zip(values, units) if u]))
+            return [next(invs) if u else 0 for u in units]
+        res = [0] * len(values)
+        for i in range(len(values) - 1, 0, -1):
+            res[i] = inv * prefix[i - 1] % n
+            inv = inv * values[i] % n
+        res[0] = inv
+        return res
 
-    def sqrt(self, r: int) -> list[int]:
+    def _unit_mask(self, values: list[int]) -> list[bool]:
         """
-        Find all solutions `x` to the congruence: `x^2 = r (mod n)`
+        Which `values` are units, descending a product tree only into
+        subtrees whose product shares a factor with `n`
         """
         n = self.n
+        tree = [values]
+        while len(tree[-1]) > 1:
+            level = tree[-1]
+            tree.append([level[i] * level[i + 1] % n if i + 1 < len(level) else level[i]
+                         for i in range(0, len(level), 2)])
+        bad = [0] if gcd(tree[-1][0], n) != 1 else []
+        for level in reversed(tree[:-1]):
+            bad = [j for i in bad for j in (2 * i, 2 * i + 1) if j < len(level) and gcd(level[j], n) != 1]
+        mask = [True] * len(values)
+        for i in bad:
+            mask[i] = False
+        return mask
+
+    def batch_pow(self, bases: Iterable[int], exp: int) -> list[int]:
+        """
+        `[b^exp mod n for b in bases]`
+
+        Repeated bases are computed once. A negative `exp` inverts all
+        bases with one `batch_inverse`, non-units give `0`
+        """
+        n = self.n
+        bases = [b % n for b in bases]
+        if exp < 0:
+            invs = dict(zip(bases, self.batch_inverse(bases)))
+            bases, exp = [invs[b] for b in bases], -exp
+            cache = {0: 0}
+        else:
+            cache = {}
         res = []
-        for x in range(n):
-            if x ** 2 % n == r % n: res.append(x)
+        for b in bases:
+            if b not in cache:
+                cache[b] = pow(b, exp, n)
+            res.append(cache[b])
         return res
 
+    def pow_many(self, base: int, exps: Iterable[int]) -> list[int]:
+        """
+        `[base^e mod n for e in exps]` from one fixed-base table for `base`
+
+        With window width `w`, the table costs `(bits / w) * (2^w - 1)`
+        multiplications and each power at most `bits / w` more, against
+        about `bits` squarings for `pow`. `w` minimizes the total, plain
+        `pow` is used when the table does not pay off. Negative exponents
+        need `base` to be a unit
+        """
+        n = self.n
+        exps = list(exps)
+        if n == 1: return [0] * len(exps)
+        neg = [i for i, e in enumerate(exps) if e < 0]
+        if neg:
+            inv = self.inverse(base)
+            if not inv:
+                raise ValueError(f'{base} is not a unit of Z/{n}Z')
+            res = self.pow_many(base, [max(e, 0) for e in exps])
+            for i, r in zip(neg, self.pow_many(inv, [-exps[i] for i in neg])):
+                res[i] = r
+            return res
+        m, bits = len(exps), max((e.bit_length() for e in exps), default=0)
+        cost = lambda w: -(-bits // w) * ((1 << w) - 1 + m)
+        w = min(range(1, 9), key=cost)
+        if cost(w) >= m * bits:
+            return [pow(base, e, n) for e in exps]
+        table = FixedBase(Units(n), base % n, bits, w)
+        return [table.mult(e) for e in exps]
+
+    def sqrt(self, r: int) -> list[int]:
+        """
+        Find all solutions `x` to the congruence: `x^2 = r (mod n)`, sorted
+
+        Roots modulo each prime power `p^e` of the cached factorization of
+        `n`, by `sqrt_prime` and Hensel lifting, combined by the CRT
+        """
+        n = self.n
+        if n == 1: return [0]
+        res, m = [0], 1
+        for p, e in _factorization(n):
+            q = p ** e
+            roots = _sqrt_prime_power(r, p, e)
+            if not roots: return []
+            # x = x1 (mod m), x = x2 (mod q)
+            c = m * inverse(m, q) % (m * q) if m > 1 else 0
+            res = [(x1 + (x2 - x1) * c) % (m * q) if m > 1 else x2 for x1, x2 in product(res, roots)]
+            m *= q
+        return sorted(res)
+
+    def legendre(self, r: int) -> int:
+        """
+        Legendre symbol `(r/n)` by Euler's criterion, `n` an odd prime
+
+        `1` if `r` is a nonzero square, `-1` if not a square, `0` if `r = 0 (mod n)`
+        """
+        n = self.n
+        ls = pow(r, (n - 1) // 2, n)
+        return -1 if ls == n - 1 else ls
+
+    def sqrt_prime(self, r: int) -> list[int]:
+        """
+        Sorted square roots of `r` modulo an odd prime `n`
+
+        Tonelli-Shanks costs `O(s^2)` multiplications for `n - 1 = q * 2^s`,
+        Cipolla's `O(log n)` takes over when `s` is large
+        """
+        n = self.n
+        r = r % n
+        if r == 0: return [0]
+        if self.legendre(r) != 1: return []
+        # n - 1 = q * 2^s with q odd
+        q, s = n - 1, 0
+        while q % 2 == 0:
+            q //= 2
+            s += 1
+        if s == 1:
+            x = pow(r, (n + 1) // 4, n)
+        elif s * s > 4 * n.bit_length():
+            x = self._cipolla(r)
+        else:
+            # z is a quadratic nonresidue
+            z = 2
+            while self.legendre(z) != -1:
+                z += 1
+            m, c, t, x = s, pow(z, q, n), pow(r, q, n), pow(r, (q + 1) // 2, n)
+            while t != 1:
+                # least i with t^(2^i) = 1
+                i, t2 = 0, t
+                while t2 != 1:
+                    t2 = t2 * t2 % n
+                    i += 1
+                b = pow(c, 1 << (m - i - 1), n)
+                m, c = i, b * b % n
+                t, x = t * c % n, x * b % n
+        return sorted([x, n - x])
+
+    def _cipolla(self, r: int) -> int:
+        """
+        A square root of the quadratic residue `r` modulo an odd prime `n`
+        by Cipolla's algorithm
+
+        For `t` with `w = t^2 - r` a non-residue, `(t + sqrt(w))^((n+1)/2)`
+        in `F_n[sqrt(w)]` lies in `F_n` and squares to `r`
+        """
+        n = self.n
+        t = 1
+        while self.legendre(t * t - r) != -1:
+            t += 1
+        w = (t * t - r) % n
+        # (a + b*sqrt(w)) * (c + d*sqrt(w))
+        x0, x1, y0, y1 = 1, 0, t, 1
+        for bit in bin((n + 1) // 2)[2:]:
+            x0, x1 = (x0 * x0 + x1 * x1 % n * w) % n, 2 * x0 * x1 % n
+            if bit == '1':
+                x0, x1 = (x0 * y0 + x1 * y1 % n * w) % n, (x0 * y1 + x1 * y0) % n
+        return x0
+
+    def carmichael_factors(self) -> dict[int, int]:
+        """
+        Prime factorization `{q: k}` of the Carmichael function `lambda(n)`, memoized
+
+        `lambda(n) = lcm(lambda(p^e))` over the prime powers of `n`, with
+        `lambda(p^e) = p^(e-1) * (p - 1)` for odd `p` and `1, 2, 2^(e-2)`
+        for `2, 4, 2^e`. Only the `p - 1` need factoring, never `lambda(n)`
+        """
+        if self._lambda_factors is None:
+            res = {}
+            for p, e in _factorization(self.n):
+                if p == 2:
+                    parts = {2: e - 1 if e < 3 else e - 2}
+                else:
+                    parts = dict(_factorization(p - 1))
+                    parts[p] = parts.get(p, 0) + e - 1
+                for q, k in parts.items():
+                    if k > res.get(q, 0): res[q] = k
+            self._lambda_factors = dict(sorted(res.items()))
+        return dict(self._lambda_factors)
+
     def order(self, x:int) -> int:
         """
         Order of an element in `Z/nZ`
 
+        The order divides `lambda(n)`: strip each prime factor of
+        `lambda(n)` while the power stays `1`, `O(log n)` exponentiations
+
         Return -1 if `x` is not a unit in `Z/nZ`
         """
         n = self.n
-        res = -1
-        gcd, _, _ = eea(x, n)
-        if gcd != 1: return res
-        else:
-            for p in range(1, n - 1):
-                if pow(x, p, n) == 1:
-                    res = p
-                    break
-            return res
+        if not self.is_unit(x): return -1
+        o = self.carmichael()
+        for q, k in self.carmichael_factors().items():
+            for _ in range(k):
+                if pow(x, o // q, n) != 1: break
+                o //= q
+        return o
+
+    def powers(self, x: int) -> Iterator[int]:
+        """
+        Stream `x, x^2, x^3, ...` modulo `n` up to the first repeat
+
+        For a unit the last power is `1`
+        """
+        n = self.n
+        seen, y = set(), x % n
+        while y not in seen:
+            yield y
+            seen.add(y)
+            y = y * x % n
 
     def generated_group(self, x:int) -> list[int]:
         """
         The group generated by the unit `x` in `Z/nZ`
 
-        `<x> := { pow(x, i, n) : i in range(n) }`
+        `<x> := { pow(x, i, n) : i in range(n) }`, see `powers` to stream it
         """
-        n = self.n
-        group = [x]
-        for p in range(2, n):
-            y = pow(x, p, n)
-            if not group.__contains__(y):
-                group.append(y)
-            else:
-                break
-        return sorted(group)
+        return sorted(self.powers(x))
 
     def check(self, x:int) -> bool:
         """
@@ -93,3 +496,115 @@ class Mod:
         if not self.is_unit(x):
             raise ValueError(f'{x} is not a unit of Z/{n}Z')
         return self.order(x) == len(self.generated_group(x))
+
+class ModContext(Mod):
+    """
+    Reusable arithmetic context for one modulus
+
+    Precomputes the Barrett constant `mu = floor(4^k / n)` and, for odd
+    `n`, the Montgomery constants `R = 2^k`, `n' = -1/n mod R` and
+    `R^2 mod n`, `k = bits(n)`. `reduce` picks the fastest reduction:
+    CPython's `%` up to `BARRETT_BITS`, Barrett's two multiplications
+    above, where Karatsuba makes them cheaper than a long division.
+    `pow` stays the built-in, whose C loop beats any Python-level ladder.
+
+    The Montgomery mode is limited to `reduce`, `mul`, `sqr` and `pow`,
+    whose operands and results are in Montgomery form. The methods
+    inherited from `Mod`, e.g. `inverse`, `sqrt` or `order`, take and
+    return plain residues in every mode: convert with `from_montgomery`
+    first and `to_montgomery` after
+
+    Get shared instances from `mod_context`
+    """
+
+    # Barrett beats `%` above this size, measured on CPython 3.11
+    BARRETT_BITS = 4096
+
+    def __init__(self, n: int, method: str = 'auto'):
+        if n < 2:
+            raise ValueError(f'Expect modulus of at least 2, got: {n}')
+        if method == 'auto':
+            method = 'barrett' if n.bit_length() > self.BARRETT_BITS else 'native'
+        if method not in ('native', 'barrett', 'montgomery'):
+            raise ValueError(f'Unknown reduction method: {method}')
+        if method == 'montgomery' and n % 2 == 0:
+            raise ValueError(f'Expect odd modulus for Montgomery reduction, got: {n}')
+        super().__init__(n)
+        self.method = method
+        self.k = k = n.bit_length()
+        self.mu = (1 << 2 * k) // n
+        if n % 2:
+            self.mask = (1 << k) - 1
+            self.n_prime = -inverse(n, 1 << k) % (1 << k)
+            self.r2 = (1 << 2 * k) % n
+
+    def barrett(self, z: int) -> int:
+        """
+        `z mod n` for `0 <= z < n^2` by Barrett reduction
+        """
+        n, k = self.n, self.k
+        r = z - ((z >> (k - 1)) * self.mu >> (k + 1)) * n
+        while r >= n:
+            r -= n
+        return r
+
+    def redc(self, z: int) -> int:
+        """
+        Montgomery reduction `z / R mod n` for `0 <= z < n*R`
+        """
+        m = (z & self.mask) * self.n_prime & self.mask
+        t = (z + m * self.n) >> self.k
+        return t - self.n if t >= self.n else t
+
+    def to_montgomery(self, x: int) -> int:
+        """
+        `x*R mod n`, the Montgomery form of `x`
+        """
+        return self.redc(x % self.n * self.r2)
+
+    def from_montgomery(self, x: int) -> int:
+        """
+        `x / R mod n`, back from Montgomery form
+        """
+        return self.redc(x)
+
+    def reduce(self, z: int) -> int:
+        """
+        `z mod n` for `0 <= z < n^2`
+
+        In Montgomery mode operands are in Montgomery form and the result
+        carries one factor `1/R`, see `to_montgomery`
+        """
+        if self.method == 'barrett': return self.barrett(z)
+        if self.method == 'montgomery': return self.redc(z)
+        return z % self.n
+
+    def mul(self, x: int, y: int) -> int:
+        """
+        `x*y mod n` for reduced `x`, `y`
+        """
+        return self.reduce(x * y)
+
+    def sqr(self, x: int) -> int:
+        """
+        `x^2 mod n` for reduced `x`
+        """
+        return self.reduce(x * x)
+
+    def pow(self, x: int, e: int) -> int:
+        """
+        `x^e mod n`, negative `e` for powers of the inverse
+
+        In Montgomery mode, the built-in `pow` runs on the plain residue
+        and the result is converted back to Montgomery form
+        """
+        if self.method == 'montgomery':
+            return self.to_montgomery(pow(self.from_montgomery(x), e, self.n))
+        return pow(x, e, self.n)
+
+@lru_cache(maxsize=64)
+def mod_context(n: int) -> ModContext:
+    """
+    Shared `ModContext` for `n`, at most 64 moduli are kept
+    """
+    return ModContext(n)
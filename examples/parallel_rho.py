@@ -0,0 +1,139 @@
+"""
+Parallel Pollard rho
+
+van Oorschot-Wiener parallel collision search for `k*g = h`
+
+- every worker runs the same r-adding walk from its own random starts
+- a walk stops at a distinguished point, about 1 in `2^dbits` elements,
+  and reports it with its coefficients `(a, b)`, `x = a*g + b*h`
+- the parent keeps one table of distinguished points for all workers:
+  two walks that meet run into the same distinguished point, which
+  reveals `k = (a - a') / (b' - b) (mod q)`
+
+The expected `sqrt(pi*q/2)` steps are shared by the workers, so the
+speedup is close to linear in their number. Works with any group of
+`scalar_mult` with picklable, hashable elements, e.g. `Z/nZ` units via
+`modular.Units` or `elliptic_curve.Weierstrass` points
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from discrete_log import WALK_SIZE, bsgs, mult, pohlig_hellman, prime_log
+from math import isqrt
+from secrets import randbelow
+from time import perf_counter
+from typing import Any, Callable, Union
+
+# steps per task, between two looks at the shared table
+BATCH = 1 << 14
+
+# smaller orders are solved by baby-step giant-step, too few elements for the walk to mix
+SMALL_BITS = 16
+
+def walk(group: Any, steps: list, coeffs: list[tuple[int, int]], start: tuple, stride: tuple, order: int, dbits: int, batch: int) -> tuple[list, tuple, int]:
+    """
+    Run `batch` steps of the shared walk, one worker task
+
+    - `steps[i] = coeffs[i][0]*g + coeffs[i][1]*h`
+    - `start = (x, a, b)` the current point, `stride = (s, sa, sb)` added
+      to restart after a distinguished point, one addition per restart
+
+    Return the distinguished points `(x, a, b)`, the state to resume from
+    and the number of steps taken
+    """
+    x, a, b = start
+    s, sa, sb = stride
+    mask = (1 << dbits) - 1
+    # a walk stuck in a cycle without distinguished points is abandoned
+    cap = 20 << dbits
+    found, length = [], 0
+    for _ in range(batch):
+        i = hash(x) % WALK_SIZE
+        x = group.add(x, steps[i])
+        a, b = (a + coeffs[i][0]) % order, (b + coeffs[i][1]) % order
+        length += 1
+        distinguished = not hash(x) // WALK_SIZE & mask
+        if distinguished or length > cap:
+            if distinguished: found.append((x, a, b))
+            x, a, b = group.add(x, s), (a + sa) % order, (b + sb) % order
+            length = 0
+    return found, (x, a, b), batch
+
+def _random_element(group: Any, g: Any, h: Any, order: int) -> tuple:
+    """
+    `(a*g + b*h, a, b)` for random `a, b`
+    """
+    a, b = randbelow(order), randbelow(order)
+    return group.add(mult(group, a, g), mult(group, b, h)), a, b
+
+def print_rate(steps: int, elapsed: float, points: int):
+    """
+    Default progress report
+    """
+    print(f'{steps} steps, {steps / max(elapsed, 1e-9):.0f} steps/s, {points} distinguished points')
+
+def parallel_rho(group: Any, g: Any, h: Any, order: int, workers: int = 0, dbits: int = -1, batch: int = BATCH, max_steps: int = 0, report: Union[Callable[[int, float, int], None], None] = None) -> Union[int, None]:
+    """
+    `k` with `k*g = h` for `g` of prime `order`, across `workers` processes
+
+    - `workers`: defaults to the number of CPUs
+    - `dbits`: distinguished points have `dbits` zero bits, by default a
+      quarter of the bits of `order`, so each walk is short compared to
+      the share of every worker
+    - `max_steps`: give up after this many steps in total, by default
+      `16*sqrt(order)`
+    - `report(steps, seconds, points)`: called after each finished task,
+      e.g. `print_rate`
+
+    Return None if `h` is not in the group of `g` or no collision was found
+    """
+    if mult(group, order, h) != group.identity(): return None
+    if h == group.identity(): return 0
+    if order.bit_length() <= SMALL_BITS: return bsgs(group, g, h, order)
+    workers = workers or os.cpu_count() or 1
+    if dbits < 0: dbits = max(order.bit_length() // 4 - 2, 0)
+    max_steps = max_steps or 16 * (isqrt(order) + 1)
+    coeffs = [(randbelow(order), randbelow(order)) for _ in range(WALK_SIZE)]
+    steps = [group.add(mult(group, a, g), mult(group, b, h)) for a, b in coeffs]
+    table, total, start = {}, 0, perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def submit(state, stride):
+            return pool.submit(walk, group, steps, coeffs, state, stride, order, dbits, batch)
+        tasks = {}
+        for _ in range(workers):
+            stride = _random_element(group, g, h, order)
+            tasks[submit(_random_element(group, g, h, order), stride)] = stride
+        try:
+            while tasks:
+                done, _ = wait(tasks, return_when=FIRST_COMPLETED)
+                for task in done:
+                    stride = tasks.pop(task)
+                    found, state, n = task.result()
+                    total += n
+                    for x, a, b in found:
+                        if x not in table:
+                            table[x] = a, b
+                            continue
+                        sa, sb = table[x]
+                        if (sb - b) % order:
+                            k = (a - sa) * pow(sb - b, -1, order) % order
+                            if mult(group, k, g) == h: return k
+                    if report: report(total, perf_counter() - start, len(table))
+                    if total < max_steps:
+                        tasks[submit(state, stride)] = stride
+        finally:
+            # running tasks end with their batch, queued ones never start
+            pool.shutdown(cancel_futures=True)
+    return None
+
+def parallel_log(group: Any, g: Any, h: Any, order: int, factors: Union[dict[int, int], None] = None, min_bits: int = 48, **options) -> Union[int, None]:
+    """
+    Smallest `0 <= k < order` with `k*g = h`, by Pohlig-Hellman
+
+    Prime factors of at least `min_bits` bits go to `parallel_rho`,
+    the smaller ones are solved in process by `prime_log`
+    """
+    def solve(group, g, h, q):
+        if q.bit_length() < min_bits: return prime_log(group, g, h, q)
+        return parallel_rho(group, g, h, q, **options)
+    return pohlig_hellman(group, g, h, order, factors, solver=solve)
@@ -0,0 +1,3 @@
+"""
+RSA examples, run the tests with `pytest` from `examples`
+"""
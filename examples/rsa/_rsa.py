@@ -3,9 +3,12 @@
 """
 
 from time import time
+from math import prod
 from secrets import SystemRandom
 from base64 import b64encode, b64decode
-from utils import RsaTransformations as Rsa, Modular, Prime
+from functools import lru_cache
+from typing import Union
+from .utils import RsaTransformations as Rsa, Prime, inverse, mod_context
 
 # TODO
 # PKCS1/PKCS8
@@ -14,6 +17,9 @@ from utils import RsaTransformations as Rsa, Modular, Prime
 class Cipher:
     """
     RSA cryptosystem
+
+    - `Cipher(p=p, q=q)`, or `Cipher(primes=[p, q, r, ...])` for multi-prime keys
+    - `Cipher(digits=bits)`, `Cipher(digits=bits, count=k)` for `k` random primes
     """
 
     def __default(self, k, dict):
@@ -25,15 +31,24 @@ class Cipher:
     def __init__(self, **primes):
         if self.__default('digits', primes):
             n = primes['digits']
-            p = Prime(n)
-            q = Prime(n)
-            self.p = p.p
-            self.q = q.p
-            self.n = p.p * q.p
+            count = self.__default('count', primes) or 2
+            self.primes = [Prime(n).p for _ in range(count)]
+        elif self.__default('primes', primes):
+            self.primes = list(primes['primes'])
         else:
-            self.p = primes['p']
-            self.q = primes['q']
-            self.n = primes['p'] * primes['q']
+            self.primes = [primes['p'], primes['q']]
+        if len(self.primes) < 2 or len(set(self.primes)) < len(self.primes):
+            raise ValueError(f'Expect at least 2 distinct primes, got: {self.primes}')
+        self.p, self.q = self.primes[:2]
+        self.n = prod(self.primes)
+        # shared arithmetic context for the modulus
+        self.mod = mod_context(self.n)
+
+    def keys(self, *debug, e: int = 0) -> 'Cipher.Key':
+        """
+        Generate a key pair for this modulus, see `Key.gen` for `e`
+        """
+        return Cipher.Key(self.p, self.q, *debug, others=tuple(self.primes[2:]), e=e)
 
     def encrypt(self, pt: bytes, pk: bytes) -> bytes:
         """RSA encryption function
@@ -41,60 +56,123 @@ class Cipher:
         - `pt`: arbitrary bytes
         - `pk`: base64 endocded
         """
-        n = self.n
         m = Rsa().bytes2int(pt)
         e = Rsa().bytes2int(b64decode(pk))
-        return Rsa().int2bytes(pow(m, e, n))
+        return Rsa().int2bytes(self.mod.pow(m, e))
 
-    def decrypt(self, ct: bytes, sk: bytes) -> bytes:
+    def decrypt(self, ct: bytes, sk: Union[bytes, 'Cipher.Key']) -> bytes:
         """RSA decryption function
 
         - `ct`: arbitrary bytes
-        - `sk`: base64 endocded
+        - `sk`: base64 endocded, or a `Key` with its CRT components
         """
-        n = self.n
         c = Rsa().bytes2int(ct)
-        d = Rsa().bytes2int(b64decode(sk))
-        return Rsa().int2bytes(pow(c, d, n))
+        return Rsa().int2bytes(self.crt(c, self.private(sk)))
+
+    def private(self, sk: Union[bytes, 'Cipher.Key']) -> 'Cipher.Key':
+        """
+        Private key with CRT components, decoded once per `sk` while it is
+        among the latest keys, see `_private_key`
+        """
+        if isinstance(sk, Cipher.Key): return sk
+        return _private_key(sk, tuple(self.primes))
+
+    def crt(self, c: int, key: 'Cipher.Key') -> int:
+        """
+        `c^d mod n` by the CRT with Garner's recombination (RFC 8017, 5.1.2)
+
+        One exponentiation per prime with exponents and moduli of `1/k` the
+        size, about `k^2 / 4` times faster than `pow(c, d, n)` for `k` primes
+        """
+        p, q = key.primes[:2]
+        m1, m2 = pow(c, key.dP, p), pow(c, key.dQ, q)
+        m = m2 + q * ((m1 - m2) * key.qInv % p)
+        r = p * q
+        for ri, di, ti in key.crt:
+            mi = pow(c, di, ri)
+            m += r * ((mi - m) * ti % ri)
+            r *= ri
+        return m
 
     class Key:
         """
         RSA key pair generator
+
+        Keeps the private exponent with its CRT components, as in RFC 8017
+
+        - `dP = d mod (p - 1)`, `dQ = d mod (q - 1)`, `qInv = 1/q mod p`
+        - `crt`: `(r, d mod (r - 1), 1/(p*q*...) mod r)` for each further prime `r`
         """
 
-        def try_inverse(self, x: int, n: int) -> 'int | None':
+        def try_inverse(self, x: int, n: int) -> tuple[int, int]:
             """
-            Retry modular inverse until one is found or n is exceeded
+            First unit `x, x + 1, ...` modulo `n` and its inverse
             """
             if x > n:
                 raise ValueError(f'reduce {x} modulo {n}')
-            if x == n:
-                raise ValueError(f'no inverse found')
-            try:
-                return Modular().inverse(x, n)
-            except ValueError:
-                self.try_inverse(x + 1, n)
-
-        def gen(self, p: int, q: int, *debug):
+            for y in range(x, n):
+                inv = inverse(y, n)
+                if inv: return y, inv
+            raise ValueError(f'no inverse found')
+
+        def gen(self, p: int, q: int, *debug, others: tuple = (), e: int = 0):
             """
-            Generate key pair for modulus n = p * q, where p, q are large primes
+            Generate key pair for modulus n = p * q * (others), where p, q, ... are large primes
+
+            A fixed public exponent `e`, e.g. 65537, needs no search,
+            otherwise it is the first unit after a random start
 
             Base64 encoded keys
             """
-            phi = (p - 1) * (q - 1)
-            pk = 0
-            sk = None
+            primes = [p, q, *others]
+            phi = prod(r - 1 for r in primes)
             start = time()
-            while sk == None:
-                pk = SystemRandom().randint((p // 2) * (q // 2), phi - 1)
-                sk = self.try_inverse(pk, phi)
+            if e:
+                pk, sk = e, inverse(e, phi)
+                if not sk: raise ValueError(f'{e} is not invertible modulo phi(n)')
+            else:
+                pk = SystemRandom().randint(prod(r // 2 for r in primes), phi - 1)
+                pk, sk = self.try_inverse(pk, phi)
             if debug:
                 print(f'key gen time: {time() - start}')
-                print(f'modulus: {p * q}')
+                print(f'modulus: {prod(primes)}')
+            self.e = pk
+            self.precompute(sk, primes)
             self.pk = b64encode(Rsa().int2bytes(pk))
             self.sk = b64encode(Rsa().int2bytes(sk))
 
-        def __init__(self, p: int, q: int, *debug):
-            self.gen(p, q, *debug)
+        def precompute(self, d: int, primes: list[int]):
+            """
+            Set the private exponent and its CRT components
+            """
+            p, q = primes[:2]
+            self.d = d
+            self.primes = primes
+            self.dP, self.dQ = d % (p - 1), d % (q - 1)
+            self.qInv = inverse(q, p)
+            self.crt = []
+            r = p * q
+            for ri in primes[2:]:
+                self.crt.append((ri, d % (ri - 1), inverse(r, ri)))
+                r *= ri
+
+        @classmethod
+        def from_exponent(cls, d: int, primes: list[int]) -> 'Cipher.Key':
+            """
+            Private key for a known exponent `d`, no key generation
+            """
+            key = cls.__new__(cls)
+            key.precompute(d, primes)
+            return key
+
+        def __init__(self, p: int, q: int, *debug, others: tuple = (), e: int = 0):
+            self.gen(p, q, *debug, others=others, e=e)
+
+@lru_cache(maxsize=16)
+def _private_key(sk: bytes, primes: tuple[int, ...]) -> Cipher.Key:
+    """
+    Private key with CRT components decoded from `sk`, at most 16 keys are kept
+    """
+    return Cipher.Key.from_exponent(Rsa().bytes2int(b64decode(sk)), list(primes))
 
 # TODO convenience method for generating primes
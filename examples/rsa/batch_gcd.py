@@ -0,0 +1,186 @@
+"""
+# Batch GCD
+
+Find RSA moduli sharing a prime with any other modulus of a set
+(Bernstein, "How to find smooth parts of integers"; Heninger et al., "Mining your Ps and Qs")
+
+- product tree: `P = N_1 * ... * N_m`
+- remainder tree: `P mod N_i^2` for every `i`, reducing modulo the squared nodes
+- `gcd(N_i, (P mod N_i^2) / N_i)` is the product of the primes `N_i` shares
+
+Quasi-linear in the total size of the moduli instead of `m^2` gcds.
+`audit` streams moduli from a file in chunks: a product tree over the
+chunk products and its remainder tree are spilled to disk level by level,
+so memory holds one chunk tree and a few nodes of the spilled trees, at
+most the root `P`. Tree levels are spread over worker processes
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from tempfile import TemporaryDirectory
+from typing import Any, Iterable, Iterator, Union
+from .utils import Modular
+
+# smallest tree level handed to the worker processes
+MIN_PARALLEL = 16
+
+# smallest node size handed to the worker processes, below it the
+# products and remainders cost less than sending them to a worker
+PARALLEL_BITS = 1 << 15
+
+def _mul(x: int, y: int) -> int:
+    return x * y
+
+def _mod(x: int, y: int) -> int:
+    return x % y
+
+def _mod_square(x: int, y: int) -> int:
+    return x % (y * y)
+
+def level(pool: Any, fn: Any, xs: list[int], ys: list[int]) -> list[int]:
+    """
+    `fn` over one tree level, in the worker processes of `pool` if it has
+    at least `MIN_PARALLEL` nodes of at least `PARALLEL_BITS` bits
+    """
+    if pool is None or len(xs) < MIN_PARALLEL or ys[0].bit_length() < PARALLEL_BITS:
+        return list(map(fn, xs, ys))
+    return list(pool.map(fn, xs, ys, chunksize=max(1, len(xs) // 32)))
+
+def product_tree(values: list[int], pool: Any = None) -> list[list[int]]:
+    """
+    Levels of the product tree, leaves first, the root is `tree[-1][0]`
+    """
+    tree = [list(values)]
+    while len(tree[-1]) > 1:
+        prev = tree[-1]
+        nodes = level(pool, _mul, prev[0::2], prev[1::2])
+        # an odd node out moves up unchanged
+        if len(prev) % 2: nodes.append(prev[-1])
+        tree.append(nodes)
+    return tree
+
+def remainder_tree(x: int, tree: list[list[int]], pool: Any = None, square: bool = False) -> list[int]:
+    """
+    `x mod leaf` for every leaf, reducing modulo each node on the way down
+
+    With `square`, modulo the squares of the nodes, so one tree serves both
+    the product and the remainders
+    """
+    fn = _mod_square if square else _mod
+    rems = [fn(x, tree[-1][0])]
+    for nodes in reversed(tree[:-1]):
+        rems = level(pool, fn, [rems[i // 2] for i in range(len(nodes))], nodes)
+    return rems
+
+def shared_factors(moduli: list[int], rems: list[int]) -> list[int]:
+    """
+    `gcd(N, (P mod N^2) / N)` for each modulus `N`, by the shared EEA
+    """
+    res = []
+    for n, r in zip(moduli, rems):
+        r //= n
+        res.append(Modular().eea(n, r)[0] if r else n)
+    return res
+
+def batch_gcd(moduli: list[int], pool: Any = None) -> list[int]:
+    """
+    For each modulus, the product of the primes it shares with the others
+
+    `1`: no shared factor, `N`: every prime is shared, e.g. a duplicate modulus
+    """
+    if not moduli: return []
+    tree = product_tree(moduli, pool)
+    return shared_factors(moduli, remainder_tree(tree[-1][0], tree, pool, square=True))
+
+def _dump(path: str, x: int):
+    with open(path, 'wb') as f:
+        f.write(x.to_bytes((x.bit_length() + 7) // 8, 'big'))
+
+def _load(path: str) -> int:
+    with open(path, 'rb') as f:
+        return int.from_bytes(f.read(), 'big')
+
+def read_moduli(path: str) -> Iterator[int]:
+    """
+    Moduli from a text file, one per line, decimal or `0x` hex,
+    blank lines and `#` comments are skipped
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.split('#')[0].strip()
+            if line: yield int(line, 0)
+
+def chunks(values: Iterable[int], size: int) -> Iterator[list[int]]:
+    """
+    Consecutive lists of `size` values
+    """
+    it = iter(values)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+def resolve(weak: list[tuple[int, int, int]]) -> list[tuple[int, int, int]]:
+    """
+    Split the moduli whose every prime is shared, `g = N`, by pairwise gcds
+    among the weak moduli, as their primes are shared with other weak moduli
+    """
+    res = []
+    for i, n, g in weak:
+        if g == n:
+            for _, m, _ in weak:
+                d = Modular().eea(n, m)[0] if m != n else n
+                if 1 < d < n:
+                    g = d
+                    break
+        res.append((i, n, g))
+    return res
+
+def audit(path: str, chunk: int = 4096, workers: int = 0, tmp: Union[str, None] = None) -> list[tuple[int, int, int]]:
+    """
+    Batch GCD over the moduli in the file at `path`
+
+    - `chunk`: moduli per chunk, bounds the memory to one chunk tree
+    - `workers`: processes for the tree levels, none if `0`
+    - `tmp`: directory for the spilled trees
+
+    Return `(index in the file, modulus, shared factor)` for each weak modulus
+    """
+    if chunk < 1:
+        raise ValueError(f'Expect positive chunk size, got: {chunk}')
+    pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+    weak = []
+    try:
+        with TemporaryDirectory(dir=tmp) as spill:
+            def node(kind: str, depth: int, j: int) -> str:
+                return os.path.join(spill, f'{kind}{depth}.{j}.bin')
+            # pass 1: chunk products, the leaves of the spilled product tree
+            widths = [0]
+            for moduli in chunks(read_moduli(path), chunk):
+                _dump(node('p', 0, widths[0]), product_tree(moduli, pool)[-1][0])
+                widths[0] += 1
+            if not widths[0]: return []
+            # product tree over the chunk products, one level at a time
+            while widths[-1] > 1:
+                d, w = len(widths) - 1, widths[-1]
+                for j in range(0, w, 2):
+                    x = _load(node('p', d, j))
+                    if j + 1 < w: x *= _load(node('p', d, j + 1))
+                    _dump(node('p', d + 1, j // 2), x)
+                widths.append((w + 1) // 2)
+            # remainder tree: P mod node^2 down to the chunk products, the root is P
+            top = len(widths) - 1
+            os.replace(node('p', top, 0), node('r', top, 0))
+            for d in range(top - 1, -1, -1):
+                for j in range(0, widths[d], 2):
+                    r = _load(node('r', d + 1, j // 2))
+                    for k in range(j, min(j + 2, widths[d])):
+                        x = _load(node('p', d, k))
+                        _dump(node('r', d, k), r % (x * x))
+            # pass 2: P mod (chunk product)^2 down each chunk tree
+            for i, moduli in enumerate(chunks(read_moduli(path), chunk)):
+                rems = remainder_tree(_load(node('r', 0, i)), product_tree(moduli, pool), pool, square=True)
+                for k, (n, g) in enumerate(zip(moduli, shared_factors(moduli, rems))):
+                    if g != 1: weak.append((i * chunk + k, n, g))
+    finally:
+        if pool: pool.shutdown()
+    return resolve(weak)
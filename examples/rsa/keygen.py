@@ -0,0 +1,178 @@
+"""
+# Parallel key generation
+
+Prime search spread over worker processes
+
+- each task searches one prime with its own seed, so the candidates it
+  sieves and the Miller-Rabin rounds it runs are reproducible
+- `workers` tasks run at once until the first `count` primes are found,
+  a slow search does not hold up the others
+- once enough primes are found, a shared event stops the running
+  searches and the queued tasks are cancelled
+- the worker processes are started once and reused by later bursts
+  until `close`
+"""
+
+import os
+from ._rsa import Cipher
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from math import gcd
+from multiprocessing import Event
+from threading import Lock
+from time import perf_counter
+from typing import Any, Union
+from .utils import Prime
+
+# upper bound on worker processes
+MAX_WORKERS = 32
+
+# event shared with the workers of a pool, see `_init`
+_stop = None
+
+def _init(stop: Any):
+    """
+    Worker initializer, synchronization primitives cannot be task arguments
+    """
+    global _stop
+    _stop = stop
+
+def _search(bits: int, seed: Union[str, None], time_limit: float) -> dict:
+    """
+    One task: search one prime, return it with the statistics of the search
+    """
+    start = perf_counter()
+    try:
+        prime = Prime(bits, time_limit, seed=seed, stop=_stop)
+        p = prime.p
+    except ValueError:
+        prime, p = None, 0
+    return {
+        'seed': seed,
+        'prime': p,
+        'candidates': prime.candidates if prime else 0,
+        'tests': prime.tests if prime else 0,
+        'seconds': perf_counter() - start,
+    }
+
+class KeyGen:
+    """
+    Parallel prime and RSA key pair generator
+
+    `stats` holds one entry per finished task: its seed, prime (0 if
+    stopped), candidates sieved, Miller-Rabin rounds and seconds. With a
+    `seed`, task `i` searches with seed `f'{seed}:{i}'`, so each entry is
+    reproducible, while which tasks finish first depends on scheduling
+
+    Bursts are serialized and share one process pool, shut down by `close`
+    or at the end of a `with` block
+    """
+
+    def __init__(self, bits: int, workers: int = 0, seed: Union[int, str, None] = None, time_limit: float = 60):
+        if bits < 2:
+            raise ValueError(f'Expect at least 2 bits, got: {bits}')
+        self.bits = bits
+        self.workers = max(1, min(workers or os.cpu_count() or 1, MAX_WORKERS))
+        self.seed = seed
+        self.time_limit = time_limit
+        self.stats = []
+        self.tasks = 0
+        self.__pool = None
+        self.__stop = None
+        self.__lock = Lock()
+
+    def __seed(self) -> Union[str, None]:
+        """
+        Seed of the next task
+        """
+        self.tasks += 1
+        return None if self.seed is None else f'{self.seed}:{self.tasks - 1}'
+
+    def primes(self, count: int) -> list[int]:
+        """
+        Generate `count` distinct primes in parallel
+        """
+        with self.__lock:
+            if self.__pool is None:
+                self.__stop = Event()
+                self.__pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init, initargs=(self.__stop,))
+            pool, stop = self.__pool, self.__stop
+            stop.clear()
+            found = []
+            def submit():
+                return pool.submit(_search, self.bits, self.__seed(), self.time_limit)
+            running = set()
+            try:
+                running = {submit() for _ in range(self.workers)}
+                while running and len(found) < count:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for task in done:
+                        stats = task.result()
+                        self.stats.append(stats)
+                        p = stats['prime']
+                        if not p:
+                            raise ValueError(f'Exceeded time limit before finding >= {self.bits}-bit prime.')
+                        if p not in found and len(found) < count:
+                            found.append(p)
+                    while len(found) < count and len(running) < self.workers:
+                        running.add(submit())
+            except BrokenProcessPool:
+                # a dead worker breaks the pool, the next burst starts a new one
+                self.__pool = None
+                pool.shutdown(cancel_futures=True)
+                raise
+            finally:
+                # stop the running searches, so the pool is idle for the next burst
+                stop.set()
+                for task in running: task.cancel()
+                wait(running)
+                # a failed task, e.g. a broken pool, must not hide the error being raised
+                for task in running:
+                    if not task.cancelled() and task.exception() is None:
+                        self.stats.append(task.result())
+            return found
+
+    def keys(self, count: int = 1, primes: int = 2, e: int = 0) -> list[tuple[Cipher, Cipher.Key]]:
+        """
+        Generate `count` RSA key pairs with `primes` primes each,
+        all primes are searched in one parallel burst
+
+        With a fixed public exponent `e`, primes `p` with `gcd(e, p - 1) > 1` are replaced,
+        as are primes already found by an earlier burst
+        """
+        ps = []
+        while len(ps) < count * primes:
+            for p in self.primes(count * primes - len(ps)):
+                if p not in ps and (not e or gcd(e, p - 1) == 1): ps.append(p)
+        res = []
+        for i in range(count):
+            cipher = Cipher(primes=ps[i * primes:(i + 1) * primes])
+            res.append((cipher, cipher.keys(e=e)))
+        return res
+
+    def close(self):
+        """
+        Shut down the worker processes
+        """
+        with self.__lock:
+            if self.__pool is not None:
+                self.__pool.shutdown(cancel_futures=True)
+                self.__pool = None
+
+    def __enter__(self) -> 'KeyGen':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary(self) -> dict:
+        """
+        Totals over all tasks so far
+        """
+        return {
+            'tasks': len(self.stats),
+            'primes': sum(1 for s in self.stats if s['prime']),
+            'candidates': sum(s['candidates'] for s in self.stats),
+            'tests': sum(s['tests'] for s in self.stats),
+            'seconds': sum(s['seconds'] for s in self.stats),
+        }
@@ -0,0 +1,151 @@
+"""
+# Key pool
+
+Pre-generated RSA key pairs, so that prime generation stays off the request path
+
+- `checkout` pops a ready key pair in `O(1)`
+- a background thread refills the pool to `size` once it drops below `low`,
+  searching primes in process with `Prime` or in `workers` processes with `KeyGen`,
+  started with the pool and shut down by `close`
+- `metrics` reports hits, misses and refill times
+"""
+
+from collections import deque
+from .keygen import KeyGen
+from math import gcd
+from threading import Event, Lock, Thread
+from time import perf_counter
+from ._rsa import Cipher
+from .utils import Prime
+
+class KeyPool:
+    """
+    Pool of ready RSA key pairs `(cipher, key)`
+
+    Each key holds its primes, `e`, `d` and the CRT components. A checkout
+    from an empty pool is a miss and generates a key pair inline
+    """
+
+    def __init__(self, bits: int, size: int = 8, low: int = -1, primes: int = 2, e: int = 65537, workers: int = 0, start: bool = True):
+        if size < 1:
+            raise ValueError(f'Expect positive pool size, got: {size}')
+        self.bits = bits
+        self.size = size
+        self.low = size // 2 if low < 0 else min(low, size)
+        self.primes = primes
+        self.e = e
+        self.workers = workers
+        self.keygen = KeyGen(bits, workers) if workers else None
+        self.keys = deque()
+        self.hits = self.misses = 0
+        self.refills = 0
+        # durations of the latest refills
+        self.refill_seconds = deque(maxlen=1000)
+        self.__lock = Lock()
+        # one refill at a time, the background one or a direct call
+        self.__filling = Lock()
+        self.__wake = Event()
+        self.__stop = Event()
+        self.__thread = Thread(target=self.__run, name='KeyPool refill', daemon=True)
+        if start:
+            self.__thread.start()
+            self.__wake.set()
+
+    def generate(self, count: int = 1) -> list[tuple[Cipher, Cipher.Key]]:
+        """
+        Generate `count` key pairs, in process or in `workers` processes
+        """
+        if self.keygen:
+            return self.keygen.keys(count, self.primes, self.e)
+        res = []
+        for _ in range(count):
+            ps = []
+            while len(ps) < self.primes:
+                p = Prime(self.bits).p
+                if p not in ps and (not self.e or gcd(self.e, p - 1) == 1):
+                    ps.append(p)
+            cipher = Cipher(primes=ps)
+            res.append((cipher, cipher.keys(e=self.e)))
+        return res
+
+    def __run(self):
+        """
+        Refill thread: sleep until woken, then fill up to `size`
+        """
+        while True:
+            self.__wake.wait()
+            if self.__stop.is_set(): return
+            self.__wake.clear()
+            self.refill()
+
+    def refill(self):
+        """
+        Fill the pool up to `size`, record the time taken
+
+        Refills are serialized, so concurrent calls do not overfill the pool
+        """
+        with self.__filling:
+            start = perf_counter()
+            if len(self.keys) >= self.size: return
+            # in batches of one key pair per `primes` workers, so that checkouts
+            # see new keys early and `close` waits for one batch at most
+            batch = max(1, self.workers // self.primes)
+            while len(self.keys) < self.size and not self.__stop.is_set():
+                self.keys.extend(self.generate(min(batch, self.size - len(self.keys))))
+            with self.__lock:
+                self.refills += 1
+                self.refill_seconds.append(perf_counter() - start)
+
+    def checkout(self) -> tuple[Cipher, Cipher.Key]:
+        """
+        Take a key pair, generated inline if the pool is empty
+        """
+        try:
+            pair = self.keys.popleft()
+            hit = True
+        except IndexError:
+            hit = False
+        with self.__lock:
+            if hit: self.hits += 1
+            else: self.misses += 1
+        if len(self.keys) < self.low: self.__wake.set()
+        return pair if hit else self.generate()[0]
+
+    def __len__(self) -> int:
+        """
+        Number of ready key pairs
+        """
+        return len(self.keys)
+
+    def metrics(self) -> dict:
+        """
+        Hits, misses, hit rate, ready keys and refill times in seconds
+        """
+        with self.__lock:
+            total = self.hits + self.misses
+            times = list(self.refill_seconds)
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'ready': len(self.keys),
+                'refills': self.refills,
+                'refill_last': times[-1] if times else 0.0,
+                'refill_mean': sum(times) / len(times) if times else 0.0,
+                'refill_max': max(times, default=0.0),
+            }
+
+    def close(self):
+        """
+        Stop the refill thread and the worker processes
+        """
+        self.__stop.set()
+        self.__wake.set()
+        if self.__thread.is_alive(): self.__thread.join()
+        if self.keygen: self.keygen.close()
+
+    def __enter__(self) -> 'KeyPool':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,70 @@
+"""
+Batch GCD unit tests
+"""
+
+from . import batch_gcd as bg
+import os
+import unittest
+from .batch_gcd import batch_gcd, product_tree, remainder_tree, audit
+from math import gcd, prod
+from secrets import SystemRandom
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from .utils import Prime
+
+def pairwise(moduli: list[int]) -> list[int]:
+    """
+    Product of the primes each modulus shares, by all pairwise gcds
+    """
+    res = []
+    for i, n in enumerate(moduli):
+        shared = [gcd(n, m) for j, m in enumerate(moduli) if j != i]
+        g = 1
+        for d in shared:
+            g = g * d // gcd(g, d)
+        res.append(gcd(n, g))
+    return res
+
+class TestBatchGcd(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        primes = [Prime(64).p for _ in range(60)]
+        # 25 sound moduli, 3 pairs sharing one prime, one sharing both
+        cls.moduli = [primes[2 * i] * primes[2 * i + 1] for i in range(25)]
+        cls.moduli += [primes[50] * primes[51], primes[50] * primes[52], primes[53] * primes[54], primes[53] * primes[55]]
+        cls.moduli += [primes[0] * primes[3]]
+        SystemRandom().shuffle(cls.moduli)
+
+    def test_trees(self):
+        """Root is the product, remainders agree with %"""
+        values = [SystemRandom().randrange(1, 2 ** 64) for _ in range(13)]
+        tree = product_tree(values)
+        self.assertEqual(tree[-1], [prod(values)])
+        x = SystemRandom().randrange(2 ** 1000)
+        self.assertEqual(remainder_tree(x, tree), [x % v for v in values])
+
+    def test_batch_gcd(self):
+        """Agrees with pairwise gcds"""
+        self.assertEqual(batch_gcd(self.moduli), pairwise(self.moduli))
+        self.assertEqual(batch_gcd([]), [])
+
+    def test_audit(self):
+        """Streamed chunks, worker processes and the full-overlap case"""
+        expected = pairwise(self.moduli)
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'moduli.txt')
+            with open(path, 'w') as f:
+                f.write('# audit\n')
+                for i, n in enumerate(self.moduli):
+                    f.write(f'{hex(n) if i % 2 else n}\n')
+            for chunk, workers in [(1, 0), (7, 0), (16, 2), (100, 0)]:
+                # small moduli only reach the workers without the size threshold
+                with patch.object(bg, 'PARALLEL_BITS', 0):
+                    weak = audit(path, chunk, workers)
+                self.assertEqual([i for i, _, _ in weak], [i for i, g in enumerate(expected) if g != 1])
+                for i, n, g in weak:
+                    self.assertEqual(n, self.moduli[i])
+                    self.assertTrue(1 < g < n and n % g == 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Parallel key generation unit tests
+"""
+
+import unittest
+from .keygen import KeyGen, MAX_WORKERS
+from modular import is_prime
+
+class TestKeyGen(unittest.TestCase):
+    def test_primes(self):
+        """Distinct primes of the requested size"""
+        with KeyGen(256, workers=2) as gen:
+            primes = gen.primes(5)
+            self.assertEqual(len(set(primes)), 5)
+            self.assertTrue(all(is_prime(p) and p.bit_length() >= 256 for p in primes))
+            self.assertGreaterEqual(gen.summary()['primes'], 5)
+            # a second burst on the same worker processes
+            more = gen.primes(2)
+            self.assertEqual(len(set(more)), 2)
+            self.assertTrue(all(is_prime(p) for p in more))
+
+    def test_reproducible(self):
+        """Seeded tasks repeat their search exactly"""
+        with KeyGen(256, workers=2, seed=7) as first, KeyGen(256, workers=3, seed=7) as second:
+            first.primes(3)
+            second.primes(3)
+        a = {s['seed']: s for s in first.stats if s['prime']}
+        b = {s['seed']: s for s in second.stats if s['prime']}
+        self.assertTrue(a.keys() & b.keys())
+        for seed in a.keys() & b.keys():
+            for k in ['prime', 'candidates', 'tests']:
+                self.assertEqual(a[seed][k], b[seed][k])
+
+    def test_keys(self):
+        """Key pairs from one burst round trip"""
+        with KeyGen(256, workers=2) as gen:
+            for cipher, key in gen.keys(2, primes=3):
+                self.assertEqual(len(cipher.primes), 3)
+                self.assertEqual(cipher.decrypt(cipher.encrypt(b'burst', key.pk), key), b'burst')
+
+    def test_workers(self):
+        """Worker count is bounded"""
+        self.assertEqual(KeyGen(256, workers=1000).workers, MAX_WORKERS)
+        with self.assertRaises(ValueError):
+            KeyGen(1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Key pool unit tests
+"""
+
+import unittest
+from math import gcd
+from multiprocessing import active_children
+from .pool import KeyPool
+from threading import Thread
+from time import sleep
+
+class TestKeyPool(unittest.TestCase):
+    def wait_refills(self, pool: KeyPool, refills: int):
+        for _ in range(500):
+            if pool.metrics()['refills'] >= refills: return
+            sleep(0.01)
+        self.fail('pool was not refilled')
+
+    def test_checkout(self):
+        """Hits from the pool, refill below the low-water mark"""
+        with KeyPool(256, size=4, low=2) as pool:
+            self.wait_refills(pool, 1)
+            self.assertEqual(len(pool), 4)
+            pairs = [pool.checkout() for _ in range(3)]
+            for cipher, key in pairs:
+                self.assertEqual(key.e, 65537)
+                self.assertEqual(key.qInv * cipher.q % cipher.p, 1)
+                self.assertEqual(cipher.decrypt(cipher.encrypt(b'pool', key.pk), key), b'pool')
+            self.assertEqual(len({cipher.n for cipher, _ in pairs}), 3)
+            self.wait_refills(pool, 2)
+            metrics = pool.metrics()
+            self.assertEqual((metrics['hits'], metrics['misses'], metrics['ready']), (3, 0, 4))
+            self.assertGreater(metrics['refill_mean'], 0)
+
+    def test_miss(self):
+        """An empty pool generates inline and counts a miss"""
+        pool = KeyPool(256, size=2, primes=3, start=False)
+        cipher, key = pool.checkout()
+        self.assertEqual(len(cipher.primes), 3)
+        self.assertTrue(all(gcd(key.e, p - 1) == 1 for p in cipher.primes))
+        self.assertEqual(pool.metrics()['misses'], 1)
+        pool.refill()
+        self.assertEqual(len(pool), 2)
+        pool.checkout()
+        self.assertEqual(pool.metrics()['hit_rate'], 0.5)
+
+    def test_workers(self):
+        """Refill in worker processes, started once for all batches"""
+        with KeyPool(256, size=3, workers=2, start=False) as pool:
+            pool.refill()
+            self.assertEqual(len(pool), 3)
+            cipher, key = pool.checkout()
+            self.assertEqual(cipher.decrypt(cipher.encrypt(b'pool', key.pk), key.sk), b'pool')
+            workers = {p.pid for p in active_children()}
+            self.assertTrue(workers)
+            pool.refill()
+            self.assertEqual(len(pool), 3)
+            self.assertEqual({p.pid for p in active_children()}, workers)
+        self.assertEqual(active_children(), [])
+
+    def test_concurrent_refill(self):
+        """Direct refills racing the background thread do not overfill"""
+        with KeyPool(256, size=3, low=3) as pool:
+            threads = [Thread(target=pool.refill) for _ in range(4)]
+            for t in threads: t.start()
+            for t in threads: t.join()
+            self.wait_refills(pool, 1)
+            self.assertEqual(len(pool), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,18 +2,16 @@
 RSA unit tests
 """
 
-import sys
 import math
 import unittest
-from _rsa import Cipher
+from ._rsa import Cipher
 from time import time
-from utils import RsaTransformations as Rsa
+from .utils import RsaTransformations as Rsa, Prime, SIEVE_PRIMES, mr_rounds
+from modular import is_prime
 from secrets import SystemRandom, token_bytes
 
 class TestRsa(unittest.TestCase):
     def test_rsa_make(self):
-        sys.setrecursionlimit(2000)
-
         cipher = Cipher(
             p = 299047036163466364593578671668105626794065326168257844506186760677132120379225668124615386505435634772733711855433506678212683219321934400431853837348621859006132708571197703124787540096917574784669270398109378338035186349072231512072877113120037670314261590067246212799116837416098173423817299815147,
             q = 196763460946331349352499186611298628881243819903022496947907288526248422121851804346103094757867302222609503531023139472071798569335158505187945748246438168058674072267295382468467831591298752055972131783828041051056215358125513302847552420440611465989162677681036110999725853317071074438332295580687)
@@ -54,6 +52,69 @@ Incorrect:          {d}\n\
 Correct:            {c}\n\
 # -------------------------------- #\n\
 Total:              {a + b + c + d}')
+        self.assertEqual(c, num_test)
+
+class TestCrt(unittest.TestCase):
+    def test_components(self):
+        """CRT decryption agrees with pow(c, d, n)"""
+        cipher = Cipher(primes=[2 ** 127 - 1, 2 ** 89 - 1])
+        key = cipher.keys()
+        p, q = cipher.p, cipher.q
+        self.assertEqual((key.dP, key.dQ), (key.d % (p - 1), key.d % (q - 1)))
+        self.assertEqual(key.qInv * q % p, 1)
+        for _ in range(20):
+            c = SystemRandom().randrange(cipher.n)
+            self.assertEqual(cipher.crt(c, key), pow(c, key.d, cipher.n))
+
+    def test_multi_prime(self):
+        """Round trips with 3 and 4 primes, key objects or encoded keys"""
+        for primes in [[2 ** 127 - 1, 2 ** 89 - 1, 2 ** 107 - 1], [2 ** 127 - 1, 2 ** 89 - 1, 2 ** 107 - 1, 2 ** 61 - 1]]:
+            cipher = Cipher(primes=primes)
+            key = cipher.keys()
+            self.assertEqual(len(key.crt), len(primes) - 2)
+            for _ in range(20):
+                x = b'\x01' + token_bytes(SystemRandom().randint(0, 30))
+                ct = cipher.encrypt(x, key.pk)
+                self.assertEqual(cipher.decrypt(ct, key), x)
+                self.assertEqual(cipher.decrypt(ct, key.sk), x)
+        with self.assertRaises(ValueError):
+            Cipher(primes=[7, 7])
+
+    def test_private_cache(self):
+        """Encoded keys are decoded once, only the latest ones are kept"""
+        cipher = Cipher(primes=[2 ** 127 - 1, 2 ** 89 - 1])
+        keys = [cipher.keys() for _ in range(17)]
+        first = cipher.private(keys[0].sk)
+        self.assertIs(cipher.private(keys[0].sk), first)
+        self.assertEqual((first.dP, first.dQ, first.qInv), (keys[0].dP, keys[0].dQ, keys[0].qInv))
+        for key in keys[1:]:
+            cipher.private(key.sk)
+        self.assertIsNot(cipher.private(keys[0].sk), first)
+
+class TestPrime(unittest.TestCase):
+    def test_sieve(self):
+        """Survivors are exactly the candidates without a small factor"""
+        prime = Prime(64)
+        for start in [3, 1001, 2 ** 64 + 1]:
+            expected = [c for c in range(start, start + 2 * 1000, 2)
+                        if all(c % q or c == q for q in SIEVE_PRIMES if q * q <= start + 2000)]
+            self.assertEqual(prime.sieve(start, 1000), expected)
+
+    def test_primes(self):
+        """Generated primes pass the deterministic test"""
+        for bits in [16, 64, 512, 1024]:
+            prime = Prime(bits)
+            self.assertTrue(is_prime(prime.p))
+            self.assertGreaterEqual(prime.p.bit_length(), bits)
+            self.assertGreater(prime.candidates, 0)
+        self.assertEqual([mr_rounds(b) for b in [64, 512, 1024, 2048]], [40, 6, 3, 2])
+
+    def test_composites(self):
+        """Miller-Rabin rejects Carmichael numbers and strong pseudoprimes"""
+        for n in [561, 41041, 3215031751, 2047, 1373653, 3825123056546413051, 318665857834031151167461]:
+            prime = Prime(8)
+            prime.p = n
+            self.assertFalse(prime.is_probable_prime())
 
 if __name__ == '__main__':
     unittest.main()
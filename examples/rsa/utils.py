@@ -1,7 +1,13 @@
-from math import ceil, floor, sqrt, log
-from random import SystemRandom
+from bisect import bisect
+from itertools import compress
+from math import ceil, floor, isqrt, sqrt, log
+from random import Random, SystemRandom
 from time import time
-from secrets import token_bytes, choice
+from typing import Any, Union
+from secrets import token_bytes
+
+from extended_euclidean_algorithm import eea, inverse
+from modular import mod_context
 
 class RsaTransformations:
     """
@@ -51,50 +57,72 @@ class RsaTransformations:
 class Modular:
     """
     Modular inverses via Extended Euclidean algorithm
-    """
 
-    def __sgn(self, x: int) -> int:
-        """
-        Returns sign `+`/`-`
-        """
-        return 1 if x > 0 else -1
+    Shares the iterative engine in `../extended_euclidean_algorithm.py`
+    """
 
     def eea(self, x: int, y: int) -> tuple[int, int, int]:
         """
         Compute the `gcd` and Bezout coefficients
         `a`, `b` s.t. `gcd = a*x + b*y`
         """
-        if x == 0 or y == 0: raise ValueError('EEA only works on nonzero integers')
-        cx, cy = self.__sgn(x), self.__sgn(y)
-        x, y = abs(x), abs(y)
-        def aux(x: int, y: int) -> tuple[int, int, int]:
-            if x > y: aux(y, x)
-            if x % y == 0: return y, 0, 1
-            gcd1, _a1, _b1 = aux(y % x, x)
-            a1 = _b1 - (y // x) * _a1
-            b1 = _a1
-            return gcd1, a1, b1
-        gcd, _a, _b = aux(x, y)
-        a = cx * _a
-        b = cy * _b
-        return gcd, a, b
+        return eea(x, y)
 
     def inverse(self, x: int, n: int) -> int:
         """
-        Inverse of `x` modulo `n` using extended Euclidean algorithm
+        Inverse of `x` modulo `n`, `0` if there is none
         """
-        gcd, a, _ = self.eea(x, n)
-        if gcd != 1:
+        a = inverse(x, n)
+        if not a:
             print(f'{x} does not have an inverse mod {n}')
-            return 0
-        else:
-            return a % n
+        return a
+
+def small_primes(limit: int) -> list[int]:
+    """
+    Odd primes below `limit`, sieve of Eratosthenes
+    """
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b'\x00\x00'
+    for k in range(2, isqrt(limit - 1) + 1):
+        if sieve[k]:
+            sieve[k * k::k] = bytes(len(range(k * k, limit, k)))
+    return [k for k in range(3, limit) if sieve[k]]
+
+# trial divisors for the candidate sieve, the 3511 odd primes below 2^15
+SIEVE_PRIMES = small_primes(1 << 15)
+
+# Miller-Rabin bases, deterministic for `n < 3.3 * 10^24`, so below 2^81
+MR_BASES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+
+# rounds of Miller-Rabin with random bases for an error below 2^-80 on
+# random candidates of at least this many bits (HAC, table 4.4; FIPS 186-4, C.3)
+MR_ROUNDS = [(1300, 2), (850, 3), (650, 4), (550, 5), (450, 6), (400, 7), (350, 8), (300, 9), (250, 12), (200, 15), (150, 18), (100, 27)]
+
+def mr_rounds(num_bits: int) -> int:
+    """
+    Number of Miller-Rabin rounds for random `num_bits`-bit candidates
+    """
+    for bits, rounds in MR_ROUNDS:
+        if num_bits >= bits: return rounds
+    return 40
 
 class Prime:
     """
     Functionalities for generating primes via Miller-Rabin
+
+    Candidates are searched incrementally from a random odd start. Each
+    window of `WINDOW` odd candidates is sieved by `SIEVE_PRIMES`, which
+    removes about 90% of them, and only the survivors are tested by
+    Miller-Rabin. `candidates` and `tests` count the sieved candidates
+    and the Miller-Rabin rounds
+
+    With a `seed` the search is reproducible, start and bases come from
+    `random.Random(seed)` instead of the system's randomness
     """
 
+    # odd candidates per sieve window, about 10 prime gaps at 1024 bits
+    WINDOW = 4096
+
     def gen_bits(self, num_bits: int) -> str:
         """
         Generate a (mostly) random bit string of length `self.num_bits + 2`
@@ -102,43 +130,59 @@ class Prime:
         """
         n = max(ceil(num_bits / 8), 1)
         # ensure: odd + sufficiently many bits
-        bits = ''.join([f'{b:08b}' for b in token_bytes(n)])
+        bits = f'{self.random.getrandbits(8 * n):0{8 * n}b}'
         bits = f'1{bits}1'
         return bits
 
     def __rs(self) -> tuple[int, int]:
         """
-        Generate Miller-Rabin values: `r`, `s`
+        Generate Miller-Rabin values: `r`, `s` with `p - 1 = 2^s * r`, `r` odd
         """
         m = self.p - 1
-        r = m
-        s = 0
-        while m % 2 == 0:
-            m = m // 2
-            s *= 2
-            r = m
-        return r, s
+        s = (m & -m).bit_length() - 1
+        return m >> s, s
 
-    def miller_rabin_primality_test(self) -> bool:
+    def miller_rabin_primality_test(self, a: int = 0) -> bool:
         """
-        Miller-Rabin primality test, detects (most) composite numbers quickly
+        Miller-Rabin primality test to base `a`, random if not given,
+        detects (most) composite numbers quickly
         """
         p = self.p
-        a = choice(range(1, p))
+        if p < 5: return p in (2, 3)
+        if not a: a = self.random.randrange(2, p - 1)
+        self.tests += 1
         r, s = self.__rs()
-        if pow(a, r, p) == 1 or any([pow(a, 2**j * r, p) == p - 1 for j in range(0, s)]):
-            return True
-        else:
-            return False
+        x = pow(a, r, p)
+        if x == 1 or x == p - 1: return True
+        for _ in range(s - 1):
+            x = x * x % p
+            if x == p - 1: return True
+        return False
 
-    def naive_primality_test(self) -> bool:
+    def is_probable_prime(self) -> bool:
         """
-        Naive primality test
+        Miller-Rabin with the deterministic bases `MR_BASES` below 2^81,
+        `self.rounds` random bases above
         """
-        p = self.p
-        for k in filter(lambda x: x == 5 or x % 5, range(3, ceil(sqrt(p)), 2)):
-            if not p % k: return False
-        return True
+        if self.p.bit_length() < 82:
+            return all(self.miller_rabin_primality_test(a) for a in MR_BASES if a < self.p - 1)
+        return all(self.miller_rabin_primality_test() for _ in range(self.rounds))
+
+    def sieve(self, start: int, width: int) -> list[int]:
+        """
+        Odd candidates `start + 2*i`, `0 <= i < width`, without a factor in `SIEVE_PRIMES`
+
+        `start` is odd
+        """
+        alive = bytearray([1]) * width
+        # divisors up to the square root suffice for small candidates
+        for q in SIEVE_PRIMES[:bisect(SIEVE_PRIMES, isqrt(start + 2 * width))]:
+            # first i with q | start + 2*i, skipping q itself
+            i = -start * ((q + 1) // 2) % q
+            if start + 2 * i == q: i += q
+            alive[i::q] = bytes(len(range(i, width, q)))
+        self.candidates += width
+        return [start + 2 * i for i in compress(range(width), alive)]
 
     def __check(self, limit: float, debug: bool) -> int:
         """
@@ -146,33 +190,31 @@ class Prime:
         such that `p.bit_length() >= self.num_bits`
         """
         start = time()
-        incrs = 0
-        round = self.rounds
-        while time() - start < limit :
-            if not round:
-                round = self.rounds
-                incrs += 1
-                self.p += 2
-                if not self.p % 5:
-                    incrs += 1
-                    self.p += 2
-            if self.miller_rabin_primality_test():
-                if self.naive_primality_test():
+        while time() - start < limit:
+            if self.stop and self.stop.is_set(): return 0
+            for p in self.sieve(self.p, self.WINDOW):
+                self.p = p
+                if self.is_probable_prime():
                     if debug: print(f'Execution time: {time() - start} sec')
                     return self.p
-            round -= 1
+            self.p += 2 * self.WINDOW
         return 0
 
-    def __init__(self, num_bits: int, time_limit: int = 60, debug: bool = False):
+    def __init__(self, num_bits: int, time_limit: int = 60, debug: bool = False, seed: Union[int, str, None] = None, stop: Any = None):
         """
         Initialize a prime number with at least `num_bits` significant bits.
-        Give up after `time_limit` sec.
+        Give up after `time_limit` sec, or once the event `stop` is set.
         """
         self.num_bits = num_bits
-        self.rounds = max(num_bits // 2, 1)
+        self.rounds = mr_rounds(num_bits)
+        self.candidates = self.tests = 0
+        self.random = SystemRandom() if seed is None else Random(seed)
+        self.stop = stop
         self.bits = self.gen_bits(num_bits)
         self.p = int(self.bits, 2)
         if self.__check(time_limit, debug) == 0:
+            if stop and stop.is_set():
+                raise ValueError(f'Stopped before finding >= {num_bits}-bit prime.')
             raise ValueError(f'Exceeded time limit before finding >= {num_bits}-bit prime. Consider increasing the time limit.')
 
 # ------------------
@@ -225,7 +267,7 @@ for _ in range (1000):
 # though that should be obvious from their generation
 # only checking small primes 12-27 bits
 for _ in range(1000):
-    n = choice(range(10, 25))
+    n = SystemRandom().randint(10, 24)
     p = Prime(n, 10)
     for k in range(2, ceil(sqrt(p.p))):
         if not p.p % k: assert False
@@ -0,0 +1,275 @@
+"""
+Scalar multiplication
+
+Strategies for computing `k*P` with `O(log k)` group operations
+
+- double-and-add
+- sliding window
+- width-w NAF
+- fixed-base windowed tables
+- multi-scalar multiplication `k1*P1 + ... + km*Pm`
+
+Each strategy only relies on the group interface of the curve classes
+
+- `add(p, q)`
+- `double(p)`
+- `neg(p)`
+- `identity()`
+"""
+
+from typing import Annotated, Any
+
+# scalar multiplier
+scalar = Annotated[int, 'Nonnegative scalar multiplier']
+
+# window width
+width = Annotated[int, 'Window width in bits']
+
+def odd_multiples(group: Any, p: Any, m: int) -> list:
+    """
+    Precompute the odd multiples `[P, 3P, 5P, ..., (2m - 1)P]`
+    """
+    table = [p]
+    if m > 1:
+        p2 = group.double(p)
+        for _ in range(1, m):
+            table.append(group.add(table[-1], p2))
+    return table
+
+def naf(k: scalar, w: width = 2) -> list[int]:
+    """
+    Width-w non-adjacent form of `k`, least significant digit first
+
+    Each nonzero digit is odd and lies in `(-2^(w-1), 2^(w-1))`
+    and any `w` consecutive digits contain at most one nonzero digit
+    """
+    if w < 2:
+        raise ValueError(f'Expect NAF width of at least 2, got: {w}')
+    digits = []
+    mod, half = 1 << w, 1 << (w - 1)
+    while k > 0:
+        if k & 1:
+            d = k & (mod - 1)
+            if d >= half: d -= mod
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+def double_and_add(group: Any, k: scalar, p: Any, w: width = 1) -> Any:
+    """
+    Left-to-right binary method
+
+    `bits(k)` doublings and `weight(k)` additions
+    """
+    acc = group.identity()
+    for bit in bin(k)[2:]:
+        acc = group.double(acc)
+        if bit == '1':
+            acc = group.add(acc, p)
+    return acc
+
+def sliding_window(group: Any, k: scalar, p: Any, w: width = 4) -> Any:
+    """
+    Left-to-right sliding window method
+
+    Precomputes the `2^(w-1)` odd multiples of `p`, then
+    `bits(k)` doublings and about `bits(k) / (w + 1)` additions
+    """
+    table = odd_multiples(group, p, 1 << (w - 1))
+    acc = group.identity()
+    i = k.bit_length() - 1
+    while i >= 0:
+        if not (k >> i) & 1:
+            acc = group.double(acc)
+            i -= 1
+            continue
+        # longest window of at most w bits ending in a 1
+        j = max(i - w + 1, 0)
+        while not (k >> j) & 1:
+            j += 1
+        for _ in range(i - j + 1):
+            acc = group.double(acc)
+        window = (k >> j) & ((1 << (i - j + 1)) - 1)
+        acc = group.add(acc, table[window >> 1])
+        i = j - 1
+    return acc
+
+def wnaf(group: Any, k: scalar, p: Any, w: width = 4) -> Any:
+    """
+    Width-w NAF method
+
+    Precomputes the `2^(w-2)` odd multiples of `p`, then `bits(k)`
+    doublings and about `bits(k) / (w + 1)` additions or subtractions
+    """
+    w = max(w, 2)
+    table = odd_multiples(group, p, 1 << (w - 2))
+    acc = group.identity()
+    for d in reversed(naf(k, w)):
+        acc = group.double(acc)
+        if d > 0:
+            acc = group.add(acc, table[d >> 1])
+        elif d < 0:
+            acc = group.add(acc, group.neg(table[-d >> 1]))
+    return acc
+
+def shamir(group: Any, k1: scalar, p1: Any, k2: scalar, p2: Any) -> Any:
+    """
+    Shamir's trick for `k1*P1 + k2*P2`
+
+    One shared chain of `max(bits(k1), bits(k2))` doublings
+    """
+    table = [None, p1, p2, group.add(p1, p2)]
+    acc = group.identity()
+    for i in range(max(k1.bit_length(), k2.bit_length()) - 1, -1, -1):
+        acc = group.double(acc)
+        j = (k1 >> i & 1) | (k2 >> i & 1) << 1
+        if j:
+            acc = group.add(acc, table[j])
+    return acc
+
+def straus(group: Any, scalars: list[scalar], points: list, w: width = 4) -> Any:
+    """
+    Straus' method for `k1*P1 + ... + km*Pm`, interleaved width-w NAFs
+
+    One shared chain of doublings, `2^(w-2)` precomputed odd multiples per point
+    """
+    tables = [odd_multiples(group, p, 1 << (w - 2)) for p in points]
+    nafs = [naf(k, w) for k in scalars]
+    acc = group.identity()
+    for i in range(max(map(len, nafs)) - 1, -1, -1):
+        acc = group.double(acc)
+        for digits, table in zip(nafs, tables):
+            if i < len(digits) and digits[i]:
+                d = digits[i]
+                if d > 0:
+                    acc = group.add(acc, table[d >> 1])
+                else:
+                    acc = group.add(acc, group.neg(table[-d >> 1]))
+    return acc
+
+def pippenger(group: Any, scalars: list[scalar], points: list, c: width = 0) -> Any:
+    """
+    Pippenger's bucket method for `k1*P1 + ... + km*Pm`
+
+    Scalars are cut into `c`-bit windows. In each window, every point is
+    added to the bucket of its digit and the buckets are combined with
+    running sums, about `(bits / c) * (m + 2^(c+1))` additions in total
+    """
+    if not c:
+        c = min(max(len(points).bit_length() - 2, 1), 16)
+    bits = max(k.bit_length() for k in scalars)
+    mask = (1 << c) - 1
+    acc = group.identity()
+    for shift in range((bits - 1) // c * c, -1, -c):
+        for _ in range(c):
+            acc = group.double(acc)
+        buckets = [None] * (1 << c)
+        for k, p in zip(scalars, points):
+            j = k >> shift & mask
+            if j:
+                buckets[j] = p if buckets[j] is None else group.add(buckets[j], p)
+        # sum_j j * buckets[j]
+        running = total = group.identity()
+        for j in range(mask, 0, -1):
+            if buckets[j] is not None:
+                running = group.add(running, buckets[j])
+            total = group.add(total, running)
+        acc = group.add(acc, total)
+    return acc
+
+def multi_scalar_mult(group: Any, scalars: list[scalar], points: list, straus_max: int = 32, strategy: str = 'wnaf', w: width = 4) -> Any:
+    """
+    Compute the linear combination `k1*P1 + ... + km*Pm` in `group`
+
+    - one term: `scalar_mult` with `strategy` and `w`
+    - two terms: Shamir's trick
+    - up to `straus_max` terms: Straus' method
+    - more terms: Pippenger's bucket method
+    """
+    if len(scalars) != len(points):
+        raise ValueError(f'Expect as many scalars as points, got: {len(scalars)} and {len(points)}')
+    if any(k < 0 for k in scalars):
+        raise ValueError(f'Expect nonnegative scalars, got: {scalars}')
+    terms = [(k, p) for k, p in zip(scalars, points) if k]
+    if not terms: return group.identity()
+    scalars, points = [k for k, _ in terms], [p for _, p in terms]
+    if len(terms) == 1: return scalar_mult(group, scalars[0], points[0], strategy, w)
+    if len(terms) == 2: return shamir(group, scalars[0], points[0], scalars[1], points[1])
+    if len(terms) <= straus_max: return straus(group, scalars, points)
+    return pippenger(group, scalars, points)
+
+# strategies selectable by name
+strategies = {
+    'double-and-add': double_and_add,
+    'sliding-window': sliding_window,
+    'wnaf': wnaf,
+}
+
+def scalar_mult(group: Any, k: scalar, p: Any, strategy: str = 'wnaf', w: width = 4) -> Any:
+    """
+    Compute `k*p` in `group` using the given `strategy`
+    """
+    if k < 0:
+        raise ValueError(f'Expect nonnegative scalar, got: {k}')
+    try:
+        mult = strategies[strategy]
+    except KeyError:
+        raise ValueError(f'Unknown scalar multiplication strategy: {strategy}')
+    if w < 1:
+        raise ValueError(f'Expect positive window width, got: {w}')
+    if k == 0: return group.identity()
+    if k == 1: return p
+    return mult(group, k, p, w)
+
+class FixedBase:
+    """
+    Fixed-base windowed precomputation
+
+    For window width `w` and `d = ceil(bits / w)` windows, row `i` of the
+    table holds `j * 2^(w*i) * P` for `0 < j < 2^w`, so `k*P` costs at most
+    `d` additions and no doublings. The table holds `d * (2^w - 1)` points.
+
+    `normalize` maps a list of group elements to a cheaper representation
+    for the second argument of `add`, e.g. projective to affine points
+    """
+
+    def __init__(self, group: Any, p: Any, bits: int, w: width = 4, normalize: Any = None):
+        if w < 1:
+            raise ValueError(f'Expect positive window width, got: {w}')
+        self.group = group
+        self.bits = bits
+        self.w = w
+        self.table = []
+        q = p
+        for _ in range(-(-bits // w)):
+            row = [q]
+            for _ in range(2, 1 << w):
+                row.append(group.add(row[-1], q))
+            q = group.add(row[-1], q)
+            self.table.append(normalize(row) if normalize else row)
+
+    def __len__(self) -> int:
+        """
+        Number of precomputed points
+        """
+        return sum(len(row) for row in self.table)
+
+    def mult(self, k: scalar) -> Any:
+        """
+        Compute `k*P` from the table, `0 <= k < 2^bits`
+        """
+        if k < 0 or k.bit_length() > self.bits:
+            raise ValueError(f'Expect scalar of at most {self.bits} bits, got: {k}')
+        group, w = self.group, self.w
+        mask = (1 << w) - 1
+        acc = group.identity()
+        for row in self.table:
+            if not k: break
+            j = k & mask
+            if j:
+                acc = group.add(acc, row[j - 1])
+            k >>= w
+        return acc
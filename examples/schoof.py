@@ -0,0 +1,374 @@
+"""
+Schoof's algorithm
+
+Count the points of `y^2 = x^3 + a*x + b` over the prime field Z/pZ
+in polynomial time by computing the trace of Frobenius `t` modulo
+small primes `l` and combining the residues with the CRT
+
+    #E = p + 1 - t,  |t| <= 2*sqrt(p)
+
+Polynomials over Z/pZ are lists of coefficients, lowest degree first,
+with no trailing zeros. Products use Kronecker substitution so the
+big-integer multiplication does the heavy lifting.
+"""
+
+from math import isqrt
+from modular import is_prime
+from secrets import randbelow
+from typing import Annotated
+
+# polynomial over Z/pZ, lowest degree first
+poly = Annotated[list[int], 'Coefficients over Z/pZ, lowest degree first']
+
+# ------------------------------
+# --- polynomials over Z/pZ ---
+# ------------------------------
+
+def trim(a: poly) -> poly:
+    """
+    Drop leading zero coefficients
+    """
+    while a and not a[-1]:
+        a.pop()
+    return a
+
+def add(a: poly, b: poly, p: int) -> poly:
+    """
+    `a + b`
+    """
+    if len(a) < len(b): a, b = b, a
+    return trim([(x + y) % p for x, y in zip(a, b)] + a[len(b):])
+
+def sub(a: poly, b: poly, p: int) -> poly:
+    """
+    `a - b`
+    """
+    return add(a, [-y % p for y in b], p)
+
+def scale(a: poly, c: int, p: int) -> poly:
+    """
+    `c * a`
+    """
+    return trim([c * x % p for x in a])
+
+def mul(a: poly, b: poly, p: int) -> poly:
+    """
+    `a * b` by Kronecker substitution, schoolbook for short factors
+    """
+    if not a or not b: return []
+    if len(a) > len(b): a, b = b, a
+    if len(a) <= 4:
+        res = [0] * (len(a) + len(b) - 1)
+        for i, x in enumerate(a):
+            if x:
+                for j, y in enumerate(b):
+                    res[i + j] += x * y
+        return trim([c % p for c in res])
+    # bytes per packed coefficient, enough for the unreduced convolution
+    k = (2 * p.bit_length() + len(a).bit_length() + 8) // 8
+    pack = lambda c: int.from_bytes(b''.join(x.to_bytes(k, 'little') for x in c), 'little')
+    n = len(a) + len(b) - 1
+    prod = (pack(a) * pack(b)).to_bytes(n * k, 'little')
+    return trim([int.from_bytes(prod[i:i + k], 'little') % p for i in range(0, n * k, k)])
+
+def divmod_poly(a: poly, b: poly, p: int) -> tuple[poly, poly]:
+    """
+    Quotient and remainder of `a` by `b`, schoolbook division
+    """
+    if not b: raise ZeroDivisionError('polynomial division by zero')
+    a = a[:]
+    inv = pow(b[-1], -1, p)
+    q = [0] * max(len(a) - len(b) + 1, 0)
+    db = len(b) - 1
+    for i in range(len(a) - 1, db - 1, -1):
+        c = a[i] * inv % p
+        if c:
+            q[i - db] = c
+            for j in range(db + 1):
+                a[i - db + j] = (a[i - db + j] - c * b[j]) % p
+    return trim(q), trim(a[:db])
+
+def monic(a: poly, p: int) -> poly:
+    """
+    Scale `a` to leading coefficient 1
+    """
+    return scale(a, pow(a[-1], -1, p), p) if a else a
+
+def gcd_poly(a: poly, b: poly, p: int) -> poly:
+    """
+    Monic greatest common divisor
+    """
+    while b:
+        a, b = b, divmod_poly(a, b, p)[1]
+    return monic(a, p)
+
+class NotInvertible(Exception):
+    """
+    Raised when inverting a zero divisor modulo `h`,
+    carries the nontrivial factor `gcd(a, h)`
+    """
+    def __init__(self, factor: poly):
+        super().__init__('zero divisor')
+        self.factor = factor
+
+def inverse_poly(a: poly, h: poly, p: int) -> poly:
+    """
+    Inverse of `a` modulo `h`, extended Euclidean algorithm
+
+    Raise `NotInvertible` with the factor `gcd(a, h)` otherwise
+    """
+    r0, r1 = h, divmod_poly(a, h, p)[1]
+    s0, s1 = [], [1]
+    while r1:
+        q, r = divmod_poly(r0, r1, p)
+        r0, r1 = r1, r
+        s0, s1 = s1, sub(s0, mul(q, s1, p), p)
+    if len(r0) != 1:
+        raise NotInvertible(monic(r0, p))
+    return scale(s0, pow(r0[0], -1, p), p)
+
+class Ring:
+    """
+    Quotient ring `(Z/pZ)[x] / (h)`, `h` monic of degree `d`
+
+    Products of reduced elements are reduced by Barrett's method with
+    the precomputed power series `1 / rev(h) mod x^(d-1)`
+    """
+
+    def __init__(self, h: poly, p: int):
+        self.h = monic(h, p)
+        self.p = p
+        self.d = len(self.h) - 1
+        # Newton iteration for the inverse of rev(h)
+        rev = self.h[::-1]
+        inv, prec = [1], 1
+        while prec < self.d - 1:
+            prec *= 2
+            e = mul(rev[:prec], inv, p)[:prec]
+            e = sub([2], e, p)
+            inv = mul(inv, e, p)[:prec]
+        self.inv = trim(inv[:max(self.d - 1, 1)])
+
+    def reduce(self, a: poly) -> poly:
+        """
+        `a mod h` for `deg(a) <= 2d - 2`
+        """
+        d, p = self.d, self.p
+        m = len(a) - 1
+        if m < d: return a
+        if m > 2 * d - 2: return divmod_poly(a, self.h, p)[1]
+        k = m - d + 1
+        q = mul(a[::-1][:k], self.inv[:k], p)[:k]
+        q = q + [0] * (k - len(q))
+        r = sub(a[:d], mul(q[::-1], self.h, p)[:d], p)
+        return r
+
+    def mul(self, a: poly, b: poly) -> poly:
+        """
+        `a * b mod h`
+        """
+        return self.reduce(mul(a, b, self.p))
+
+    def pow(self, a: poly, e: int) -> poly:
+        """
+        `a^e mod h`
+        """
+        res, a = [1], self.reduce(a)
+        for bit in bin(e)[2:]:
+            res = self.mul(res, res)
+            if bit == '1':
+                res = self.mul(res, a)
+        return res
+
+    def inverse(self, a: poly) -> poly:
+        """
+        `1 / a mod h`, raise `NotInvertible` for zero divisors
+        """
+        return inverse_poly(a, self.h, self.p)
+
+def roots_poly(f: poly, p: int) -> list[int]:
+    """
+    Sorted distinct roots of `f` in Z/pZ, `p` an odd prime
+
+    `gcd(f, x^p - x)` keeps the linear factors, which random shifts
+    `gcd(g, (x + r)^((p-1)/2) - 1)` split apart (Cantor-Zassenhaus)
+    """
+    f = trim([c % p for c in f])
+    if len(f) < 2: return []
+    g = gcd_poly(f, sub(Ring(f, p).pow([0, 1], p), [0, 1], p), p)
+    roots, stack = [], [g]
+    while stack:
+        g = stack.pop()
+        if len(g) == 2:
+            roots.append(-g[0] % p)
+        elif len(g) > 2:
+            h = Ring(g, p).pow([randbelow(p), 1], (p - 1) // 2)
+            h = gcd_poly(g, sub(h, [1], p), p)
+            if 1 < len(h) < len(g):
+                stack += [h, divmod_poly(g, h, p)[0]]
+            else:
+                stack.append(g)
+    return sorted(roots)
+
+# ------------------------------
+# --- division polynomials ---
+# ------------------------------
+
+def division_polynomials(a: int, b: int, p: int, n: int) -> list[poly]:
+    """
+    Division polynomials `f_0, ..., f_n` of `y^2 = x^3 + a*x + b` in x only:
+    `f_k = psi_k` for odd `k` and `f_k = psi_k / (2y)` for even `k`
+    """
+    a, b = a % p, b % p
+    f = [[], [1], [1],
+         trim([-a * a % p, 12 * b % p, 6 * a % p, 0, 3]),
+         trim([2 * (-8 * b * b - a ** 3) % p, -8 * a * b % p, -10 * a * a % p, 40 * b % p, 10 * a % p, 0, 2])]
+    # F^2 = (4 * (x^3 + a*x + b))^2 = (2y)^4
+    F = [4 * b % p, 4 * a % p, 0, 4]
+    F2 = mul(F, F, p)
+    for k in range(5, n + 1):
+        m = k // 2
+        if k % 2:
+            t1 = mul(f[m + 2], mul(f[m], mul(f[m], f[m], p), p), p)
+            t2 = mul(f[m - 1], mul(f[m + 1], mul(f[m + 1], f[m + 1], p), p), p)
+            if m % 2: t2 = mul(F2, t2, p)
+            else: t1 = mul(F2, t1, p)
+            f.append(sub(t1, t2, p))
+        else:
+            t1 = mul(f[m + 2], mul(f[m - 1], f[m - 1], p), p)
+            t2 = mul(f[m - 2], mul(f[m + 1], f[m + 1], p), p)
+            f.append(mul(f[m], sub(t1, t2, p), p))
+    return f[:n + 1]
+
+# ---------------------------------
+# --- points over (Z/pZ)[x]/(h) ---
+# ---------------------------------
+
+class Torsion:
+    """
+    Group law for points `(X(x), Y(x) * y)` on `y^2 = x^3 + a*x + b`
+    with coordinates in the ring `(Z/pZ)[x] / (h)`
+
+    The point at infinity is `None`
+    """
+
+    def __init__(self, a: int, f: poly, ring: Ring):
+        self.ring = ring
+        self.a = a % ring.p
+        # x^3 + a*x + b reduced modulo h
+        self.f = f
+
+    def add(self, P, Q):
+        """
+        `P + Q`, raise `NotInvertible` when a denominator is a zero divisor
+        """
+        if P is None: return Q
+        if Q is None: return P
+        ring, p = self.ring, self.ring.p
+        (x1, y1), (x2, y2) = P, Q
+        if x1 == x2:
+            s = add(y1, y2, p)
+            if not s: return None
+            if y1 == y2: return self.double(P)
+            raise NotInvertible(gcd_poly(s, ring.h, p))
+        lam = ring.mul(sub(y2, y1, p), ring.inverse(sub(x2, x1, p)))
+        x3 = sub(sub(ring.mul(ring.mul(lam, lam), self.f), x1, p), x2, p)
+        y3 = sub(ring.mul(lam, sub(x1, x3, p)), y1, p)
+        return x3, y3
+
+    def double(self, P):
+        """
+        `2P`, raise `NotInvertible` when a denominator is a zero divisor
+        """
+        if P is None: return None
+        ring, p = self.ring, self.ring.p
+        x1, y1 = P
+        if not y1: return None
+        # lambda * y = (3x^2 + a) / (2y), 1/y = y/f
+        num = add(scale(ring.mul(x1, x1), 3, p), [self.a] if self.a else [], p)
+        lam = ring.mul(num, ring.inverse(scale(ring.mul(y1, self.f), 2, p)))
+        x3 = sub(ring.mul(ring.mul(lam, lam), self.f), scale(x1, 2, p), p)
+        y3 = sub(ring.mul(lam, sub(x1, x3, p)), y1, p)
+        return x3, y3
+
+    def mult(self, k: int, P):
+        """
+        `k*P` by double-and-add
+        """
+        acc = None
+        for bit in bin(k)[2:]:
+            acc = self.double(acc)
+            if bit == '1':
+                acc = self.add(acc, P)
+        return acc
+
+def trace_mod_2(a: int, b: int, p: int) -> int:
+    """
+    `t mod 2`: `#E` is even iff `x^3 + a*x + b` has a root in Z/pZ
+    """
+    f = trim([b % p, a % p, 0, 1])
+    xp = Ring(f, p).pow([0, 1], p)
+    return 0 if len(gcd_poly(sub(xp, [0, 1], p), f, p)) > 1 else 1
+
+def trace_mod_l(a: int, b: int, p: int, l: int, psi: poly) -> int:
+    """
+    `t mod l` for an odd prime `l != p` from the characteristic equation
+    of Frobenius on the l-torsion
+
+        pi^2(P) + (p mod l) * P = t * pi(P)
+    """
+    f = trim([b % p, a % p, 0, 1])
+    h = psi
+    # powers of x and y are computed once, then reduced when h splits
+    ring = Ring(h, p)
+    xp = ring.pow([0, 1], p)
+    c = ring.pow(f, (p - 1) // 2)
+    xp2 = ring.pow(xp, p)
+    cp = ring.pow(c, p)
+    while True:
+        ring = Ring(h, p)
+        red = lambda u: divmod_poly(u, ring.h, p)[1]
+        E = Torsion(a, red(f), ring)
+        try:
+            pi1 = red(xp), red(c)
+            pi2 = red(xp2), ring.mul(red(c), red(cp))
+            S = E.add(pi2, E.mult(p % l, (red([0, 1]), [1])))
+            if S is None: return 0
+            T = pi1
+            for tau in range(1, (l - 1) // 2 + 1):
+                if T[0] == S[0]:
+                    return tau if T[1] == S[1] else l - tau
+                T = E.add(T, pi1)
+            raise ArithmeticError(f'no trace found modulo {l}')
+        except NotInvertible as e:
+            g = e.factor
+            # continue on the smaller nontrivial factor of h
+            cof = divmod_poly(ring.h, g, p)[0]
+            h = g if len(g) <= len(cof) else cof
+
+def schoof(a: int, b: int, p: int) -> int:
+    """
+    Number of points on `y^2 = x^3 + a*x + b` over Z/pZ, including
+    the point at infinity, for a prime `p > 3` and a nonsingular curve
+    """
+    if p <= 3 or not is_prime(p):
+        raise ValueError(f'Expect a prime modulus > 3, got: {p}')
+    if (4 * a ** 3 + 27 * b ** 2) % p == 0:
+        raise ValueError(f'Singular curve: y^2 = x^3 + {a}x + {b} (mod {p})')
+    bound = 4 * isqrt(p) + 4
+    ls, M = [], 2
+    l = 3
+    while M <= bound:
+        if l != p and is_prime(l):
+            ls.append(l)
+            M *= l
+        l += 2
+    psis = division_polynomials(a, b, p, max(ls, default=2) + 2)
+    # CRT
+    t, M = trace_mod_2(a, b, p), 2
+    for l in ls:
+        tl = trace_mod_l(a, b, p, l, psis[l])
+        t += M * ((tl - t) * pow(M, -1, l) % l)
+        M *= l
+    if t > M // 2: t -= M
+    return p + 1 - t
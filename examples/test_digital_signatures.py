@@ -0,0 +1,120 @@
+"""
+Digital signature unit tests
+"""
+
+import unittest
+from digital_signatures import BasedEC, Key, ECDSA, Ed25519, ed25519
+from elliptic_curve import Weierstrass, Montgomery, Point
+from secrets import SystemRandom
+
+# secp256k1
+p256 = 2 ** 256 - 2 ** 32 - 977
+g256 = Point(
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+n256 = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+def coords(p: Point) -> tuple[int, int]:
+    return p.x, p.y
+
+class TestFixedBase(unittest.TestCase):
+    def test_table(self):
+        """Fixed-base multiplication agrees with scalar_mult, also beyond the table"""
+        curve = Weierstrass(0, 7, p256)
+        for w in [1, 4, 6]:
+            bc = BasedEC(curve, g256, w)
+            self.assertIsNotNone(bc.table())
+            self.assertIs(bc.table(), bc.table())
+            for bits in [256, 300]:
+                for _ in range(10):
+                    k = SystemRandom().randint(0, 2 ** bits - 1)
+                    self.assertEqual(coords(bc.mult(k)), coords(curve.scalar_mult(k, g256)))
+            self.assertEqual(len(bc.table()), -(-256 // w) * (2 ** w - 1))
+
+    def test_key_gen(self):
+        """Public keys are sk * base"""
+        for curve in [Weierstrass(2, 3, 97), Montgomery(3, 5, 101), Weierstrass(0, 7, p256)]:
+            if curve.form[2] < 1000:
+                bc = BasedEC(curve, curve.points_n(1)[1])
+            else:
+                bc = BasedEC(curve, g256, order=n256)
+            for _ in range(10):
+                key = Key(bc)
+                self.assertEqual(coords(key.pk), coords(curve.scalar_mult(key.sk, bc.base)))
+
+class TestECDSA(unittest.TestCase):
+    def test_subgroup_order(self):
+        """Base point order divides the group order"""
+        for curve in [Weierstrass(2, 3, 97), Montgomery(3, 5, 101), Weierstrass(5, 7, 1000003)]:
+            for p in curve.points_n(5, 1)[1:]:
+                q = BasedEC(curve, p).order()
+                self.assertEqual(curve.order() % q, 0)
+                self.assertTrue(curve.scalar_mult(q, p).is_infinity())
+
+    def test_sign_verify(self):
+        """Signatures verify, tampered messages do not"""
+        # y^2 = x^3 + 3x + 7 (mod 1000003) has prime order 999853
+        small = Weierstrass(3, 7, 1000003)
+        curves = [BasedEC(small, small.points_n(1)[1]), BasedEC(Weierstrass(0, 7, p256), g256, order=n256)]
+        for bc in curves:
+            ecdsa = ECDSA(bc, Key(bc))
+            for i in range(10):
+                msg = f'message {i}'
+                sig = ecdsa.sign(msg)
+                self.assertTrue(ecdsa.verify(msg, sig))
+                self.assertFalse(ecdsa.verify(msg + '!', sig))
+
+class TestEd25519(unittest.TestCase):
+    # RFC 8032, section 7.1: private key, public key, message, signature
+    vectors = [
+        ('9d61b19deffd5a60ba844af492ec2cc44449c5697b326919703bac031cae7f60',
+         'd75a980182b10ab7d54bfed3c964073a0ee172f3daa62325af021a68f707511a',
+         '',
+         'e5564300c360ac729086e2cc806e828a84877f1eb8e5d974d873e06522490155'
+         '5fb8821590a33bacc61e39701cf9b46bd25bf5f0595bbe24655141438e7a100b'),
+        ('4ccd089b28ff96da9db6c346ec114e0f5b8a319f35aba624da8cf6ed4fb8a6fb',
+         '3d4017c3e843895a92b70aa74d1b7ebc9c982ccf2ec4968cc0cd55f12af4660c',
+         '72',
+         '92a009a9f0d4cab8720e820b5f642540a2b27b5416503f8fb3762223ebdb69da'
+         '085ac1e43e15996e458f3613d0f11d8c387b2eaeb4302aeeb00d291612bb0c00'),
+        ('c5aa8df43f9f837bedb7442f31dcb7b166d38535076f094b85ce3a2e0b4458f7',
+         'fc51cd8e6218a1a38da47ed00230f0580816ed13ba3303ac5deb911548908025',
+         'af82',
+         '6291d657deec24024827e69c3abe01a30ce548a284743a445e3680d7db5ac3ac'
+         '18ff9b538d16f290ae67f760984dc6594a7c15e9716ed28dc027beceea1ec40a'),
+    ]
+
+    def test_vectors(self):
+        """RFC 8032 test vectors"""
+        for sk, pk, msg, sig in self.vectors:
+            ed = Ed25519(bytes.fromhex(sk))
+            self.assertEqual(ed.pk.hex(), pk)
+            self.assertEqual(ed.sign(bytes.fromhex(msg)).hex(), sig)
+            self.assertTrue(ed.verify(bytes.fromhex(msg), bytes.fromhex(sig)))
+
+    def test_sign_verify(self):
+        """Signatures verify, tampered messages, signatures and keys do not"""
+        ed, other = Ed25519(), Ed25519()
+        for i in range(5):
+            msg = f'message {i}'
+            sig = ed.sign(msg)
+            self.assertEqual(sig, ed.sign(msg))
+            self.assertTrue(ed.verify(msg, sig))
+            self.assertTrue(other.verify(msg, sig, ed.pk))
+            self.assertFalse(ed.verify(msg + '!', sig))
+            self.assertFalse(other.verify(msg, sig))
+            self.assertFalse(ed.verify(msg, sig[:63] + bytes([sig[63] ^ 1])))
+            # S + L is rejected even though it verifies the same equation
+            s = int.from_bytes(sig[32:], 'little') + ed25519.order()
+            self.assertFalse(ed.verify(msg, sig[:32] + s.to_bytes(32, 'little')))
+
+    def test_encoding(self):
+        """Point encoding round-trips"""
+        ed = Ed25519()
+        for k in [1, 2, 3, SystemRandom().randint(1, ed25519.order() - 1)]:
+            p = ed25519.mult(k)
+            self.assertEqual(ed.decode_point(ed.encode_point(p)), p)
+        self.assertIsNone(ed.decode_point((2 ** 255 - 1).to_bytes(32, 'little')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Discrete logarithm unit tests
+"""
+
+import unittest
+from discrete_log import bsgs, rho, pohlig_hellman, mult
+from elliptic_curve import Weierstrass
+from modular import Units
+from secrets import randbelow
+
+# p = 46*q + 1 with q = 2^31 - 1 prime
+q = 2 ** 31 - 1
+p = 46 * q + 1
+
+class TestDiscreteLog(unittest.TestCase):
+    def test_bsgs(self):
+        """Full and capped tables find the smallest log"""
+        group = Units(1009)
+        for max_table in [1 << 20, 5]:
+            for k in range(0, 1008, 7):
+                self.assertEqual(bsgs(group, 11, pow(11, k, 1009), 1008, max_table), k)
+        self.assertIsNone(bsgs(group, 4, 11, 504))
+
+    def test_rho(self):
+        """Rho in a subgroup of prime order"""
+        group = Units(p)
+        g = pow(3, 46, p)
+        k = randbelow(q)
+        self.assertEqual(rho(group, g, pow(g, k, p), q), k)
+
+    def test_pohlig_hellman(self):
+        """Smooth order, large prime field"""
+        n = 2 ** 127 - 1
+        k = randbelow(n - 1)
+        self.assertEqual(pohlig_hellman(Units(n), 43, pow(43, k, n), n - 1), k)
+        self.assertIsNone(pohlig_hellman(Units(1009), 4, 11, 504))
+
+    def test_curve(self):
+        """Logs on a Weierstrass curve"""
+        c = Weierstrass(2, 3, 1009)
+        g = c.random_point()
+        o = c.point_order(g)
+        for k in [0, 1, randbelow(o), o - 1]:
+            self.assertEqual(pohlig_hellman(c, g, mult(c, k, g), o), k)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+"""
+Elliptic curve unit tests
+"""
+
+import pickle
+import unittest
+from elliptic_curve import Weierstrass, Montgomery, TwistedEdwards, Point, PointBatch, INFINITY, XZ
+from scalar_mult import naf, strategies, shamir, straus, pippenger
+from schoof import schoof
+from secrets import SystemRandom, randbits
+from unittest.mock import Mock, patch
+
+# secp256k1
+p256 = 2 ** 256 - 2 ** 32 - 977
+g256 = Point(
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+n256 = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+def coords(p: Point) -> tuple[int, int]:
+    return p.x, p.y
+
+class TestPoint(unittest.TestCase):
+    def test_value_semantics(self):
+        """Equality and hashing by value, immutable, singleton infinity"""
+        self.assertEqual(Point(3, 4), Point(3, 4))
+        self.assertNotEqual(Point(3, 4), Point(4, 3))
+        self.assertEqual(len({Point(3, 4), Point(3, 4), Point(1, 2)}), 2)
+        self.assertIs(Point(-1, -1), INFINITY)
+        self.assertIs(pickle.loads(pickle.dumps(INFINITY)), INFINITY)
+        self.assertEqual(pickle.loads(pickle.dumps(Point(5, 6))), Point(5, 6))
+        with self.assertRaises(AttributeError):
+            Point(3, 4).x = 5
+        self.assertFalse(hasattr(Point(3, 4), '__dict__'))
+        self.assertEqual(Weierstrass(2, 3, 97).add(INFINITY, Point(3, 6)), Point(3, 6))
+
+    def test_batch(self):
+        """Batches round-trip small and big coordinates"""
+        pts = Weierstrass(2, 3, 97).points()
+        batch = PointBatch(pts)
+        self.assertEqual(batch.xs.typecode, 'q')
+        self.assertEqual(list(batch), pts)
+        self.assertEqual(batch[5], pts[5])
+        self.assertEqual(list(batch[2:6]), pts[2:6])
+        batch.append(g256)
+        self.assertEqual(len(batch), len(pts) + 1)
+        self.assertEqual(batch[-1], g256)
+        self.assertEqual(list(batch)[:-1], pts)
+
+class TestBatch(unittest.TestCase):
+    def test_batch_add(self):
+        """Batch sums agree with pairwise addition, including doublings and inverses"""
+        for curve, args in [(Weierstrass, (2, 3, 97)), (Montgomery, (3, 5, 101)), (Weierstrass, (1, 1, 15))]:
+            c = curve(*args)
+            pts = c.points()
+            ps = [SystemRandom().choice(pts) for _ in range(200)]
+            qs = ps[:10] + [c.neg(p) for p in ps[10:20]] + [SystemRandom().choice(pts) for _ in range(180)]
+            self.assertEqual(c.batch_add(ps, qs), [c.add(p, q) for p, q in zip(ps, qs)])
+            self.assertEqual(c.batch_add(PointBatch(ps), qs), c.batch_add(ps, qs))
+        self.assertEqual(Weierstrass(2, 3, 97).batch_add([], []), [])
+
+    def test_batch_normalize(self):
+        """Batch normalization agrees with one inversion per point"""
+        c = Weierstrass(0, 7, p256)
+        jac = c.jacobian()
+        qs = [jac.double(p) for p in c.points_n(20)[1:]] + [jac.identity(), g256]
+        self.assertEqual(c.batch_normalize(qs), [jac.to_affine(q) for q in qs])
+        m = Montgomery(7, 3, 1009)
+        xz = m.xz()
+        ps = [p for p in m.points()[1:] if p.y]
+        ks = [SystemRandom().randint(0, 200) for _ in ps]
+        ladders = [xz.ladder(k, p.x)[0] for k, p in zip(ks, ps)]
+        self.assertEqual(m.batch_normalize(ladders), [xz.x_mult(k, p.x) for k, p in zip(ks, ps)])
+
+class TestPoints(unittest.TestCase):
+    def test_points(self):
+        """Enumeration agrees with exhaustive search"""
+        for curve, args in [(Weierstrass, (2, 3, 97)), (Montgomery, (3, 5, 101)),
+                            (Weierstrass, (1, 1, 15)), (Montgomery, (2, 3, 21))]:
+            c = curve(*args)
+            n = args[2]
+            pts = [(x, y) for x in range(n) for y in range(n) if c.check(Point(x, y))]
+            self.assertEqual([coords(p) for p in c.points()], [(-1, -1)] + pts)
+            self.assertEqual([coords(p) for p in c.points_n(5, 10)[1:]], [p for p in pts if p[0] >= 10][:5])
+
+    def test_iter_points(self):
+        """Streaming stops early on large fields"""
+        c = Weierstrass(0, 7, p256)
+        pts = c.points_n(10, 2 ** 200)
+        self.assertEqual(len(pts), 11)
+        self.assertTrue(all(c.check(p) for p in pts[1:]))
+
+class TestOrder(unittest.TestCase):
+    def test_small_fields(self):
+        """Group order is the number of points"""
+        for n in [7, 15, 97, 101, 1009]:
+            for _ in range(5):
+                a, b = SystemRandom().randint(0, n - 1), SystemRandom().randint(1, n - 1)
+                for c in [Weierstrass(a, b, n), Montgomery(a, b, n)]:
+                    self.assertEqual(c.order(), len(c.points()))
+
+    def test_schoof(self):
+        """Schoof agrees with Legendre sums and with Mestre's method"""
+        for n in [5, 7, 11, 101, 1009]:
+            for a in range(5):
+                for b in range(5):
+                    if (4 * a ** 3 + 27 * b ** 2) % n:
+                        self.assertEqual(schoof(a, b, n), Weierstrass(a, b, n).order())
+        n = 1099511627791
+        for _ in range(2):
+            a, b = SystemRandom().randint(0, n - 1), SystemRandom().randint(0, n - 1)
+            c = Weierstrass(a, b, n)
+            self.assertEqual(c.order(), schoof(a, b, n))
+            self.assertTrue(c.scalar_mult(c.order(), c.random_point()).is_infinity())
+
+    def test_secp256k1_subgroup(self):
+        """Known group order"""
+        c = Weierstrass(0, 7, p256)
+        self.assertEqual(c.point_order(g256, n256), n256)
+
+class TestConversion(unittest.TestCase):
+    def assertIsomorphism(self, iso, pts):
+        """Round trip, points land on the target, sums are preserved"""
+        src, tgt = iso.source, iso.target
+        imgs = iso.map_all(pts)
+        self.assertEqual(imgs, [iso.map(p) for p in pts])
+        self.assertTrue(all(q == tgt.identity() or tgt.check(q) for q in imgs))
+        self.assertEqual(iso.unmap_all(imgs), pts)
+        self.assertEqual(iso.inverse().map_all(imgs), pts)
+        for _ in range(100):
+            i, j = SystemRandom().randrange(len(pts)), SystemRandom().randrange(len(pts))
+            r = src.add(pts[i], pts[j])
+            if r in pts:
+                self.assertEqual(iso.map(r), tgt.add(imgs[i], imgs[j]))
+
+    def test_small_curves(self):
+        """Maps between all three forms are group isomorphisms, complete Edwards image"""
+        m = Montgomery(13, 3, 1009)
+        self.assertIsomorphism(m.to_weierstrass(), m.points())
+        e = m.to_edwards()
+        self.assertIsomorphism(e, [p for p in m.points() if p.is_infinity() or (p.y and p.x != 1008)])
+        self.assertEqual(e.target.order(), m.order())
+        w = m.to_weierstrass().target
+        self.assertIsomorphism(w.to_montgomery(), w.points())
+        self.assertIs(w.to_montgomery(), w.to_montgomery())
+        ed = TwistedEdwards(3, 11, 1009)
+        self.assertIsomorphism(ed.to_weierstrass(), ed.points())
+        self.assertEqual(ed.order(), len(ed.points()))
+        self.assertEqual(ed.to_weierstrass().target.order(), ed.order())
+
+    def test_no_montgomery_form(self):
+        """Montgomery curves have a point of order 2"""
+        c = Weierstrass(0, 1, 1009)
+        c.to_montgomery()
+        for a in range(20):
+            for b in range(1, 20):
+                c = Weierstrass(a, b, 1009)
+                if not any(p.y == 0 for p in c.points()[1:]):
+                    with self.assertRaises(ValueError):
+                        c.to_montgomery()
+
+    def test_curve25519(self):
+        """Curve25519 and edwards25519 base points correspond (RFC 7748)"""
+        from key_exchange import curve25519, base25519
+        p = 2 ** 255 - 19
+        iso = curve25519.to_edwards(-1)
+        self.assertEqual(iso.target.form, (p - 1, -121665 * pow(121666, -1, p) % p, p))
+        g = iso.map(base25519)
+        self.assertEqual(g, Point(15112221349535400772501151409588531511454012693041857206046113283949847762202, 4 * pow(5, -1, p) % p))
+        self.assertEqual(iso.unmap(g), base25519)
+        k = randbits(255)
+        self.assertEqual(iso.map(curve25519.scalar_mult(k, base25519)), iso.target.scalar_mult(k, g))
+
+class TestScalarMult(unittest.TestCase):
+    def test_naf(self):
+        """NAF digits recombine to the scalar"""
+        for _ in range(1000):
+            k = randbits(64)
+            for w in range(2, 7):
+                digits = naf(k, w)
+                self.assertEqual(sum(d << i for i, d in enumerate(digits)), k)
+                self.assertTrue(all(d % 2 for d in digits if d))
+
+    def test_small_curves(self):
+        """All strategies agree with repeated addition"""
+        for curve, args in [(Weierstrass, (2, 3, 97)), (Montgomery, (3, 5, 101))]:
+            c = curve(*args)
+            for p in c.points()[1:10]:
+                acc = c.identity()
+                for k in range(120):
+                    for strategy in strategies:
+                        for w in range(2, 6):
+                            q = curve(*args, strategy, w).scalar_mult(k, p)
+                            self.assertEqual(coords(q), coords(acc))
+                    acc = c.add(acc, p)
+
+    def test_projective(self):
+        """Jacobian, extended and ladder results agree with affine repeated addition"""
+        for curve, args in [(Weierstrass, (0, 7, 1009)), (Montgomery, (7, 3, 1009)), (TwistedEdwards, (1008, 11, 1009))]:
+            c = curve(*args)
+            for p in c.points()[1::50]:
+                acc = c.identity()
+                for k in range(200):
+                    self.assertEqual(coords(c.scalar_mult(k, p)), coords(acc))
+                    acc = c.add(acc, p)
+
+    def test_multi_scalar_mult(self):
+        """Linear combinations agree with summed scalar multiplications"""
+        for curve, args in [(Weierstrass, (0, 7, 1009)), (Montgomery, (7, 3, 1009)), (TwistedEdwards, (1008, 11, 1009))]:
+            c = curve(*args)
+            pts = c.points()[1:]
+            for m in [0, 1, 2, 3, 10, 40]:
+                ps = [SystemRandom().choice(pts) for _ in range(m)]
+                ks = [SystemRandom().randint(0, 5000) for _ in range(m)]
+                acc = c.identity()
+                for k, p in zip(ks, ps):
+                    acc = c.add(acc, c.scalar_mult(k, p))
+                self.assertEqual(coords(c.multi_scalar_mult(ks, ps)), coords(acc))
+                if m > 1:
+                    self.assertEqual(coords(straus(c, ks, ps)), coords(acc))
+                    self.assertEqual(coords(pippenger(c, ks, ps, 3)), coords(acc))
+                if m == 2:
+                    self.assertEqual(coords(shamir(c, ks[0], ps[0], ks[1], ps[1])), coords(acc))
+
+    def test_multi_scalar_mult_strategy(self):
+        """A single term runs the curve's own strategy"""
+        ladder = Montgomery(7, 3, 1009)
+        p = ladder.points()[5]
+        with patch.object(XZ, 'scalar_mult', autospec=True, side_effect=XZ.scalar_mult) as mult:
+            res = ladder.multi_scalar_mult([0, 77], [p, p])
+        mult.assert_called_once()
+        self.assertEqual(coords(res), coords(ladder.scalar_mult(77, p)))
+        for curve, args in [(Weierstrass, (0, 7, 1009)), (TwistedEdwards, (1008, 11, 1009))]:
+            c = curve(*args, strategy='double-and-add')
+            p = c.points()[5]
+            with patch.dict(strategies, {'double-and-add': Mock(wraps=strategies['double-and-add'])}):
+                res = c.multi_scalar_mult([0, 77], [p, p])
+                strategies['double-and-add'].assert_called_once()
+            self.assertEqual(coords(res), coords(c.scalar_mult(77, p)))
+
+    def test_secp256k1(self):
+        """256-bit scalars"""
+        curves = [Weierstrass(0, 7, p256, s) for s in strategies]
+        self.assertTrue(curves[0].scalar_mult(n256, g256).is_infinity())
+        for _ in range(3):
+            k = SystemRandom().randint(1, n256 - 1)
+            res = {coords(c.scalar_mult(k, g256)) for c in curves}
+            self.assertEqual(len(res), 1)
+            self.assertTrue(curves[0].check(Point(*res.pop())))
+        k1, k2 = randbits(256), randbits(256)
+        q = curves[0].scalar_mult(randbits(256), g256)
+        c = curves[0]
+        lin = c.add(c.scalar_mult(k1, g256), c.scalar_mult(k2, q))
+        self.assertEqual(coords(c.multi_scalar_mult([k1, k2], [g256, q])), coords(lin))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Extended Euclidean algorithm unit tests
+"""
+
+import unittest
+from extended_euclidean_algorithm import eea, euclid, lehmer, inverse, check
+from math import gcd
+from secrets import SystemRandom, randbits
+
+class TestEEA(unittest.TestCase):
+    def test_bezout(self):
+        """Bezout coefficients for signed inputs of all sizes, no recursion limit"""
+        for bits in [8, 64, 512, 4097, 10_000]:
+            for _ in range(20):
+                x, y = randbits(bits) or 1, randbits(SystemRandom().randint(1, bits)) or 1
+                x, y = SystemRandom().choice([x, -x]), SystemRandom().choice([y, -y])
+                g, a, b = eea(x, y)
+                self.assertEqual(g, gcd(x, y))
+                self.assertTrue(check(a, x, b, y, g))
+        with self.assertRaises(ValueError):
+            eea(0, 5)
+
+    def test_lehmer(self):
+        """Lehmer agrees with plain Euclid, including common factors"""
+        for _ in range(50):
+            c = randbits(200) | 1
+            x, y = sorted([c * randbits(1000), c * randbits(900)], reverse=True)
+            for f in [euclid, lehmer]:
+                g, a = f(x, y)
+                self.assertEqual(g, gcd(x, y))
+                self.assertEqual((a * x - g) % y, 0)
+
+    def test_inverse(self):
+        """Inverses below and above the Lehmer threshold, 0 for non-units"""
+        for bits in [16, 256, 5000]:
+            n = randbits(bits) | 1 << bits | 1
+            for _ in range(20):
+                x = SystemRandom().randint(1, n - 1)
+                a = inverse(x, n)
+                self.assertEqual(a == 0, gcd(x, n) != 1)
+                if a: self.assertEqual(a * x % n, 1)
+        self.assertEqual(inverse(6, 9), 0)
+        self.assertEqual(inverse(0, 9), 0)
+
+if __name__ == '__main__':
+    unittest.main()
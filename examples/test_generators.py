@@ -0,0 +1,69 @@
+"""
+Generators and discrete log unit tests
+"""
+
+import unittest
+from generators import is_generator, primitive_root, iter_generators, generators, random_gen, discrete_log, make
+from modular import Mod
+
+class TestGenerators(unittest.TestCase):
+    def test_generators(self):
+        """Agrees with element orders"""
+        for n in range(2, 300):
+            mod = Mod(n)
+            expected = [g for g in range(1, n) if mod.is_unit(g) and mod.order(g) == mod.phi()]
+            self.assertEqual(generators(n), expected)
+            self.assertEqual([g for g in range(n) if is_generator(g, n)], expected)
+            self.assertEqual(primitive_root(n), expected[0] if expected else None)
+
+    def test_trivial(self):
+        """1 generates the trivial unit group of Z/2Z"""
+        self.assertEqual(generators(2), [1])
+        self.assertEqual(primitive_root(2), 1)
+        self.assertEqual(random_gen(2), 1)
+        self.assertTrue(is_generator(1, 2))
+        self.assertFalse(is_generator(1, 3))
+
+    def test_large(self):
+        """Primitive roots of large primes and prime powers"""
+        p = 2 ** 127 - 1
+        g = primitive_root(p)
+        self.assertTrue(is_generator(g, p))
+        self.assertFalse(is_generator(pow(g, 3, p), p))
+        self.assertEqual(primitive_root(2 * 1009 ** 3), 11)
+        self.assertIsNone(primitive_root(1009 * 1013))
+
+    def test_lazy(self):
+        """Enumeration and random choice need no full list"""
+        p = 2 ** 61 - 1
+        gens = iter_generators(p)
+        for g in [next(gens) for _ in range(10)] + [random_gen(p)]:
+            self.assertTrue(is_generator(g, p))
+        self.assertIsNone(random_gen(15))
+
+    def test_make(self):
+        """Closures share the factorization"""
+        is_gen, gens, rand_gen, _, _ = make(101)
+        self.assertEqual(gens(), generators(101))
+        self.assertTrue(is_gen(rand_gen()))
+
+class TestDiscreteLog(unittest.TestCase):
+    def test_small(self):
+        """Smallest log agrees with exhaustive search, units or not"""
+        for n in range(1, 80):
+            for x in range(n):
+                pows = [pow(x, k, n) for k in range(2 * n)]
+                for y in range(n):
+                    expected = pows.index(y) if y in pows else None
+                    self.assertEqual(discrete_log(x, y, n), expected)
+
+    def test_large(self):
+        """Pohlig-Hellman modulo a prime with smooth p - 1"""
+        p = 2 ** 127 - 1
+        g = primitive_root(p)
+        k = 123456789123456789123456789
+        self.assertEqual(discrete_log(g, pow(g, k, p), p), k)
+        self.assertEqual(discrete_log(2 * 3, pow(6, k, 2 ** 10 * p), 2 ** 10 * p), k)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Key exchange unit tests
+"""
+
+import unittest
+from key_exchange import X25519, curve25519, base25519
+
+class TestX25519(unittest.TestCase):
+    def test_base_point(self):
+        """Base point is on Curve25519"""
+        self.assertTrue(curve25519.check(base25519))
+
+    def test_rfc7748_x25519(self):
+        """RFC 7748 section 5.2 test vector"""
+        k = bytes.fromhex('a546e36bf0527c9d3b16154b82465edd62144c0ac1fc5a18506a2244ba449ac4')
+        x = bytes.fromhex('e6db6867583030db3594c1a424b15f7c726624ec26b3353b10a903a6d0ab1c4c')
+        res = 'c3da55379de9c6908e94ea4df28d084f32eccf03491c71f754b4075577a28552'
+        self.assertEqual(X25519(k).x25519(k, x).hex(), res)
+
+    def test_rfc7748_dh(self):
+        """RFC 7748 section 6.1 Diffie-Hellman test vector"""
+        alice = X25519(bytes.fromhex('77076d0a7318a57d3c16c17251b26645df4c2f87ebc0992ab177fba51db92c2a'))
+        bob = X25519(bytes.fromhex('5dab087e624a8a4b79e17f8b83800ee66f3bb1292618b6fd1c2f8b27ff88e0eb'))
+        self.assertEqual(alice.pk.hex(), '8520f0098930a754748b7ddcb43ef75a0dbf3a0d26381af4eba4a98eaa9b4e6a')
+        self.assertEqual(bob.pk.hex(), 'de9edb7d7b7dc1b4d35b61c2ece435373f8343c85b78674dadfc7e146f882b4f')
+        secret = '4a5d9d5ba4ce2de1728e3bf480350f25e07e21c947d19e3376f09b3c1e161742'
+        self.assertEqual(alice.shared_secret(bob.pk).hex(), secret)
+        self.assertEqual(bob.shared_secret(alice.pk).hex(), secret)
+
+    def test_random_dh(self):
+        """100 random key agreements"""
+        for _ in range(100):
+            alice, bob = X25519(), X25519()
+            self.assertEqual(alice.shared_secret(bob.pk), bob.shared_secret(alice.pk))
+
+    def test_low_order(self):
+        """Low order public keys are rejected"""
+        with self.assertRaises(ValueError):
+            X25519().shared_secret(bytes(32))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Modular arithmetic unit tests
+"""
+
+import unittest
+from math import gcd
+from modular import Mod, ModContext, mod_context, is_prime, np
+from secrets import SystemRandom
+
+class TestPrimes(unittest.TestCase):
+    def test_is_prime(self):
+        """Agrees with trial division"""
+        for n in range(10_000):
+            self.assertEqual(is_prime(n), n > 1 and all(n % d for d in range(2, int(n ** 0.5) + 1)))
+        self.assertTrue(is_prime(2 ** 255 - 19))
+        self.assertFalse(is_prime(3215031751))
+        # strong pseudoprime to the bases 2 through 37
+        self.assertFalse(is_prime(318665857834031151167461))
+
+class TestSqrt(unittest.TestCase):
+    def test_sqrt_prime(self):
+        """Tonelli-Shanks agrees with exhaustive search"""
+        for p in [3, 5, 13, 17, 97, 257, 1009]:
+            mod = Mod(p)
+            for r in range(p):
+                roots = [x for x in range(p) if x * x % p == r]
+                self.assertEqual(mod.sqrt_prime(r), roots)
+                self.assertEqual(mod.legendre(r), 0 if r == 0 else 1 if roots else -1)
+
+    def test_sqrt(self):
+        """All roots modulo composites and prime powers agree with exhaustive search"""
+        for n in list(range(1, 200)) + [512, 729, 1000, 1001, 2401, 720]:
+            mod = Mod(n)
+            roots = {}
+            for x in range(n):
+                roots.setdefault(x * x % n, []).append(x)
+            for r in range(-1, n + 1):
+                self.assertEqual(mod.sqrt(r), roots.get(r % n, []))
+
+    def test_sqrt_large(self):
+        """Roots modulo a large smooth modulus, Cipolla for a prime with large 2-adic order"""
+        n = (2 ** 61 - 1) * (2 ** 31 - 1) ** 3 * 3 ** 5 * 2 ** 10
+        mod = Mod(n)
+        for _ in range(5):
+            x = SystemRandom().randint(1, n - 1)
+            roots = mod.sqrt(x * x)
+            self.assertIn(x, roots)
+            self.assertEqual(roots, sorted(set(roots)))
+            self.assertTrue(all(y * y % n == x * x % n for y in roots))
+        p = 15 * 2 ** 27 + 1
+        for _ in range(20):
+            x = SystemRandom().randint(1, p - 1)
+            self.assertIn(Mod(p)._cipolla(x * x % p), [x, p - x])
+
+    def test_sqrt_prime_large(self):
+        """Roots of random squares modulo large primes"""
+        for p in [2 ** 255 - 19, 2 ** 256 - 2 ** 32 - 977, 2 ** 224 - 2 ** 96 + 1]:
+            mod = Mod(p)
+            for _ in range(20):
+                x = SystemRandom().randint(1, p - 1)
+                self.assertEqual(mod.sqrt_prime(x * x), sorted([x, p - x]))
+
+class TestUnits(unittest.TestCase):
+    def test_all_units(self):
+        """Sieve agrees with gcd, streaming agrees with the list"""
+        for n in list(range(2, 300)) + [65536, 100003, 510510]:
+            mod = Mod(n)
+            units = [x for x in range(1, n) if gcd(x, n) == 1]
+            self.assertEqual(mod.all_units(use_numpy=False), units)
+            self.assertEqual(list(mod.iter_units(block=7)), units)
+            self.assertEqual(mod.phi(), len(units))
+            self.assertTrue(all(pow(x, mod.carmichael(), n) == 1 for x in units))
+            self.assertEqual(mod.carmichael(), max(mod.order(x) for x in units))
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_all_units_numpy(self):
+        """Boolean mask backend agrees with the sieve"""
+        for n in [2, 97, 360, 65536, 510510]:
+            mod = Mod(n)
+            self.assertEqual(mod.all_units(use_numpy=True), mod.all_units(use_numpy=False))
+
+    def test_totients(self):
+        """Known values of phi and lambda"""
+        self.assertEqual([Mod(n).phi() for n in range(1, 13)], [1, 1, 2, 2, 4, 2, 6, 4, 6, 4, 10, 4])
+        self.assertEqual([Mod(n).carmichael() for n in range(1, 13)], [1, 1, 2, 2, 4, 2, 6, 2, 6, 4, 10, 2])
+        self.assertEqual(Mod(2 ** 20).carmichael(), 2 ** 18)
+        self.assertEqual(Mod(1009 * 1013).carmichael_factors(), {2: 4, 3: 2, 7: 1, 11: 1, 23: 1})
+
+class TestOrder(unittest.TestCase):
+    def test_order(self):
+        """Agrees with the first exponent giving 1, -1 for non-units"""
+        for n in range(2, 200):
+            mod = Mod(n)
+            for x in range(n):
+                expected = next((k for k in range(1, n + 1) if pow(x, k, n) == 1), -1)
+                self.assertEqual(mod.order(x), expected)
+
+    def test_generated_group(self):
+        """Subgroup size is the order, powers stream lazily"""
+        for n in [7, 15, 97, 360, 1009]:
+            mod = Mod(n)
+            for x in mod.all_units():
+                group = mod.generated_group(x)
+                self.assertEqual(group, sorted({pow(x, k, n) for k in range(1, n)}))
+                self.assertTrue(mod.check(x))
+        p = 2 ** 127 - 1
+        mod = Mod(p)
+        self.assertEqual(mod.order(3), (p - 1) // 3)
+        powers = mod.powers(3)
+        self.assertEqual([next(powers) for _ in range(4)], [3, 9, 27, 81])
+
+class TestBatch(unittest.TestCase):
+    def test_batch_inverse(self):
+        """Agrees with inverse, 0 for non-units"""
+        for n in [97, 1009 * 1013, 2 ** 127 - 1, 3 * 5 * 7 * 11 * 13 * 2 ** 61 + 1]:
+            mod = Mod(n)
+            values = [SystemRandom().randrange(n) for _ in range(300)] + [0, n, 3, 35]
+            self.assertEqual(mod.batch_inverse(values), [mod.inverse(v) for v in values])
+        self.assertEqual(Mod(7).batch_inverse([]), [])
+        self.assertEqual(Mod(1).batch_inverse([0, 1, 5]), [0, 0, 0])
+
+    def test_batch_pow(self):
+        """Agrees with pow for positive and negative exponents"""
+        for n in [97, 1009 * 1013, 2 ** 127 - 1]:
+            mod = Mod(n)
+            bases = [SystemRandom().randrange(n) for _ in range(50)] * 2 + [0]
+            e = SystemRandom().randrange(2 ** 200)
+            self.assertEqual(mod.batch_pow(bases, e), [pow(b, e, n) for b in bases])
+            inverses = [mod.inverse(b) for b in bases]
+            self.assertEqual(mod.batch_pow(bases, -e), [pow(b, e, n) if b else 0 for b in inverses])
+
+    def test_pow_many(self):
+        """Fixed-base table agrees with pow"""
+        for n in [2, 97, 2 ** 127 - 1, 2 ** 2048 - 1942289]:
+            mod = Mod(n)
+            base = SystemRandom().randrange(1, n)
+            for m in [1, 3, 40]:
+                exps = [SystemRandom().randrange(-2 ** 300, 2 ** 300) for _ in range(m)] + [0]
+                if mod.inverse(base):
+                    self.assertEqual(mod.pow_many(base, exps), [pow(base, e, n) for e in exps])
+        with self.assertRaises(ValueError):
+            Mod(10).pow_many(4, [1, -1])
+
+class TestContext(unittest.TestCase):
+    def test_reduce(self):
+        """Every reduction method agrees with %"""
+        for n in [97, 1009 * 1013, 2 ** 255 - 19, 2 ** 5000 - 1]:
+            for method in ['native', 'barrett', 'montgomery']:
+                mod = ModContext(n, method)
+                for _ in range(50):
+                    x, y = SystemRandom().randrange(n), SystemRandom().randrange(n)
+                    e = SystemRandom().randrange(2 ** 64)
+                    if method == 'montgomery':
+                        mx, my = mod.to_montgomery(x), mod.to_montgomery(y)
+                        self.assertEqual(mod.from_montgomery(mod.mul(mx, my)), x * y % n)
+                        self.assertEqual(mod.from_montgomery(mod.sqr(mx)), x * x % n)
+                        self.assertEqual(mod.from_montgomery(mod.pow(mx, e)), pow(x, e, n))
+                    else:
+                        self.assertEqual(mod.mul(x, y), x * y % n)
+                        self.assertEqual(mod.sqr(x), x * x % n)
+                        self.assertEqual(mod.pow(x, e), pow(x, e, n))
+        self.assertEqual(ModContext(2 ** 5000 - 1).method, 'barrett')
+        # inherited methods work on plain residues, also in Montgomery mode
+        mod = ModContext(1009, 'montgomery')
+        mx = mod.to_montgomery(mod.inverse(3))
+        self.assertEqual(mod.from_montgomery(mod.mul(mx, mod.to_montgomery(3))), 1)
+        self.assertEqual(mod.sqrt(4), [2, 1007])
+        with self.assertRaises(ValueError):
+            ModContext(10, 'montgomery')
+        with self.assertRaises(ValueError):
+            ModContext(10, 'division')
+
+    def test_cache(self):
+        """One shared context per modulus"""
+        self.assertIs(mod_context(1009), mod_context(1009))
+        self.assertIsNot(mod_context(1009), mod_context(1013))
+        self.assertEqual(mod_context(1009).inverse(3) * 3 % 1009, 1)
+        self.assertEqual(mod_context.cache_info().maxsize, 64)
+
+if __name__ == '__main__':
+    unittest.main()
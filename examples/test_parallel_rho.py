@@ -0,0 +1,45 @@
+"""
+Parallel Pollard rho unit tests
+"""
+
+import unittest
+from discrete_log import mult
+from elliptic_curve import Weierstrass, Point
+from modular import Units
+from parallel_rho import parallel_rho, parallel_log
+from secrets import randbelow
+
+# p = 46*q + 1 with q = 2^31 - 1 prime
+q = 2 ** 31 - 1
+p = 46 * q + 1
+
+class TestParallelRho(unittest.TestCase):
+    def test_units(self):
+        """Subgroup of prime order in Z/pZ"""
+        g = pow(3, 46, p)
+        k = randbelow(q)
+        self.assertEqual(parallel_rho(Units(p), g, pow(g, k, p), q, workers=2), k)
+        self.assertIsNone(parallel_rho(Units(p), g, 3, q, workers=2))
+
+    def test_curve(self):
+        """Point logs on a Weierstrass curve of order 2^5 * 7 * 11^2 * 79231"""
+        c = Weierstrass(2, 3, 2 ** 31 - 1)
+        g = c.random_point()
+        o = c.point_order(g)
+        k = randbelow(o)
+        self.assertEqual(parallel_log(c, g, mult(c, k, g), o, min_bits=2, workers=2), k)
+        g = mult(c, 2 ** 5 * 7 * 11 ** 2, Point(2, 753804466))
+        self.assertEqual(c.point_order(g), 79231)
+        k = randbelow(79231)
+        self.assertEqual(parallel_rho(c, g, mult(c, k, g), 79231, workers=2), k)
+
+    def test_report(self):
+        """Throughput is reported while running"""
+        rates = []
+        g = pow(3, 46, p)
+        parallel_rho(Units(p), g, pow(g, randbelow(q), p), q, workers=2, batch=1 << 10,
+                     report=lambda steps, elapsed, points: rates.append(steps / elapsed))
+        self.assertTrue(rates and all(r > 0 for r in rates))
+
+if __name__ == '__main__':
+    unittest.main()